@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 
 from ui.styles import load_custom_css, get_page_config
 from ui.home_components import (
@@ -7,33 +6,32 @@ from ui.home_components import (
     display_navigation_info,
     display_data_overview,
     display_data_filters,
-    display_sample_data
+    display_sample_data,
+    display_session_memory
 )
+from ui.common_components import display_perf_panel
 
-from modules.preprocessing.data_loader import load_data, clean_age, get_data_ranges
+from modules.preprocessing.aggregate_cube import filter_cube
+from modules.session_data import load_shared_dataset, materialize_rows, record_session_memory
 
 config = get_page_config()
 st.set_page_config(**config)
 
 load_custom_css()
 
-@st.cache_data
 def load_and_process_data():
     try:
-        df = load_data('data/reviews_cleaned.csv')
-        # df = clean_age(df)
+        # Jeu de données, plages, index de filtrage et cube partagés par toutes les sessions
+        dataset = load_shared_dataset()
         
-        # Calcul des métriques globales
-        ranges = get_data_ranges(df)
-        
-        return df, ranges
+        return dataset['df'], dataset['ranges'], dataset['index'], dataset['cube']
         
     except FileNotFoundError:
         st.error("❌ Fichier de données introuvable. Vérifiez le chemin dans `load_data()`")
-        return None, None
+        return None, None, None, None
     except Exception as e:
         st.error(f"❌ Erreur lors du chargement des données : {e}")
-        return None, None
+        return None, None, None, None
 
 def main():
 
@@ -42,23 +40,32 @@ def main():
     
     # Chargement des données
     with st.spinner("🔄 Chargement des données..."):
-        df, ranges = load_and_process_data()
+        df, ranges, index, cube = load_and_process_data()
     
     if df is None or ranges is None:
         st.stop()  
     
-    display_data_overview(df, ranges)
+    display_data_overview(df, ranges, cube)
     st.divider()
-    filtered_df = display_data_filters(df, ranges)
+    selection = display_data_filters(df, ranges, index, cube)
     
-    # Stockage des données dans la session pour les autres pages
-    st.session_state['filtered_data'] = filtered_df
-    st.session_state['original_data'] = df
-    st.session_state['data_ranges'] = ranges
+    # La session ne garde que la sélection (1 bit par ligne), pas de copie des données
+    st.session_state['data_selection'] = selection
     
     st.divider()
-    display_sample_data(filtered_df)
+    if selection is None:
+        display_sample_data(df.head(0))
+    else:
+        display_sample_data(
+            materialize_rows(df, index, selection, n=10),
+            filter_cube(cube, **selection['filters'])
+        )
+    
+    record_session_memory()
+    if st.query_params.get('admin') == '1':
+        display_session_memory(df)
     
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+    display_perf_panel()
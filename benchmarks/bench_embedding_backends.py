@@ -0,0 +1,78 @@
+"""
+Compare le débit d'encodage (phrases/s) des variantes de SentenceTransformer sur CPU
+
+Référence : SentenceTransformer(...).encode(textes, batch_size=32), le chemin
+utilisé jusqu'ici par BERTopic. Chaque variante est encodée par lots de longueur
+homogène (embedding_backend.encode_texts) ; l'écart à la référence est donné
+par la similarité cosinus moyenne des embeddings.
+
+Usage : python benchmarks/bench_embedding_backends.py [--n-texts 2000] [--threads 4]
+                                                      [--backends torch int8 onnx onnx-int8]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.preprocessing.embedding_backend import BACKENDS, load_sentence_transformer, encode_texts, set_thread_count
+
+
+def load_texts(path, n_texts):
+    """Avis du jeu de données, répétés si besoin jusqu'à n_texts"""
+    texts = pd.read_csv(path)['description-text'].dropna().astype(str).tolist()
+    return (texts * (n_texts // len(texts) + 1))[:n_texts]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def mean_cosine(a, b):
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return float(np.mean(np.sum(a * b, axis=1)))
+
+
+def run(model_name, texts, backends, n_threads):
+    from sentence_transformers import SentenceTransformer
+
+    if n_threads:
+        set_thread_count(n_threads)
+    print(f"{len(texts)} textes, modèle {model_name}, threads {n_threads or 'défaut'}")
+    print(f"{'variante':<24} {'phrases/s':>10} {'gain':>7} {'cosinus':>8}")
+
+    reference_model = SentenceTransformer(model_name, device='cpu')
+    reference_model.encode(texts[:32])  # préchauffage
+    seconds, reference = timed(lambda: reference_model.encode(texts, batch_size=32, convert_to_numpy=True))
+    reference_rate = len(texts) / seconds
+    print(f"{'défaut (batch 32)':<24} {reference_rate:>10.1f} {1.0:>6.2f}x {1.0:>8.4f}")
+
+    for backend in backends:
+        try:
+            model = load_sentence_transformer(model_name, backend=backend, n_threads=n_threads)
+        except Exception as e:
+            print(f"{backend:<24} indisponible : {e}")
+            continue
+        encode_texts(model, texts[:32])
+        seconds, embeddings = timed(lambda: encode_texts(model, texts))
+        rate = len(texts) / seconds
+        print(f"{backend + ' + lots/longueur':<24} {rate:>10.1f} {rate / reference_rate:>6.2f}x "
+              f"{mean_cosine(embeddings, reference):>8.4f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--data', default='data/reviews_cleaned.csv')
+    parser.add_argument('--model', default='all-MiniLM-L12-v2')
+    parser.add_argument('--n-texts', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    args = parser.parse_args()
+    run(args.model, load_texts(args.data, args.n_texts), args.backends, args.threads)
@@ -0,0 +1,62 @@
+"""
+Compare le filtrage par masques booléens (filter_data sans index)
+et le filtrage par index bitmap (build_filter_index + filter_data).
+
+Usage : python benchmarks/bench_filter_index.py [--sizes 10000 1000000 10000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.preprocessing.data_filter import filter_data
+from modules.preprocessing.filter_index import build_filter_index
+
+AGES = [15.5, 21.5, 29.5, 39.5, 49.5, 59.5, 69.5, 80.0, np.nan]
+GENDERS = ['female', 'male', 'transgender', 'nonbinary', None]
+CONDITIONS = [f'     Condition {i}' for i in range(30)]
+
+
+def make_frame(n_rows, seed=0):
+    """Génère un DataFrame synthétique avec les colonnes filtrées"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Age_numeric': pd.Series(rng.choice(AGES, n_rows), dtype='float32'),
+        'Gender': pd.Categorical(rng.choice(np.array(GENDERS, dtype=object), n_rows)),
+        'Condition': pd.Categorical(rng.choice(CONDITIONS, n_rows)),
+    })
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def run(sizes, repeat):
+    filters = ((20, 60), ['female', 'male'], CONDITIONS[:5])
+    print(f"{'lignes':>10} {'masques (ms)':>14} {'index (ms)':>12} {'build (ms)':>12} {'gain':>7}")
+    for n_rows in sizes:
+        df = make_frame(n_rows)
+        build_time, index = best_of(lambda: build_filter_index(df), 1)
+        mask_time, expected = best_of(lambda: filter_data(df, *filters), repeat)
+        index_time, result = best_of(lambda: filter_data(df, *filters, index=index), repeat)
+        assert expected.index.equals(result.index)
+        print(f"{n_rows:>10} {mask_time * 1e3:>14.2f} {index_time * 1e3:>12.2f} "
+              f"{build_time * 1e3:>12.1f} {mask_time / index_time:>6.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,86 @@
+"""
+Mesure le coût d'import de chaque point d'entrée Streamlit (style python -X importtime)
+
+Pour chaque point d'entrée, les imports de premier niveau du script sont rejoués
+dans un interpréteur neuf avec -X importtime. Le script échoue si le temps total
+dépasse le budget ou si un module lourd interdit (torch, bertopic...) est chargé.
+
+Usage : python benchmarks/bench_import_time.py [--repeat 3] [--top 10]
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget (ms) et modules qui ne doivent pas être importés au démarrage, par point d'entrée
+ENTRY_POINTS = {
+    'app.py': {'budget_ms': 2500, 'forbidden': ['torch', 'bertopic', 'sentence_transformers', 'sklearn', 'matplotlib']},
+    'pages/1-sentiment_analysis.py': {'budget_ms': 2500, 'forbidden': ['torch', 'bertopic', 'sentence_transformers', 'sklearn', 'matplotlib']},
+    'pages/2-lda_analysis.py': {'budget_ms': 2500, 'forbidden': ['torch', 'bertopic', 'sentence_transformers', 'sklearn']},
+    'pages/3-bert_analysis.py': {'budget_ms': 2500, 'forbidden': ['torch', 'bertopic', 'sentence_transformers']},
+}
+
+
+def entry_imports(path):
+    """Instructions d'import de premier niveau d'un script"""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def measure(entry, forbidden):
+    """
+    Rejoue les imports d'un point d'entrée dans un processus neuf
+
+    Returns:
+        tuple: (temps total en ms, modules les plus coûteux, modules interdits chargés)
+    """
+    code = "\n".join(entry_imports(os.path.join(REPO_ROOT, entry)) + [
+        "import sys, json",
+        f"print(json.dumps([m for m in {forbidden!r} if m in sys.modules]))",
+    ])
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+
+    total_us, modules = 0, []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        cumulative_us, name = int(cumulative_us), name[1:]
+        modules.append((cumulative_us, name))
+        # Les modules importés directement ne sont pas indentés
+        if not name.startswith(' '):
+            total_us += cumulative_us
+
+    loaded_forbidden = json.loads(result.stdout.strip().splitlines()[-1])
+    return total_us / 1000, sorted(modules, reverse=True), loaded_forbidden
+
+
+def run(repeat, top):
+    failed = False
+    for entry, config in ENTRY_POINTS.items():
+        runs = [measure(entry, config['forbidden']) for _ in range(repeat)]
+        total_ms, modules, loaded_forbidden = min(runs, key=lambda r: r[0])
+        over_budget = total_ms > config['budget_ms']
+        failed = failed or over_budget or bool(loaded_forbidden)
+
+        status = 'OK' if not over_budget and not loaded_forbidden else 'ÉCHEC'
+        print(f"{entry:<32} {total_ms:>8.0f} ms / {config['budget_ms']} ms  {status}")
+        if loaded_forbidden:
+            print(f"    modules interdits chargés : {', '.join(loaded_forbidden)}")
+        for cumulative_us, name in [m for m in modules if not m[1].startswith(' ')][:top]:
+            print(f"    {cumulative_us / 1000:>8.1f} ms  {name}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=3, help="nombre de mesures (la meilleure est gardée)")
+    parser.add_argument('--top', type=int, default=5, help="nombre d'imports directs détaillés")
+    args = parser.parse_args()
+    sys.exit(run(args.repeat, args.top))
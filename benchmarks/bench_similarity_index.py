@@ -0,0 +1,67 @@
+"""
+Compare la recherche exacte (parcours complet) et l'index IVF
+(build_similarity_index + search_similar) : latence par requête et rappel@k.
+
+Les embeddings sont synthétiques (mélange de gaussiennes), de la dimension
+de all-MiniLM-L12-v2 par défaut.
+
+Usage : python benchmarks/bench_similarity_index.py [--sizes 100000 1000000] [--dim 384]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.preprocessing.similarity_index import build_similarity_index, search_similar, brute_force_search
+
+
+def make_vectors(n_rows, dim, n_clusters=200, seed=0, batch_size=100_000):
+    """Génère des embeddings groupés autour de n_clusters centres (float16, comme le store)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    vectors = np.empty((n_rows, dim), dtype=np.float16)
+    for start in range(0, n_rows, batch_size):
+        stop = min(start + batch_size, n_rows)
+        labels = rng.integers(n_clusters, size=stop - start)
+        vectors[start:stop] = centers[labels] + 0.8 * rng.standard_normal((stop - start, dim), dtype=np.float32)
+    return vectors
+
+
+def run(sizes, dim, n_queries, k, n_probe):
+    print(f"{'lignes':>10} {'exact (ms)':>11} {'ivf (ms)':>9} {'rappel@k':>9} {'build (s)':>10}")
+    for n_rows in sizes:
+        vectors = make_vectors(n_rows, dim)
+        queries = vectors[np.random.default_rng(1).choice(n_rows, n_queries, replace=False)].astype(np.float32)
+
+        start = time.perf_counter()
+        index = build_similarity_index(vectors)
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected, _ = brute_force_search(vectors, queries[:10], k=k)
+        exact_ms = (time.perf_counter() - start) * 1000 / 10
+
+        latencies, found = [], []
+        for query in queries:
+            start = time.perf_counter()
+            positions, _ = search_similar(index, query, k=k, n_probe=n_probe)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found.append(positions[0])
+        recall = np.mean([len(np.intersect1d(f, e)) / k for f, e in zip(found[:10], expected)])
+
+        print(f"{n_rows:>10,} {exact_ms:>11.1f} {np.median(latencies):>9.2f} {recall:>9.2f} {build_seconds:>10.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--n-probe', type=int, default=8)
+    args = parser.parse_args()
+    run(args.sizes, args.dim, args.queries, args.k, args.n_probe)
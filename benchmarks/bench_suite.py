@@ -0,0 +1,263 @@
+"""
+Suite de benchmarks reproductible : chargement, filtrage, nettoyage, scoring et topic modeling
+
+Chaque taille de corpus (10k / 100k / 1M avis par défaut) est générée une fois
+par synthetic_reviews.py dans --data-dir, puis chaque étape est chronométrée
+(meilleur temps sur --repeat essais pour les étapes rapides, un essai pour les
+entraînements). Les résultats sont écrits en JSON ; avec --baseline, chaque
+étape est comparée au fichier de référence et les régressions sont signalées.
+
+Rien n'est téléchargé : sans les données NLTK, le nettoyage utilise les mots
+vides de scikit-learn et l'étape VADER est marquée comme ignorée ; l'encodage
+utilise un modèle factice (coût proportionnel au nombre de tokens).
+
+Usage :
+    python benchmarks/bench_suite.py --output bench_results.json
+    python benchmarks/bench_suite.py --sizes 10000 100000 --baseline bench_results.json --fail-on-regression
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_reviews import load_profile, write_reviews_csv
+from modules import utils
+from modules.preprocessing.data_loader import load_data, get_data_ranges
+from modules.preprocessing.data_filter import filter_data
+from modules.preprocessing.data_store import get_store_path
+from modules.preprocessing.filter_index import build_filter_index
+from modules.preprocessing.text_cleaner import clean_series, get_stop_words
+from modules.preprocessing.sentiment_scorer import score_texts
+from modules.preprocessing.lda_analyzer import run_lda_analysis, extract_lda_topics, assign_topics_to_documents
+from modules.preprocessing.embedding_backend import encode_texts
+
+FILTERS = ((20, 60), ['female', 'male'], ['Schizophrenia', 'Other', 'Bipolar Disorder in Remission'])
+
+# Seuils de régression : plus lent de 20 % et d'au moins 5 ms
+DEFAULT_TOLERANCE = 0.2
+MIN_DELTA_SECONDS = 0.005
+
+
+class StubEmbeddingModel:
+    """
+    Modèle d'embedding factice à l'interface de SentenceTransformer (tokenizer, encode)
+
+    Chaque token est haché vers un vecteur fixe ; le coût croît avec le nombre de
+    tokens comme pour un vrai modèle, sans téléchargement ni torch.
+    """
+
+    max_seq_length = 128
+
+    def __init__(self, dim=384, n_buckets=4096, seed=0):
+        self.table = np.random.default_rng(seed).standard_normal((n_buckets, dim)).astype(np.float32)
+
+    def _token_ids(self, text):
+        return [zlib.crc32(word.encode()) % len(self.table) for word in text.lower().split()[:self.max_seq_length]]
+
+    def tokenizer(self, texts, truncation=True, max_length=None):
+        return {'input_ids': [self._token_ids(text) for text in texts]}
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        vectors = np.zeros((len(texts), self.table.shape[1]), dtype=np.float32)
+        for i, text in enumerate(texts):
+            ids = self._token_ids(text)
+            if ids:
+                vectors[i] = self.table[ids].mean(axis=0)
+        return vectors
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def get_corpus(data_dir, n_rows, profile, seed):
+    """Chemin du corpus synthétique de n_rows avis (généré au premier appel)"""
+    path = os.path.join(data_dir, f'reviews_{n_rows}_seed{seed}.csv')
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        write_reviews_csv(path, n_rows, profile, seed=seed)
+    return path
+
+
+def pipeline_stop_words():
+    """Mots vides du pipeline (NLTK), ou ceux de scikit-learn hors ligne"""
+    try:
+        return get_stop_words('nltk'), 'nltk'
+    except LookupError:
+        return get_stop_words('sklearn'), 'sklearn'
+
+
+def run_size(path, repeat, lda_rows, embed_rows, stop_words):
+    """
+    Chronomètre toutes les étapes sur un corpus
+
+    Returns:
+        tuple: ({étape: seconds, rows, repeat}, {étape: raison de l'omission})
+    """
+    results, skipped = {}, {}
+
+    def measure(stage, func, rows, n_repeat=repeat):
+        try:
+            seconds, value = best_of(func, n_repeat)
+        except LookupError:
+            # Ressource NLTK absente (pas de téléchargement pendant les benchmarks)
+            skipped[stage] = "données NLTK manquantes"
+            return None
+        results[stage] = {'seconds': seconds, 'rows': rows, 'repeat': n_repeat}
+        print(f"  {stage:<28} {seconds * 1e3:>12.1f} ms" + (f"  ({rows} lignes)" if rows is not None else ""))
+        return value
+
+    # Conversion CSV -> store colonnaire au premier chargement, puis lecture mappée
+    store_path = get_store_path(path)
+    if os.path.exists(store_path):
+        os.remove(store_path)
+    measure('load_data_csv', lambda: load_data(path), None, n_repeat=1)
+    df = measure('load_data', lambda: load_data(path), None)
+    n_rows = len(df)
+    for stage in ('load_data_csv', 'load_data'):
+        results[stage]['rows'] = n_rows
+
+    measure('get_data_ranges', lambda: get_data_ranges(df), n_rows)
+    measure('filter_data', lambda: filter_data(df, *FILTERS), n_rows)
+    index = measure('build_filter_index', lambda: build_filter_index(df), n_rows, n_repeat=1)
+    measure('filter_data_index', lambda: filter_data(df, *FILTERS, index=index), n_rows)
+
+    texts = df['description-text']
+    measure('clean_text_app', lambda: texts.map(utils.clean_text), n_rows, n_repeat=1)
+    clean = measure('clean_series', lambda: clean_series(texts, stop_words=stop_words), n_rows, n_repeat=1)
+    measure('vader_score_texts', lambda: score_texts(clean), n_rows, n_repeat=1)
+
+    lda_df = df.iloc[:lda_rows].dropna(subset=['clean_review'])
+    lda_texts = lda_df['clean_review'].tolist()
+    lda_model, vectorizer, doc_topics = measure(
+        'run_lda_analysis', lambda: run_lda_analysis(lda_texts, n_topics=6, top_k=3), len(lda_texts), n_repeat=1)
+    measure('extract_lda_topics', lambda: extract_lda_topics(lda_model, vectorizer, n_words=10), len(lda_texts))
+    measure('assign_topics_to_documents', lambda: assign_topics_to_documents(lda_df, doc_topics), len(lda_texts))
+
+    model = StubEmbeddingModel()
+    embed_texts = texts.iloc[:embed_rows].fillna('').tolist()
+    measure('encode_texts_stub', lambda: encode_texts(model, embed_texts), len(embed_texts), n_repeat=1)
+    return results, skipped
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_info(stop_words_source, seed):
+    import pyarrow
+    import sklearn
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'versions': {'numpy': np.__version__, 'pandas': pd.__version__, 'pyarrow': pyarrow.__version__,
+                     'scikit-learn': sklearn.__version__},
+        'stop_words': stop_words_source,
+        'seed': seed,
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, min_delta=MIN_DELTA_SECONDS):
+    """
+    Compare des résultats à une référence, étape par étape
+
+    Une étape régresse si elle est plus lente de plus de tolerance (relatif)
+    et de plus de min_delta secondes ; les étapes absentes d'un côté sont ignorées.
+
+    Returns:
+        list de dict: size, stage, baseline, current, ratio, status ('regression', 'improvement', 'ok')
+    """
+    rows = []
+    for size, stages in results['results'].items():
+        for stage, current in stages.items():
+            reference = baseline.get('results', {}).get(size, {}).get(stage)
+            if reference is None or reference['rows'] != current['rows']:
+                continue
+            delta = current['seconds'] - reference['seconds']
+            ratio = current['seconds'] / reference['seconds'] if reference['seconds'] else float('inf')
+            if ratio > 1 + tolerance and delta > min_delta:
+                status = 'regression'
+            elif ratio < 1 / (1 + tolerance) and -delta > min_delta:
+                status = 'improvement'
+            else:
+                status = 'ok'
+            rows.append({'size': size, 'stage': stage, 'baseline': reference['seconds'],
+                         'current': current['seconds'], 'ratio': ratio, 'status': status})
+    return rows
+
+
+def print_comparison(rows):
+    print(f"\n{'lignes':>8} {'étape':<28} {'référence (ms)':>15} {'actuel (ms)':>12} {'ratio':>7}  statut")
+    for row in rows:
+        print(f"{row['size']:>8} {row['stage']:<28} {row['baseline'] * 1e3:>15.1f} {row['current'] * 1e3:>12.1f} "
+              f"{row['ratio']:>6.2f}x  {row['status']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3, help="essais des étapes rapides (meilleur temps retenu)")
+    # LDA (batch) : ~40 s pour 10k avis synthétiques, ~10 min pour 100k
+    parser.add_argument('--lda-rows', type=int, default=10_000, help="avis au plus pour l'entraînement LDA")
+    parser.add_argument('--embed-rows', type=int, default=20_000, help="avis au plus pour l'encodage")
+    parser.add_argument('--data-dir', default=os.path.join('benchmarks', '.data'), help="corpus générés")
+    parser.add_argument('--source', default='data/reviews_cleaned.csv', help="avis réels servant de profil")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', help="résultats de référence (JSON) à comparer")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--fail-on-regression', action='store_true', help="code de sortie 1 en cas de régression")
+    args = parser.parse_args(argv)
+
+    stop_words, stop_words_source = pipeline_stop_words()
+    profile = load_profile(args.source)
+    results = {'meta': environment_info(stop_words_source, args.seed), 'results': {}, 'skipped': {}}
+    for n_rows in args.sizes:
+        print(f"{n_rows} avis")
+        path = get_corpus(args.data_dir, n_rows, profile, args.seed)
+        stages, skipped = run_size(path, args.repeat, args.lda_rows, args.embed_rows, stop_words)
+        results['results'][str(n_rows)] = stages
+        if skipped:
+            results['skipped'][str(n_rows)] = skipped
+            for stage, reason in skipped.items():
+                print(f"  {stage:<28} ignorée : {reason}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Résultats écrits dans {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            rows = compare(results, json.load(f), tolerance=args.tolerance)
+        print_comparison(rows)
+        regressions = [row for row in rows if row['status'] == 'regression']
+        print(f"{len(regressions)} régression(s) sur {len(rows)} étapes comparées")
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Génère des corpus d'avis synthétiques au schéma de data/reviews_cleaned.csv
+
+Les mots des avis sont tirés selon leur fréquence dans les vrais avis, et les
+colonnes Condition, Gender et Age_numeric selon leurs distributions réelles :
+le corpus a la taille voulue mais le profil de coût du jeu de données d'origine.
+Même graine, même fichier source : même corpus.
+
+Usage : python benchmarks/synthetic_reviews.py 100000 --output /tmp/avis_100k.csv
+"""
+import argparse
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.preprocessing.text_cleaner import get_stop_words
+
+SOURCE_PATH = 'data/reviews_cleaned.csv'
+COLUMNS = ['description-text', 'clean_review', 'sentiment', 'sentiment_score', 'Condition', 'Age_numeric', 'Gender']
+
+# Longueur des avis en mots (loi log-normale bornée, proche des vrais avis : médiane ~38 mots)
+LENGTH_MEDIAN = 38
+LENGTH_SIGMA = 0.7
+LENGTH_RANGE = (1, 300)
+
+NEUTRAL_SHARE = 0.25
+
+WORD_RE = re.compile(r"[a-z']+")
+
+
+def load_profile(source_path=SOURCE_PATH):
+    """
+    Profil du jeu de données réel : fréquence des mots et des valeurs de chaque colonne
+
+    Returns:
+        dict: words, word_probs, stop (mots vides), et {colonne: (valeurs, probabilités)}
+    """
+    df = pd.read_csv(source_path, usecols=['description-text', 'Condition', 'Age_numeric', 'Gender'])
+    counts = pd.Series(WORD_RE.findall(" ".join(df['description-text'].dropna().str.lower()))).value_counts()
+    words = counts.index.to_numpy(dtype=object)
+    profile = {
+        'words': words,
+        'word_probs': (counts / counts.sum()).to_numpy(),
+        'stop': np.isin(words, list(get_stop_words('sklearn'))) | (counts.index.str.len() < 3),
+    }
+    for column in ('Condition', 'Age_numeric', 'Gender'):
+        values = df[column].value_counts(normalize=True, dropna=False)
+        profile[column] = (values.index.to_numpy(dtype=object), values.to_numpy())
+    return profile
+
+
+def _join_rows(words, lengths):
+    ends = np.cumsum(lengths)
+    return [" ".join(words[end - length:end]) for end, length in zip(ends, lengths)]
+
+
+def make_reviews(n_rows, profile, seed=0):
+    """
+    Génère n_rows avis synthétiques
+
+    Args:
+        n_rows: nombre d'avis
+        profile: profil retourné par load_profile
+        seed: graine du générateur
+
+    Returns:
+        DataFrame aux colonnes de reviews_cleaned.csv
+    """
+    rng = np.random.default_rng(seed)
+    lengths = np.clip(rng.lognormal(np.log(LENGTH_MEDIAN), LENGTH_SIGMA, n_rows).astype(np.int64), *LENGTH_RANGE)
+    ids = rng.choice(len(profile['words']), size=int(lengths.sum()), p=profile['word_probs'])
+    words = profile['words'][ids]
+
+    # clean_review : les mêmes mots sans les mots vides ni les mots courts
+    keep = ~profile['stop'][ids]
+    clean_lengths = np.add.reduceat(keep.astype(np.int64), np.cumsum(lengths) - lengths) if n_rows else lengths
+
+    # Un avis sur quatre sans mot polarisé (score nul), comme dans les vrais avis
+    scores = np.clip(rng.normal(0, 0.6, n_rows), -0.99, 0.99).round(4)
+    scores[rng.random(n_rows) < NEUTRAL_SHARE] = 0.0
+    df = pd.DataFrame({
+        'description-text': [text.capitalize() + "." for text in _join_rows(words, lengths)],
+        'clean_review': _join_rows(words[keep], clean_lengths),
+        'sentiment': np.select([scores >= 0.05, scores <= -0.05], ['Positif', 'Négatif'], 'Neutre'),
+        'sentiment_score': scores,
+    })
+    for column in ('Condition', 'Age_numeric', 'Gender'):
+        values, probs = profile[column]
+        df[column] = values[rng.choice(len(values), size=n_rows, p=probs)]
+    df['Age_numeric'] = df['Age_numeric'].astype(float)
+    return df[COLUMNS]
+
+
+def write_reviews_csv(path, n_rows, profile, seed=0, chunk_size=100_000):
+    """Écrit un corpus synthétique en CSV, par morceaux (mémoire bornée pour les gros corpus)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    for i, start in enumerate(range(0, n_rows, chunk_size)):
+        chunk = make_reviews(min(chunk_size, n_rows - start), profile, seed=seed + i)
+        chunk.to_csv(tmp_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    os.replace(tmp_path, path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('n_rows', type=int)
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--source', default=SOURCE_PATH)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_reviews_csv(args.output, args.n_rows, load_profile(args.source), seed=args.seed)
@@ -0,0 +1,150 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from modules import visualization
+from modules.profiling import profiled
+
+# Nombre maximal de graphiques rendus gardés en mémoire, modifiable par variable d'environnement
+DEFAULT_MAX_CHARTS = int(os.environ.get('CHART_CACHE_MAX_CHARTS', 256))
+
+# Formats de rendu : images matplotlib (png, svg) ou JSON Plotly
+IMAGE_FORMATS = ('png', 'svg')
+
+# Type de graphique -> (fonction de construction, bibliothèque)
+CHART_BUILDERS = {
+    'countplot': (visualization.create_countplot, 'matplotlib'),
+    'boxplot': (visualization.create_boxplot, 'matplotlib'),
+    'histogram': (visualization.create_histogram, 'matplotlib'),
+    'count_barplot': (visualization.create_count_barplot, 'matplotlib'),
+    'boxplot_from_stats': (visualization.create_boxplot_from_stats, 'matplotlib'),
+    'sentiment_countplot': (visualization.create_sentiment_countplot_from_counts, 'matplotlib'),
+    'age_sentiment_boxplot': (visualization.create_age_sentiment_boxplot_from_stats, 'matplotlib'),
+    'interactive_countplot': (visualization.create_interactive_countplot, 'plotly'),
+}
+
+
+def data_fingerprint(data):
+    """
+    Empreinte des données d'un graphique (contenu, index et noms de colonnes)
+
+    Args:
+        data: DataFrame, Series, array ou structure sérialisable en JSON (ex: statistiques de boxplot)
+
+    Returns:
+        str: empreinte hexadécimale
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        names = list(data.columns) if isinstance(data, pd.DataFrame) else [data.name]
+        digest.update(repr(names).encode())
+    elif isinstance(data, np.ndarray):
+        digest.update(np.ascontiguousarray(data).tobytes())
+        digest.update(str(data.dtype).encode())
+    else:
+        digest.update(json.dumps(data, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class ChartCache:
+    """
+    Cache LRU des graphiques rendus, partagé par toutes les sessions du processus
+
+    Un graphique est identifié par (type, empreinte des données, taille, format,
+    paramètres) ; il est construit et rendu une seule fois, puis servi tel quel.
+    Les figures matplotlib sont fermées dès le rendu terminé.
+    """
+
+    def __init__(self, max_charts=DEFAULT_MAX_CHARTS):
+        self.max_charts = max_charts
+        self._charts = OrderedDict()  # clé -> bytes (png/svg) ou str (JSON Plotly)
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+    def render(self, chart_type, data, figsize=(8, 6), fmt=None, **params):
+        """
+        Retourne le rendu d'un graphique, en le construisant si nécessaire
+
+        Args:
+            chart_type: type de graphique (clé de CHART_BUILDERS)
+            data: données passées à la fonction de construction
+            figsize: taille de la figure (ignorée pour Plotly)
+            fmt: 'png' ou 'svg' pour matplotlib ; None pour le format par défaut
+            **params: autres paramètres de la fonction de construction
+
+        Returns:
+            bytes (image) pour matplotlib, str (JSON) pour Plotly
+        """
+        if chart_type not in CHART_BUILDERS:
+            raise ValueError(f"Type de graphique inconnu : {chart_type}")
+        builder, library = CHART_BUILDERS[chart_type]
+        if library == 'plotly':
+            fmt, figsize = 'json', None
+        else:
+            fmt = fmt or 'png'
+            if fmt not in IMAGE_FORMATS:
+                raise ValueError(f"Format non supporté : {fmt}")
+
+        key = (chart_type, data_fingerprint(data), tuple(figsize) if figsize else None, fmt,
+               json.dumps(params, sort_keys=True, default=str))
+        with self._lock:
+            if key in self._charts:
+                self._charts.move_to_end(key)
+                self._stats['hits'] += 1
+                return self._charts[key]
+
+        if library == 'plotly':
+            rendered = builder(data, **params).to_json()
+        else:
+            rendered = _render_figure(builder(data, figsize=figsize, **params), fmt)
+
+        with self._lock:
+            self._stats['misses'] += 1
+            self._charts[key] = rendered
+            while len(self._charts) > self.max_charts:
+                self._charts.popitem(last=False)
+                self._stats['evictions'] += 1
+        return rendered
+
+    def clear(self):
+        with self._lock:
+            self._charts.clear()
+
+    def stats(self):
+        """Succès, échecs, évictions et taille occupée par le cache"""
+        with self._lock:
+            return dict(self._stats, charts=len(self._charts),
+                        size_bytes=sum(len(chart) for chart in self._charts.values()))
+
+
+@profiled(name='render_figure')
+def _render_figure(fig, fmt):
+    """
+    Rend une figure matplotlib en octets
+
+    Les constructeurs créent leurs figures avec Figure() (hors pyplot) : rien n'est
+    à fermer, la figure est vidée après le rendu pour libérer ses artistes sans
+    attendre le ramasse-miettes.
+    """
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+# Cache unique du processus
+chart_cache = ChartCache()
+
+
+def render_chart(chart_type, data, figsize=(8, 6), fmt=None, **params):
+    """Rendu d'un graphique via le cache du processus (voir ChartCache.render)"""
+    return chart_cache.render(chart_type, data, figsize=figsize, fmt=fmt, **params)
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from modules.profiling import profile_stage
+
+# Budget mémoire par défaut des modèles chargés (en Mo), modifiable par variable d'environnement
+DEFAULT_BUDGET_MB = int(os.environ.get('MODEL_REGISTRY_BUDGET_MB', 4096))
+
+
+def path_size(path):
+    """Taille sur disque d'un fichier ou d'un répertoire (approximation de l'empreinte mémoire)"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def torch_model_size(model):
+    """Taille des paramètres d'un modèle torch (SentenceTransformer)"""
+    return sum(p.numel() * p.element_size() for p in model.parameters())
+
+
+class ModelRegistry:
+    """
+    Registre des modèles partagé par toutes les sessions du processus
+
+    Chaque modèle est chargé une seule fois à la première demande, puis servi
+    depuis le registre. Au-delà du budget mémoire, les modèles les moins
+    récemment utilisés sont évincés.
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_MB * 1024 ** 2):
+        self.budget_bytes = budget_bytes
+        self._models = OrderedDict()  # clé -> (modèle, taille estimée)
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _key_stats(self, key):
+        return self._stats.setdefault(key, {'hits': 0, 'misses': 0, 'loads': 0, 'evictions': 0,
+                                            'load_seconds': 0.0, 'size_bytes': 0})
+
+    def get(self, key, loader, size_of=None):
+        """
+        Retourne le modèle associé à la clé, en le chargeant si nécessaire
+
+        Args:
+            key: identifiant du modèle (ex: ('bertopic', 'data/bert_model_neg'))
+            loader: fonction sans argument qui charge le modèle
+            size_of: fonction estimant la taille en octets du modèle chargé
+
+        Returns:
+            le modèle chargé
+        """
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self._key_stats(key)['hits'] += 1
+                return self._models[key][0]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Un seul chargement par clé, même si plusieurs sessions la demandent en même temps
+        with key_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self._key_stats(key)['hits'] += 1
+                    return self._models[key][0]
+
+            start = time.perf_counter()
+            model = loader()
+            elapsed = time.perf_counter() - start
+            size = size_of(model) if size_of else 0
+
+            with self._lock:
+                stats = self._key_stats(key)
+                stats['misses'] += 1
+                stats['loads'] += 1
+                stats['load_seconds'] += elapsed
+                stats['size_bytes'] = size
+                self._models[key] = (model, size)
+                self._evict(keep=key)
+            return model
+
+    def _evict(self, keep):
+        """Évince les modèles les moins récemment utilisés au-delà du budget"""
+        while self.memory_bytes() > self.budget_bytes and len(self._models) > 1:
+            key = next(iter(self._models))
+            if key == keep:
+                break
+            del self._models[key]
+            self._key_stats(key)['evictions'] += 1
+
+    def memory_bytes(self):
+        """Taille estimée des modèles actuellement chargés"""
+        return sum(size for _, size in self._models.values())
+
+    def clear(self):
+        """Vide le registre (les statistiques sont conservées)"""
+        with self._lock:
+            self._models.clear()
+
+    def stats(self):
+        """
+        Statistiques du registre
+
+        Returns:
+            dict: compteurs et temps de chargement par modèle, et totaux
+        """
+        with self._lock:
+            per_model = {str(key): {**stats, 'loaded': key in self._models} for key, stats in self._stats.items()}
+            return {
+                'models': per_model,
+                'hits': sum(s['hits'] for s in self._stats.values()),
+                'misses': sum(s['misses'] for s in self._stats.values()),
+                'memory_bytes': self.memory_bytes(),
+                'budget_bytes': self.budget_bytes,
+            }
+
+
+# Registre unique du processus
+registry = ModelRegistry()
+
+
+def get_bertopic_model(path):
+    """Charge (une fois par processus) un modèle BERTopic sauvegardé"""
+    def load():
+        from bertopic import BERTopic
+        with profile_stage('BERTopic.load'):
+            return BERTopic.load(path)
+    return registry.get(('bertopic', path), load, size_of=lambda _: path_size(path))
+
+
+def get_embedding_model(model_name, backend='torch', n_threads=None):
+    """
+    Charge (une fois par processus) un modèle SentenceTransformer
+
+    Args:
+        model_name: nom du modèle
+        backend: variante du modèle (voir embedding_backend.BACKENDS)
+        n_threads: threads de calcul (None pour la valeur par défaut)
+    """
+    def load():
+        from modules.preprocessing.embedding_backend import load_sentence_transformer
+        return load_sentence_transformer(model_name, backend=backend, n_threads=n_threads)
+    # Les modèles ONNX n'exposent pas de paramètres torch : taille estimée à 0
+    size_of = torch_model_size if not backend.startswith('onnx') else None
+    return registry.get(('sentence_transformer', model_name, backend), load, size_of=size_of)
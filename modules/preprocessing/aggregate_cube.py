@@ -0,0 +1,188 @@
+import numpy as np
+
+# Dimensions du cube ; Age_numeric contient déjà des tranches d'âge (centres de tranches)
+CUBE_DIMENSIONS = ['Age_numeric', 'Gender', 'Condition', 'sentiment']
+
+# Esquisse des scores VADER (compound dans [-1, 1]) : histogramme à pas fixe de 0,05,
+# fusionnable par simple somme entre cellules
+SCORE_BIN_EDGES = np.linspace(-1.0, 1.0, 41)
+SCORE_BIN_COLUMNS = [f'score_bin_{i:02d}' for i in range(len(SCORE_BIN_EDGES) - 1)]
+
+
+def build_aggregate_cube(df):
+    """
+    Précalcule comptes, sommes et esquisses des scores par tranche d'âge, genre, condition et sentiment
+
+    Args:
+        df: DataFrame des avis
+
+    Returns:
+        DataFrame : une ligne par combinaison observée, avec 'count' et, si sentiment_score
+        est présent, 'score_count', 'score_sum' et l'histogramme des scores (SCORE_BIN_COLUMNS)
+    """
+    dimensions = [col for col in CUBE_DIMENSIONS if col in df.columns]
+    measures = {'count': ('_one', 'sum')}
+    columns = {'_one': np.ones(len(df), dtype=np.int64)}
+    if 'sentiment_score' in df.columns:
+        scores = df['sentiment_score'].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(scores)
+        bins = np.clip(np.searchsorted(SCORE_BIN_EDGES, scores, side='right') - 1, 0, len(SCORE_BIN_COLUMNS) - 1)
+        columns.update(_score_count=valid.astype(np.int64), _score=np.where(valid, scores, 0.0))
+        columns.update({f'_{name}': (valid & (bins == i)).astype(np.int64)
+                        for i, name in enumerate(SCORE_BIN_COLUMNS)})
+        measures.update(score_count=('_score_count', 'sum'), score_sum=('_score', 'sum'))
+        measures.update({name: (f'_{name}', 'sum') for name in SCORE_BIN_COLUMNS})
+    cube = (
+        df[dimensions].assign(**columns)
+        .groupby(dimensions, observed=True, dropna=False, sort=False)
+        .agg(**measures)
+    )
+    return cube.reset_index()
+
+
+def filter_cube(cube, age_range, gender_filter, condition_filter):
+    """
+    Filtre le cube avec les mêmes règles que data_filter.filter_data
+
+    Args:
+        cube: cube construit par build_aggregate_cube
+        age_range: tuple (min_age, max_age)
+        gender_filter: liste des genres à inclure
+        condition_filter: liste des conditions médicales à inclure
+
+    Returns:
+        sous-cube des cellules retenues
+    """
+    return cube[
+        (cube['Age_numeric'] >= age_range[0]) &
+        (cube['Age_numeric'] <= age_range[1]) &
+        (cube['Gender'].isin(gender_filter)) &
+        (cube['Condition'].isin(condition_filter))
+    ]
+
+
+def cube_counts(cube, column, sort=True):
+    """
+    Nombre d'avis par valeur d'une dimension (équivalent de value_counts)
+
+    Args:
+        cube: cube (ou sous-cube)
+        column: dimension à compter
+        sort: trier par compte décroissant (sinon ordre des catégories)
+
+    Returns:
+        Series des comptes non nuls
+    """
+    counts = cube.groupby(column, observed=True)['count'].sum()
+    counts = counts[counts > 0]
+    return counts.sort_values(ascending=False) if sort else counts
+
+
+def cube_total(cube):
+    """Nombre d'avis représentés par le cube"""
+    return int(cube['count'].sum())
+
+
+def cube_mean(cube, column='Age_numeric'):
+    """Moyenne d'une dimension numérique, pondérée par les comptes (NaN exclus)"""
+    valid = cube[cube[column].notna()]
+    total = valid['count'].sum()
+    return float((valid[column].astype(np.float64) * valid['count']).sum() / total) if total else float('nan')
+
+
+def cube_score_mean(cube):
+    """Score de sentiment moyen, à partir des sommes du cube (NaN si aucun score)"""
+    total = cube['score_count'].sum()
+    return float(cube['score_sum'].sum() / total) if total else float('nan')
+
+
+def cube_score_quantiles(cube, quantiles=(0.25, 0.5, 0.75)):
+    """
+    Quantiles approchés du score de sentiment, lus dans l'histogramme fusionné des cellules
+
+    L'erreur est au plus d'un pas d'histogramme (0,05) : la position est interpolée
+    linéairement dans le pas qui contient le quantile.
+
+    Returns:
+        array des quantiles (NaN si aucun score)
+    """
+    return _histogram_quantiles(cube[SCORE_BIN_COLUMNS].to_numpy().sum(axis=0), quantiles)
+
+
+def _histogram_quantiles(histogram, quantiles):
+    cumulative = np.cumsum(histogram)
+    if not len(cumulative) or cumulative[-1] == 0:
+        return np.full(len(quantiles), np.nan)
+    targets = np.asarray(quantiles, dtype=np.float64) * cumulative[-1]
+    bins = np.minimum(np.searchsorted(cumulative, targets, side='left'), len(histogram) - 1)
+    before = np.where(bins > 0, cumulative[bins - 1], 0)
+    fraction = np.divide(targets - before, histogram[bins], out=np.zeros(len(bins)), where=histogram[bins] > 0)
+    width = np.diff(SCORE_BIN_EDGES)[bins]
+    return SCORE_BIN_EDGES[bins] + fraction * width
+
+
+def _weighted_quantiles(values, weights, quantiles):
+    order = np.argsort(values)
+    values, cumulative = values[order], np.cumsum(weights[order])
+    positions = np.asarray(quantiles) * (cumulative[-1] - 1)
+    return values[np.searchsorted(cumulative, positions, side='right')]
+
+
+def cube_box_stats(cube, value_column='Age_numeric', by='sentiment'):
+    """
+    Statistiques de boîte à moustaches calculées à partir des comptes du cube
+
+    Les âges étant des tranches, les quartiles (rang inférieur) sont exacts ;
+    ils ne sont pas interpolés entre deux tranches. Pour sentiment_score, ils
+    sont lus dans l'histogramme des scores (à un pas près).
+
+    Args:
+        cube: cube (ou sous-cube)
+        value_column: dimension numérique à résumer, ou 'sentiment_score'
+        by: dimension de regroupement
+
+    Returns:
+        list de dicts au format attendu par matplotlib Axes.bxp
+    """
+    if value_column == 'sentiment_score':
+        return _score_box_stats(cube, by)
+    stats = []
+    valid = cube[cube[value_column].notna()]
+    for label, group in valid.groupby(by, observed=True):
+        values = group[value_column].to_numpy(dtype=np.float64)
+        weights = group['count'].to_numpy()
+        if weights.sum() == 0:
+            continue
+        q1, med, q3 = _weighted_quantiles(values, weights, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        inside = (values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)
+        stats.append({
+            'label': label,
+            'q1': q1, 'med': med, 'q3': q3,
+            'whislo': values[inside].min(), 'whishi': values[inside].max(),
+            'fliers': np.unique(values[~inside]),
+            'mean': float((values * weights).sum() / weights.sum()),
+        })
+    return stats
+
+
+def _score_box_stats(cube, by):
+    stats = []
+    centers = (SCORE_BIN_EDGES[:-1] + SCORE_BIN_EDGES[1:]) / 2
+    for label, group in cube.groupby(by, observed=True):
+        histogram = group[SCORE_BIN_COLUMNS].to_numpy().sum(axis=0)
+        if histogram.sum() == 0:
+            continue
+        q1, med, q3 = _histogram_quantiles(histogram, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        filled = centers[histogram > 0]
+        inside = (filled >= q1 - 1.5 * iqr) & (filled <= q3 + 1.5 * iqr)
+        stats.append({
+            'label': label,
+            'q1': q1, 'med': med, 'q3': q3,
+            'whislo': min(filled[inside].min(), q1) if inside.any() else q1,
+            'whishi': max(filled[inside].max(), q3) if inside.any() else q3,
+            'fliers': filled[~inside],
+            'mean': float(group['score_sum'].sum() / group['score_count'].sum()),
+        })
+    return stats
@@ -0,0 +1,377 @@
+"""
+Bundle d'artefacts de l'application (remplace les fichiers pickle et les listes sérialisées en chaînes)
+
+Un bundle est un répertoire contenant :
+    manifest.json   version du format, schéma et version de chaque artefact, sommes SHA-256
+    *.arrow         tables Arrow IPC (mots-clés, informations des topics BERTopic)
+    *.npy           tableaux NumPy (topics par document, index des exemples, poids des modèles LDA)
+    *.json          paramètres (hyperparamètres et vocabulaire des modèles LDA)
+
+Les fichiers sont ouverts en mémoire mappée (aucune copie) et jamais désérialisés
+avec pickle. Un bundle n'est lu et vérifié qu'une fois par processus ; il est relu
+si son manifeste a été réécrit.
+
+Usage (conversion des artefacts existants de data/) :
+    python -m modules.preprocessing.artifact_bundle migrate --data-dir data
+"""
+import argparse
+import ast
+import hashlib
+import io
+import json
+import os
+import pickle
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .topic_keywords import (
+    KEYWORDS_NAME, FORMAT_VERSION as KEYWORDS_FORMAT_VERSION, open_topic_keywords, save_topic_keywords,
+    tables_from_word_lists
+)
+
+# Artefacts produits par sentiment : label du sentiment et suffixe des fichiers BERTopic
+SENTIMENT_SPLITS = {'negative': 'Négatif', 'positive': 'Positif'}
+BERT_SUFFIXES = {'negative': 'neg', 'positive': 'pos'}
+
+BUNDLE_DIR_NAME = 'bundle'
+MANIFEST_NAME = 'manifest.json'
+BUNDLE_FORMAT_VERSION = 1
+
+# Version courante du schéma de chaque type d'artefact
+SCHEMA_VERSIONS = {
+    'topic_keywords': KEYWORDS_FORMAT_VERSION,
+    'topic_info': 1,
+    'doc_topics': 1,
+    'topic_examples': 1,
+    'lda_model': 1,
+}
+
+TOPIC_INFO_SCHEMA = pa.schema([
+    ('Topic', pa.int32()),
+    ('Count', pa.int64()),
+    ('Name', pa.string()),
+    ('Representation', pa.list_(pa.string())),
+    ('Representative_Docs', pa.list_(pa.string())),
+])
+
+# Bundles ouverts dans ce processus : chemin -> (date du manifeste, bundle)
+_open_bundles = {}
+_lock = threading.Lock()
+
+
+def get_bundle_dir(data_dir):
+    """Répertoire du bundle associé à un répertoire de données"""
+    return os.path.join(data_dir, BUNDLE_DIR_NAME)
+
+
+def _file_entry(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {'path': os.path.basename(path), 'sha256': digest.hexdigest(), 'bytes': os.path.getsize(path)}
+
+
+def _write_table(table, sink):
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _replace_file(path, write):
+    # Nouveau fichier puis renommage : les lecteurs qui ont déjà mappé l'ancien ne sont pas affectés
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+    return _file_entry(path)
+
+
+def topic_info_table(topic_info):
+    """
+    Convertit les informations des topics BERTopic (get_topic_info) en table Arrow
+
+    Representation et Representative_Docs restent des listes de chaînes.
+    """
+    columns = {}
+    for field in TOPIC_INFO_SCHEMA:
+        if field.name in topic_info.columns:
+            values = topic_info[field.name]
+            if pa.types.is_list(field.type):
+                values = values.map(lambda items: [str(item) for item in items])
+            columns[field.name] = pa.array(values.tolist(), type=field.type)
+        else:
+            columns[field.name] = pa.nulls(len(topic_info), type=field.type)
+    return pa.table(columns, schema=TOPIC_INFO_SCHEMA)
+
+
+def _write_artifact(bundle_dir, name, schema, data):
+    if schema not in SCHEMA_VERSIONS:
+        raise ValueError(f"Schéma d'artefact inconnu : {schema}")
+    files = {}
+    if isinstance(data, dict):
+        for part, value in data.items():
+            if isinstance(value, dict):
+                files[part] = _replace_file(
+                    os.path.join(bundle_dir, f'{name}.{part}.json'),
+                    lambda f, value=value: f.write(json.dumps(value, indent=2).encode('utf-8')))
+            else:
+                files[part] = _replace_file(
+                    os.path.join(bundle_dir, f'{name}.{part}.npy'),
+                    lambda f, array=value: np.save(f, np.ascontiguousarray(array), allow_pickle=False))
+    elif isinstance(data, str):
+        with open(data, 'rb') as source:
+            files['table'] = _replace_file(os.path.join(bundle_dir, f'{name}.arrow'),
+                                           lambda f: shutil.copyfileobj(source, f))
+    else:
+        if isinstance(data, pd.DataFrame):
+            data = pa.Table.from_pandas(data, preserve_index=False)
+        files['table'] = _replace_file(os.path.join(bundle_dir, f'{name}.arrow'),
+                                       lambda f, table=data: _write_table(table, f))
+    return {'schema': schema, 'schema_version': SCHEMA_VERSIONS[schema], 'files': files}
+
+
+def _write_manifest(bundle_dir, entries):
+    # Le manifeste est écrit en dernier : il ne référence que des fichiers complets
+    manifest_path = os.path.join(bundle_dir, MANIFEST_NAME)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'format_version': BUNDLE_FORMAT_VERSION, 'artifacts': entries}, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def write_bundle(bundle_dir, artifacts):
+    """
+    Écrit un bundle complet, le manifeste en dernier
+
+    Args:
+        bundle_dir: répertoire du bundle (créé si besoin)
+        artifacts: dict {nom: (schéma, données)} ; données = table Arrow ou DataFrame
+            (fichier .arrow), dict {partie: array ou dict} (un .npy ou un .json par partie) ou chemin
+            d'un fichier .arrow déjà écrit (copié)
+    """
+    os.makedirs(bundle_dir, exist_ok=True)
+    _write_manifest(bundle_dir, {name: _write_artifact(bundle_dir, name, schema, data)
+                                 for name, (schema, data) in artifacts.items()})
+
+
+def update_bundle(bundle_dir, artifacts):
+    """
+    Remplace ou ajoute des artefacts dans un bundle existant (les autres sont conservés)
+
+    Args:
+        bundle_dir: répertoire du bundle
+        artifacts: dict {nom: (schéma, données)}, comme pour write_bundle
+    """
+    entries = {}
+    if os.path.exists(os.path.join(bundle_dir, MANIFEST_NAME)):
+        entries = _read_manifest(bundle_dir, verify=False)['artifacts']
+    os.makedirs(bundle_dir, exist_ok=True)
+    for name, (schema, data) in artifacts.items():
+        entries[name] = _write_artifact(bundle_dir, name, schema, data)
+    _write_manifest(bundle_dir, entries)
+
+
+def _read_manifest(bundle_dir, verify):
+    with open(os.path.join(bundle_dir, MANIFEST_NAME), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Version du bundle non supportée : {manifest.get('format_version')} "
+                         f"(attendue : {BUNDLE_FORMAT_VERSION})")
+
+    for name, entry in manifest['artifacts'].items():
+        expected = SCHEMA_VERSIONS.get(entry['schema'])
+        if entry['schema_version'] != expected:
+            raise ValueError(f"Artefact {name} : version de schéma {entry['schema_version']} "
+                             f"non supportée (attendue : {expected})")
+        if verify:
+            for part in entry['files'].values():
+                actual = _file_entry(os.path.join(bundle_dir, part['path']))
+                if actual['sha256'] != part['sha256']:
+                    raise ValueError(f"Artefact {name} : somme de contrôle invalide pour {part['path']}")
+    return manifest
+
+
+def open_bundle(bundle_dir, verify=True):
+    """
+    Ouvre un bundle (une seule lecture et vérification par processus)
+
+    Args:
+        bundle_dir: répertoire du bundle
+        verify: vérifier les sommes SHA-256 des fichiers à la première ouverture
+
+    Returns:
+        dict: dir, manifest et artefacts déjà chargés, ou None si le bundle n'existe pas
+    """
+    manifest_path = os.path.join(bundle_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return None
+    key = os.path.realpath(bundle_dir)
+    stamp = os.stat(manifest_path).st_mtime_ns
+    with _lock:
+        cached = _open_bundles.get(key)
+        if cached is None or cached[0] != stamp:
+            bundle = {'dir': bundle_dir, 'manifest': _read_manifest(bundle_dir, verify), 'loaded': {}}
+            cached = _open_bundles[key] = (stamp, bundle)
+    return cached[1]
+
+
+def has_artifact(bundle, name):
+    """Vérifie qu'un artefact est présent dans le bundle"""
+    return bundle is not None and name in bundle['manifest']['artifacts']
+
+
+def artifact_path(bundle, name, part='table'):
+    """Chemin du fichier d'une partie d'un artefact"""
+    return os.path.join(bundle['dir'], bundle['manifest']['artifacts'][name]['files'][part]['path'])
+
+
+def _load_part(path):
+    if path.endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return np.load(path, mmap_mode='r', allow_pickle=False)
+
+
+def load_artifact(bundle, name):
+    """
+    Charge un artefact en mémoire mappée (mémorisé dans le bundle)
+
+    Returns:
+        table Arrow (artefacts .arrow) ou dict {partie: array en lecture seule ou dict} (artefacts .npy / .json)
+    """
+    with _lock:
+        if name in bundle['loaded']:
+            return bundle['loaded'][name]
+        entry = bundle['manifest']['artifacts'][name]
+        if entry['schema'] == 'topic_keywords':
+            data = open_topic_keywords(artifact_path(bundle, name))
+        elif set(entry['files']) == {'table'}:
+            data = pa.ipc.open_file(pa.memory_map(artifact_path(bundle, name), 'r')).read_all()
+        else:
+            data = {part: _load_part(artifact_path(bundle, name, part)) for part in entry['files']}
+        bundle['loaded'][name] = data
+        return data
+
+
+def read_topic_info(bundle, name):
+    """
+    Informations des topics BERTopic d'un bundle (converties une fois par processus)
+
+    Returns:
+        DataFrame (Representation et Representative_Docs sont des listes de mots / d'avis)
+    """
+    key = f'{name}:frame'
+    with _lock:
+        if key in bundle['loaded']:
+            return bundle['loaded'][key]
+    # Conversion hors du verrou (load_artifact le prend lui-même) ; la première conversion enregistrée l'emporte
+    topic_info = load_artifact(bundle, name).to_pandas()
+    for column in ('Representation', 'Representative_Docs'):
+        topic_info[column] = topic_info[column].map(lambda values: [] if values is None else list(values))
+    with _lock:
+        return bundle['loaded'].setdefault(key, topic_info)
+
+
+def parse_list_column(values):
+    """
+    Relit une colonne de listes écrites sous forme de chaînes ("['a', 'b']") dans les anciens CSV
+
+    Les valeurs sont évaluées comme des littéraux Python uniquement (ast.literal_eval).
+    """
+    return values.map(lambda value: [str(item) for item in ast.literal_eval(value)] if isinstance(value, str) else [])
+
+
+class _NoGlobalsUnpickler(pickle.Unpickler):
+    """Désérialise uniquement des types de base (listes, dict, chaînes, nombres)"""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Objet non autorisé dans l'artefact : {module}.{name}")
+
+
+def read_legacy_word_lists(path):
+    """
+    Lit l'ancien topics_keywords.pkl sans exécuter de code
+
+    Le fichier ne doit contenir que des listes de chaînes : toute référence à une
+    classe ou une fonction est refusée.
+    """
+    with open(path, 'rb') as f:
+        return _NoGlobalsUnpickler(io.BytesIO(f.read())).load()
+
+
+def migrate_legacy_artifacts(data_dir, bundle_dir=None):
+    """
+    Convertit les artefacts existants d'un répertoire de données en bundle
+
+    Les topics LDA par document sont repris de la colonne topic des
+    df_with_topics_*.csv ; leurs probabilités n'y figurent pas (poids NaN) et
+    aucun index d'exemples représentatifs n'est construit.
+
+    Args:
+        data_dir: répertoire contenant topics_keywords.pkl, topic_info_*.csv et df_with_topics_*.csv
+        bundle_dir: répertoire du bundle (par défaut data_dir/bundle)
+
+    Returns:
+        noms des artefacts écrits
+    """
+    bundle_dir = bundle_dir or get_bundle_dir(data_dir)
+    artifacts = {}
+
+    legacy_keywords = os.path.join(data_dir, 'topics_keywords.pkl')
+    keywords_path = os.path.join(bundle_dir, f'legacy_{KEYWORDS_NAME}')
+    if os.path.exists(legacy_keywords):
+        os.makedirs(bundle_dir, exist_ok=True)
+        save_topic_keywords(tables_from_word_lists(read_legacy_word_lists(legacy_keywords)), keywords_path)
+        artifacts['lda_keywords'] = ('topic_keywords', keywords_path)
+
+    for split in SENTIMENT_SPLITS:
+        path = os.path.join(data_dir, f'df_with_topics_{split}.csv')
+        if os.path.exists(path):
+            topics = pd.read_csv(path, usecols=['topic'])['topic'].to_numpy()
+            artifacts[f'lda_doc_topics_{split}'] = ('doc_topics', {
+                'topic_ids': topics.astype(np.int16).reshape(-1, 1),
+                'weights': np.full((len(topics), 1), np.nan, dtype=np.float16),
+            })
+
+    for split, suffix in BERT_SUFFIXES.items():
+        path = os.path.join(data_dir, f'topic_info_{suffix}.csv')
+        if os.path.exists(path):
+            topic_info = pd.read_csv(path)
+            for column in ('Representation', 'Representative_Docs'):
+                if column in topic_info.columns:
+                    topic_info[column] = parse_list_column(topic_info[column])
+            artifacts[f'bert_topic_info_{split}'] = ('topic_info', topic_info_table(topic_info))
+
+    write_bundle(bundle_dir, artifacts)
+    if os.path.exists(keywords_path):
+        os.remove(keywords_path)
+    return list(artifacts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bundle d'artefacts de l'application")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = subparsers.add_parser('migrate', help="convertit les artefacts pickle / CSV existants")
+    migrate_parser.add_argument('--data-dir', default='data')
+    verify_parser = subparsers.add_parser('verify', help="vérifie versions et sommes de contrôle")
+    verify_parser.add_argument('--data-dir', default='data')
+    args = parser.parse_args(argv)
+
+    if args.command == 'migrate':
+        names = migrate_legacy_artifacts(args.data_dir)
+        print(f"Bundle écrit dans {get_bundle_dir(args.data_dir)} : {', '.join(names)}")
+    else:
+        bundle = open_bundle(get_bundle_dir(args.data_dir))
+        if bundle is None:
+            raise SystemExit(f"Aucun bundle dans {get_bundle_dir(args.data_dir)}")
+        for name, entry in bundle['manifest']['artifacts'].items():
+            print(f"{name}: {entry['schema']} v{entry['schema_version']}, "
+                  f"{sum(part['bytes'] for part in entry['files'].values())} octets")
+
+
+if __name__ == '__main__':
+    main()
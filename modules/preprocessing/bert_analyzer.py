@@ -1,6 +1,10 @@
 import pandas as pd
-from bertopic import BERTopic
-from sentence_transformers import SentenceTransformer
+
+from .embedding_store import load_embedding_model, get_embeddings
+from .embedding_backend import DEFAULT_BACKEND
+from .topic_index import get_topic_rows
+
+# bertopic (et torch via sentence-transformers) n'est importé qu'à l'entraînement
 
 def prepare_bert_data(df, text_column='description-text'):
     """
@@ -17,7 +21,8 @@ def prepare_bert_data(df, text_column='description-text'):
     texts = df_cleaned[text_column].tolist()
     return df_cleaned, texts
 
-def run_bert_analysis(texts, n_topics="auto", embedding_model_name="all-MiniLM-L12-v2", verbose=True):
+def run_bert_analysis(texts, n_topics="auto", embedding_model_name="all-MiniLM-L12-v2", verbose=True,
+                      embedding_store_dir=None, embedding_backend=DEFAULT_BACKEND):
     """
     Exécute l'analyse BERTopic sur une liste de textes
     
@@ -26,11 +31,16 @@ def run_bert_analysis(texts, n_topics="auto", embedding_model_name="all-MiniLM-L
         n_topics: nombre de topics à extraire ("auto" ou nombre)
         embedding_model_name: nom du modèle d'embedding à utiliser
         verbose: afficher les informations de progression
+        embedding_store_dir: répertoire du cache d'embeddings sur disque
+            (None pour laisser BERTopic encoder tous les textes)
+        embedding_backend: variante du modèle d'embedding ('torch', 'int8', 'onnx', 'onnx-int8')
     
     Returns:
         tuple: (topic_model, topics, probabilities)
     """
-    embedding_model = SentenceTransformer(embedding_model_name)
+    from bertopic import BERTopic
+    
+    embedding_model = load_embedding_model(embedding_model_name, embedding_backend)
     
     topic_model = BERTopic(
         embedding_model=embedding_model, 
@@ -38,7 +48,13 @@ def run_bert_analysis(texts, n_topics="auto", embedding_model_name="all-MiniLM-L
         verbose=verbose
     )
     
-    topics, probs = topic_model.fit_transform(texts)
+    # Embeddings précalculés : seuls les textes absents du cache sont encodés
+    embeddings = None
+    if embedding_store_dir is not None:
+        embeddings = get_embeddings(texts, embedding_model_name, embedding_store_dir, verbose=verbose,
+                                    backend=embedding_backend)
+    
+    topics, probs = topic_model.fit_transform(texts, embeddings=embeddings)
     
     return topic_model, topics, probs
 
@@ -96,7 +112,7 @@ def assign_bert_topics_to_documents(df, topics):
     df_copy['bertopic_topic'] = topics
     return df_copy
 
-def get_bert_topic_examples(df, topic_id, text_column='description-text', n_examples=3, random_state=42):
+def get_bert_topic_examples(df, topic_id, text_column='description-text', n_examples=3, random_state=42, index=None):
     """
     Récupère des exemples d'avis pour un topic BERTopic donné
     
@@ -106,10 +122,16 @@ def get_bert_topic_examples(df, topic_id, text_column='description-text', n_exam
         text_column: colonne contenant le texte original
         n_examples: nombre d'exemples à retourner
         random_state: graine pour la reproductibilité
+        index: index d'exemples construit par build_topic_example_index (optionnel).
+            S'il est fourni, les avis les plus représentatifs sont retournés
+            au lieu d'un échantillon aléatoire.
     
     Returns:
         Series: exemples d'avis pour le topic
     """
+    if index is not None:
+        return df[text_column].iloc[get_topic_rows(index, topic_id, n_examples)].dropna()
+    
     topic_docs = df[df['bertopic_topic'] == topic_id][text_column].dropna()
     n_samples = min(n_examples, len(topic_docs))
     
@@ -1,4 +1,9 @@
-def filter_data(df, age_range, gender_filter, condition_filter):
+from modules.profiling import profiled
+
+from .filter_index import filter_rows, column_rows
+
+@profiled
+def filter_data(df, age_range, gender_filter, condition_filter, index=None):
     """
     Filtre les données selon l'âge, le genre et la condition médicale
     
@@ -7,10 +12,14 @@ def filter_data(df, age_range, gender_filter, condition_filter):
         age_range: tuple (min_age, max_age)
         gender_filter: liste des genres à inclure
         condition_filter: liste des conditions médicales à inclure
+        index: index de filtrage construit par build_filter_index (optionnel)
     
     Returns:
         DataFrame filtré
     """
+    if index is not None:
+        return df.iloc[filter_rows(index, age_range, gender_filter, condition_filter)]
+    
     filtered_df = df[
         (df['Age_numeric'] >= age_range[0]) &
         (df['Age_numeric'] <= age_range[1]) &
@@ -19,7 +28,7 @@ def filter_data(df, age_range, gender_filter, condition_filter):
     ]
     return filtered_df
 
-def get_sample_reviews(df, sentiment_type, n_samples=3, random_state=1):
+def get_sample_reviews(df, sentiment_type, n_samples=3, random_state=1, index=None):
     """
     Récupère un échantillon d'avis pour un type de sentiment donné
     
@@ -28,9 +37,13 @@ def get_sample_reviews(df, sentiment_type, n_samples=3, random_state=1):
         sentiment_type: 'Positif' ou 'Négatif'
         n_samples: nombre d'échantillons à retourner
         random_state: graine pour la reproductibilité
+        index: index de filtrage construit par build_filter_index (optionnel)
     
     Returns:
         DataFrame avec les échantillons d'avis
     """
-    avis_filtrés = df[df['sentiment'] == sentiment_type]
+    if index is not None:
+        avis_filtrés = df.iloc[column_rows(index, 'sentiment', [sentiment_type])]
+    else:
+        avis_filtrés = df[df['sentiment'] == sentiment_type]
     return avis_filtrés[['description-text', 'sentiment']].sample(n_samples, random_state=random_state)
@@ -1,8 +1,74 @@
+import json
+import os
+from collections import Counter
+
+import numpy as np
 import pandas as pd
 
-def load_data(path):
-    """Charge les données depuis un fichier CSV"""
-    return pd.read_csv(path)
+from .data_store import (
+    ensure_store,
+    load_store,
+    iter_store,
+    iter_csv_chunks,
+    apply_column_dtypes,
+    file_signature,
+    DEFAULT_CHUNK_SIZE
+)
+from modules.profiling import profiled
+
+# Statistiques tenues à jour par le rafraîchissement incrémental, à côté du CSV
+STATS_NAME = 'refresh_stats.json'
+
+@profiled
+def load_data(path, columns=None):
+    """
+    Charge les données depuis le store colonnaire associé au fichier CSV
+    
+    Le CSV n'est parsé qu'une fois : il est converti en fichier Arrow typé
+    (catégories, float32) puis relu en mémoire mappée aux appels suivants.
+    
+    Args:
+        path: chemin du fichier CSV source
+        columns: liste des colonnes à charger (None pour toutes)
+    
+    Returns:
+        DataFrame
+    """
+    store_path = ensure_store(path)
+    if store_path is None:
+        return apply_column_dtypes(pd.read_csv(path, usecols=columns))
+    return load_store(store_path, columns=columns)
+
+def get_data_version(path):
+    """
+    Version d'un fichier de données, qui change à chaque réécriture ou rafraîchissement incrémental
+    
+    Args:
+        path: chemin du fichier CSV source
+    
+    Returns:
+        tuple: signatures (taille, date de modification) du CSV et des plages écrites par le rafraîchissement
+    """
+    stats_path = os.path.join(os.path.dirname(path), STATS_NAME)
+    return tuple(tuple(file_signature(file_path) or ()) for file_path in (path, stats_path))
+
+def iter_data(path, columns=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Parcourt les données par lots, pour les corpus plus grands que la mémoire
+    
+    Args:
+        path: chemin du fichier CSV source
+        columns: liste des colonnes à charger (None pour toutes)
+        chunk_size: nombre de lignes par lot lors de la lecture du CSV
+    
+    Yields:
+        DataFrame de chaque lot
+    """
+    store_path = ensure_store(path)
+    if store_path is None:
+        yield from iter_csv_chunks(path, chunk_size, columns)
+    else:
+        yield from iter_store(store_path, columns=columns)
 
 def clean_age(df):
     """Nettoie la colonne Age en supprimant les espaces et les valeurs nulles"""
@@ -10,6 +76,7 @@ def clean_age(df):
     df = df[df['Age_numeric'].notna()]
     return df
 
+@profiled
 def get_data_ranges(df):
     """
     Récupère les plages de valeurs pour les filtres
@@ -23,7 +90,115 @@ def get_data_ranges(df):
     return {
         'age_min': int(df['Age_numeric'].min()),
         'age_max': int(df['Age_numeric'].max()),
-        'genders': df['Gender'].unique(),
-        'conditions': df['Condition'].dropna().unique()
+        'genders': np.asarray(df['Gender'].unique()),
+        'conditions': np.asarray(df['Condition'].dropna().unique())
     }
 
+def load_stored_ranges(path, n_rows):
+    """
+    Plages des filtres tenues à jour par le rafraîchissement incrémental (voir incremental.py)
+
+    Elles ne sont utilisées que si elles ont été écrites pour la version actuelle du CSV.
+
+    Args:
+        path: chemin du fichier CSV source
+        n_rows: nombre de lignes chargées
+
+    Returns:
+        dict au format de get_data_ranges, ou None si les plages sont absentes, périmées
+        ou sans âge
+    """
+    stats_path = os.path.join(os.path.dirname(path), STATS_NAME)
+    if not os.path.exists(stats_path):
+        return None
+    with open(stats_path, encoding='utf-8') as f:
+        stats = json.load(f)
+    ranges = stats.get('ranges')
+    if not ranges or stats.get('reviews_csv') != file_signature(path) or ranges['n_rows'] != n_rows:
+        return None
+    if ranges['age_min'] is None:
+        return None
+    return {
+        'age_min': int(ranges['age_min']),
+        'age_max': int(ranges['age_max']),
+        'genders': np.array([np.nan if gender is None else gender for gender in ranges['genders']], dtype=object),
+        'conditions': np.array(ranges['conditions'], dtype=object)
+    }
+
+def init_data_ranges():
+    """Accumulateur vide pour le calcul des plages de valeurs par lots"""
+    return {
+        'age_min': None,
+        'age_max': None,
+        'genders': {},
+        'conditions': {},
+        'sentiment_counts': Counter(),
+        'n_rows': 0
+    }
+
+def update_data_ranges(acc, chunk):
+    """
+    Met à jour l'accumulateur avec un lot de données (mémoire bornée)
+    
+    Args:
+        acc: accumulateur créé par init_data_ranges
+        chunk: DataFrame d'un lot
+    
+    Returns:
+        l'accumulateur mis à jour
+    """
+    acc['n_rows'] += len(chunk)
+    
+    if 'Age_numeric' in chunk.columns:
+        ages = chunk['Age_numeric'].dropna()
+        if len(ages):
+            age_min, age_max = ages.min(), ages.max()
+            acc['age_min'] = age_min if acc['age_min'] is None else min(acc['age_min'], age_min)
+            acc['age_max'] = age_max if acc['age_max'] is None else max(acc['age_max'], age_max)
+    
+    # Dictionnaires utilisés comme ensembles ordonnés (ordre de première apparition, comme unique())
+    if 'Gender' in chunk.columns:
+        for gender in chunk['Gender'].unique():
+            acc['genders'].setdefault(np.nan if pd.isna(gender) else gender, None)
+    if 'Condition' in chunk.columns:
+        for condition in chunk['Condition'].dropna().unique():
+            acc['conditions'].setdefault(condition, None)
+    if 'sentiment' in chunk.columns:
+        acc['sentiment_counts'].update(chunk['sentiment'].value_counts().to_dict())
+    
+    return acc
+
+def finalize_data_ranges(acc):
+    """
+    Convertit l'accumulateur au format retourné par get_data_ranges
+    
+    Args:
+        acc: accumulateur mis à jour par update_data_ranges
+    
+    Returns:
+        dict des plages et options pour les filtres, avec les comptes de sentiments ;
+        age_min et age_max valent None si aucun âge n'a été rencontré
+    """
+    return {
+        'age_min': None if acc['age_min'] is None else int(acc['age_min']),
+        'age_max': None if acc['age_max'] is None else int(acc['age_max']),
+        'genders': np.array(list(acc['genders']), dtype=object),
+        'conditions': np.array(list(acc['conditions']), dtype=object),
+        'sentiment_counts': {k: v for k, v in acc['sentiment_counts'].items() if v > 0},
+        'n_rows': acc['n_rows']
+    }
+
+def get_data_ranges_streaming(chunks):
+    """
+    Calcule les plages de valeurs et les comptes de sentiments en une seule passe sur des lots
+    
+    Args:
+        chunks: itérable de DataFrames (par exemple iter_data(path))
+    
+    Returns:
+        dict des plages et options pour les filtres, avec les comptes de sentiments
+    """
+    acc = init_data_ranges()
+    for chunk in chunks:
+        update_data_ranges(acc, chunk)
+    return finalize_data_ranges(acc)
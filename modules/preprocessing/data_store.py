@@ -0,0 +1,281 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+STORE_EXTENSION = '.feather'
+
+# Nombre de lignes par morceau en lecture/écriture par flux
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Les dictionnaires des colonnes catégorielles grandissent d'un morceau à l'autre (deltas)
+IPC_OPTIONS = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+
+# Types compacts appliqués aux colonnes connues du dataset
+# (Age_numeric contient des centres de tranches comme 29.5 et des NaN : float32 plutôt qu'entier)
+COLUMN_DTYPES = {
+    'Condition': 'category',
+    'Gender': 'category',
+    'sentiment': 'category',
+    'Age_numeric': 'float32',
+    'sentiment_score': 'float32',
+    'topic': 'int16',
+}
+
+
+def get_store_path(csv_path):
+    """Retourne le chemin du store colonnaire associé à un fichier CSV"""
+    return os.path.splitext(csv_path)[0] + STORE_EXTENSION
+
+
+def apply_column_dtypes(df):
+    """
+    Convertit les colonnes connues vers leurs types compacts
+
+    Args:
+        df: DataFrame brut (issu d'un CSV)
+
+    Returns:
+        DataFrame avec les types du store
+    """
+    dtypes = {col: dtype for col, dtype in COLUMN_DTYPES.items() if col in df.columns}
+    return df.astype(dtypes)
+
+
+def is_store_fresh(csv_path, store_path):
+    """Vérifie que le store existe et est plus récent que le CSV source"""
+    if not os.path.exists(store_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.path.getmtime(store_path) >= os.path.getmtime(csv_path)
+
+
+def file_signature(path):
+    """Signature (taille, date de modification en ns) d'un fichier, None s'il n'existe pas"""
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def iter_csv_chunks(csv_path, chunk_size=DEFAULT_CHUNK_SIZE, columns=None):
+    """
+    Lit un CSV par morceaux typés, sans jamais le charger en entier
+
+    Les catégories sont cumulées d'un morceau à l'autre : une valeur déjà vue
+    garde le même code, les nouvelles valeurs sont ajoutées à la fin.
+
+    Args:
+        csv_path: chemin du fichier CSV
+        chunk_size: nombre de lignes par morceau
+        columns: liste des colonnes à lire (None pour toutes)
+
+    Yields:
+        DataFrame typé de chunk_size lignes au plus
+    """
+    categories = {}
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size, usecols=columns):
+        chunk = apply_column_dtypes(chunk)
+        for column in chunk.select_dtypes('category').columns:
+            known = categories.get(column, pd.Index([], dtype=object))
+            new_values = chunk[column].cat.categories.difference(known, sort=False)
+            categories[column] = known.append(new_values)
+            chunk[column] = chunk[column].cat.set_categories(categories[column])
+        yield chunk
+
+
+def _widen_dictionary_indices(schema):
+    """Indices de dictionnaire en int32 pour que le schéma reste valide quand les catégories grandissent"""
+    fields = [
+        pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type), f.nullable)
+        if pa.types.is_dictionary(f.type) else f
+        for f in schema
+    ]
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+def convert_csv_to_store(csv_path, store_path=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Convertit un CSV en fichier Arrow IPC (Feather v2) typé et non compressé
+
+    Le CSV est lu et écrit par morceaux : la conversion tient en mémoire bornée.
+
+    Args:
+        csv_path: chemin du fichier CSV source
+        store_path: chemin du store à écrire (par défaut à côté du CSV)
+        chunk_size: nombre de lignes par morceau
+
+    Returns:
+        str: chemin du store écrit
+    """
+    store_path = store_path or get_store_path(csv_path)
+    tmp_path = f"{store_path}.{os.getpid()}.tmp"
+
+    writer, schema = None, None
+    try:
+        try:
+            for chunk in iter_csv_chunks(csv_path, chunk_size):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    schema = _widen_dictionary_indices(table.schema)
+                    writer = pa.ipc.new_file(tmp_path, schema, options=IPC_OPTIONS)
+                writer.write_table(table.cast(schema))
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if writer is None:
+            # CSV sans aucune ligne
+            return write_store(apply_column_dtypes(pd.read_csv(csv_path)), store_path)
+        os.replace(tmp_path, store_path)
+    finally:
+        # Conversion interrompue : pas de fichier temporaire orphelin à côté du store
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return store_path
+
+
+def write_store(df, store_path):
+    """
+    Écrit un DataFrame en fichier Arrow IPC (Feather v2) non compressé
+
+    Args:
+        df: DataFrame à écrire (l'index n'est pas conservé)
+        store_path: chemin du fichier à écrire
+
+    Returns:
+        str: chemin du store écrit
+    """
+    # Écriture dans un fichier temporaire puis renommage atomique (plusieurs workers Streamlit)
+    tmp_path = f"{store_path}.{os.getpid()}.tmp"
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    feather.write_feather(table, tmp_path, compression='uncompressed', chunksize=DEFAULT_CHUNK_SIZE)
+    os.replace(tmp_path, store_path)
+    return store_path
+
+
+def append_to_store(store_path, df):
+    """
+    Ajoute des lignes à la fin d'un store existant, sans relire de CSV
+
+    Les lots existants sont relus en mémoire mappée ; les dictionnaires des
+    colonnes catégorielles sont unifiés avant réécriture. Le store entier est
+    réécrit (~0,4 s pour 1M d'avis), pour que les lecteurs n'aient qu'un fichier à mapper.
+
+    Args:
+        store_path: chemin du store (créé s'il n'existe pas)
+        df: lignes à ajouter (mêmes colonnes que le store)
+
+    Returns:
+        str: chemin du store écrit
+    """
+    if not os.path.exists(store_path):
+        return write_store(apply_column_dtypes(df), store_path)
+
+    with pa.memory_map(store_path) as source:
+        existing = pa.ipc.open_file(source).read_all()
+        new = pa.Table.from_pandas(apply_column_dtypes(df[existing.column_names]), preserve_index=False)
+        table = pa.concat_tables([existing, new.cast(existing.schema)]).unify_dictionaries()
+        tmp_path = f"{store_path}.{os.getpid()}.tmp"
+        feather.write_feather(table, tmp_path, compression='uncompressed', chunksize=DEFAULT_CHUNK_SIZE)
+    os.replace(tmp_path, store_path)
+    return store_path
+
+
+def append_to_csv(csv_path, df):
+    """
+    Ajoute des lignes à la fin d'un CSV et de son store colonnaire
+
+    Les colonnes sont écrites dans l'ordre de l'en-tête du fichier existant.
+    Le store n'est mis à jour que s'il était à jour (sinon il sera reconverti au prochain chargement).
+
+    Args:
+        csv_path: chemin du CSV (créé avec en-tête s'il n'existe pas)
+        df: lignes à ajouter
+    """
+    store_path = get_store_path(csv_path)
+    store_fresh = os.path.exists(csv_path) and is_store_fresh(csv_path, store_path)
+    if os.path.exists(csv_path):
+        columns = pd.read_csv(csv_path, nrows=0).columns
+        df[columns].to_csv(csv_path, mode='a', header=False, index=False)
+    else:
+        df.to_csv(csv_path, index=False)
+    if store_fresh:
+        append_to_store(store_path, df)
+
+
+def ensure_store(csv_path):
+    """
+    Garantit l'existence d'un store à jour pour un CSV et retourne son chemin
+
+    Args:
+        csv_path: chemin du fichier CSV source
+
+    Returns:
+        str: chemin du store, ou None s'il ne peut pas être écrit
+    """
+    store_path = get_store_path(csv_path)
+    if is_store_fresh(csv_path, store_path):
+        return store_path
+    try:
+        return convert_csv_to_store(csv_path, store_path)
+    except OSError:
+        # Répertoire en lecture seule : on retombera sur le CSV
+        return None
+
+
+def load_store(store_path, columns=None):
+    """
+    Charge un store colonnaire en mémoire mappée
+
+    Le mappage évite de parser ou de lire tout le fichier : seules les colonnes
+    demandées sont touchées. Le DataFrame n'est pas pour autant sans copie : les
+    catégories sont décodées en mémoire et, avec pandas < 3, les textes sont
+    copiés en objets Python. Avec pandas >= 3, les textes (chaînes Arrow) et les
+    colonnes numériques sans valeur nulle restent adossés au fichier mappé.
+
+    Args:
+        store_path: chemin du fichier Feather
+        columns: liste des colonnes à lire (None pour toutes)
+
+    Returns:
+        DataFrame avec les colonnes demandées
+    """
+    table = feather.read_table(store_path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def iter_store(store_path, columns=None):
+    """
+    Parcourt un store colonnaire lot par lot, en mémoire mappée
+
+    Args:
+        store_path: chemin du fichier Feather
+        columns: liste des colonnes à lire (None pour toutes)
+
+    Yields:
+        DataFrame de chaque lot du fichier
+    """
+    with pa.memory_map(store_path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            table = pa.Table.from_batches([reader.get_batch(i)])
+            if columns is not None:
+                table = table.select(columns)
+            yield table.to_pandas()
+
+
+def hash_texts(texts):
+    """
+    Empreinte 64 bits du contenu de chaque texte (stable d'une exécution à l'autre)
+
+    Args:
+        texts: Series (ou liste) de textes
+
+    Returns:
+        array uint64 des empreintes
+    """
+    texts = pd.Series(texts) if not isinstance(texts, pd.Series) else texts
+    return pd.util.hash_pandas_object(texts.fillna("").astype(str), index=False).to_numpy()
@@ -0,0 +1,141 @@
+"""
+Encodage des textes sur CPU avec SentenceTransformer
+
+Variantes du modèle (backend) :
+    torch      modèle par défaut (float32)
+    int8       couches linéaires quantifiées dynamiquement en int8 (torch)
+    onnx       export ONNX exécuté par onnxruntime
+    onnx-int8  export ONNX quantifié int8, fourni avec les modèles sentence-transformers
+
+Les textes sont regroupés par longueur en lots d'un nombre de tokens borné :
+les textes courts partent en gros lots, les longs en petits, avec peu de padding.
+"""
+import os
+
+import numpy as np
+
+BACKENDS = ('torch', 'int8', 'onnx', 'onnx-int8')
+
+# Valeurs par défaut, modifiables par variables d'environnement
+DEFAULT_BACKEND = os.environ.get('EMBEDDING_BACKEND', 'torch')
+DEFAULT_THREADS = int(os.environ['EMBEDDING_THREADS']) if os.environ.get('EMBEDDING_THREADS') else None
+
+# Fichier ONNX quantifié (AVX2) publié avec all-MiniLM-L12-v2
+ONNX_INT8_FILE = os.environ.get('EMBEDDING_ONNX_INT8_FILE', 'onnx/model_quint8_avx2.onnx')
+
+
+def set_thread_count(n_threads):
+    """Fixe le nombre de threads de calcul de torch pour le processus courant"""
+    import torch
+    torch.set_num_threads(n_threads)
+
+
+def _onnx_model_kwargs(n_threads, file_name=None):
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    if n_threads:
+        options.intra_op_num_threads = n_threads
+        options.inter_op_num_threads = 1
+    kwargs = {'provider': 'CPUExecutionProvider', 'session_options': options}
+    if file_name:
+        kwargs['file_name'] = file_name
+    return kwargs
+
+
+def load_sentence_transformer(model_name, backend='torch', n_threads=None, max_seq_length=None):
+    """
+    Charge un modèle SentenceTransformer pour le CPU dans la variante demandée
+
+    Args:
+        model_name: nom du modèle (ex: 'all-MiniLM-L12-v2')
+        backend: une des valeurs de BACKENDS
+        n_threads: threads de calcul (None pour la valeur par défaut de la bibliothèque)
+        max_seq_length: longueur maximale des séquences en tokens (None pour celle du modèle)
+
+    Returns:
+        modèle SentenceTransformer
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend d'embedding inconnu : {backend}. Disponibles : {', '.join(BACKENDS)}")
+    if n_threads:
+        set_thread_count(n_threads)
+
+    if backend in ('onnx', 'onnx-int8'):
+        file_name = ONNX_INT8_FILE if backend == 'onnx-int8' else None
+        model = SentenceTransformer(model_name, device='cpu', backend='onnx',
+                                    model_kwargs=_onnx_model_kwargs(n_threads, file_name))
+    else:
+        model = SentenceTransformer(model_name, device='cpu')
+        if backend == 'int8':
+            import torch
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if max_seq_length:
+        model.max_seq_length = max_seq_length
+    return model
+
+
+def token_lengths(model, texts):
+    """Nombre de tokens de chaque texte après troncature à max_seq_length"""
+    encoded = model.tokenizer(list(texts), truncation=True, max_length=model.max_seq_length)
+    return np.fromiter((len(ids) for ids in encoded['input_ids']), dtype=np.int64, count=len(texts))
+
+
+def make_length_batches(lengths, max_tokens, max_batch_size=256):
+    """
+    Découpe les textes en lots de longueur homogène
+
+    Les textes sont triés par longueur décroissante ; un lot grossit tant que
+    (nombre de textes × longueur du plus long) reste sous max_tokens.
+
+    Args:
+        lengths: longueur (en tokens) de chaque texte
+        max_tokens: nombre maximal de tokens par lot, padding compris
+        max_batch_size: nombre maximal de textes par lot
+
+    Returns:
+        list d'arrays de positions (une par lot)
+    """
+    order = np.argsort(-np.asarray(lengths), kind='stable')
+    batches, start = [], 0
+    while start < len(order):
+        padded_length = max(int(lengths[order[start]]), 1)
+        size = max(1, min(max_batch_size, max_tokens // padded_length))
+        batches.append(order[start:start + size])
+        start += size
+    return batches
+
+
+def encode_texts(model, texts, max_tokens=None, max_batch_size=256, show_progress_bar=False):
+    """
+    Encode les textes par lots de longueur homogène
+
+    Args:
+        model: modèle SentenceTransformer
+        texts: liste des textes
+        max_tokens: tokens par lot (par défaut 64 séquences de longueur maximale,
+            soit la même mémoire que l'encodage standard par lots de 64)
+        max_batch_size: nombre maximal de textes par lot
+        show_progress_bar: afficher la progression (par lot)
+
+    Returns:
+        array float32 (n_textes × dimension), dans l'ordre des textes
+    """
+    texts = list(texts)
+    if max_tokens is None:
+        max_tokens = 64 * model.max_seq_length
+    batches = make_length_batches(token_lengths(model, texts), max_tokens, max_batch_size)
+    if show_progress_bar:
+        from tqdm import tqdm
+        batches = tqdm(batches, desc="Encodage")
+
+    embeddings = None
+    for batch in batches:
+        vectors = model.encode([texts[i] for i in batch], batch_size=len(batch), convert_to_numpy=True)
+        if embeddings is None:
+            embeddings = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+        embeddings[batch] = vectors
+    return embeddings if embeddings is not None else np.empty((0, 0), dtype=np.float32)
@@ -0,0 +1,121 @@
+import json
+import os
+import re
+
+import numpy as np
+
+from modules.model_registry import get_embedding_model
+from .data_store import hash_texts
+from .embedding_backend import DEFAULT_BACKEND, DEFAULT_THREADS, encode_texts
+
+VECTORS_NAME = 'vectors.f16'
+KEYS_NAME = 'keys.npy'
+META_NAME = 'meta.json'
+
+
+def load_embedding_model(model_name, backend=DEFAULT_BACKEND):
+    """Charge un modèle SentenceTransformer une seule fois par processus (via le registre de modèles)"""
+    return get_embedding_model(model_name, backend=backend, n_threads=DEFAULT_THREADS)
+
+
+def get_store_name(model_name, backend=DEFAULT_BACKEND):
+    """Nom du store d'un modèle : les variantes quantifiées ont leurs propres vecteurs"""
+    return model_name if backend == 'torch' else f"{model_name}@{backend}"
+
+
+def get_model_dir(store_dir, model_name):
+    """Répertoire du store propre à un modèle d'embedding"""
+    return os.path.join(store_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name))
+
+
+def _read_meta(model_dir):
+    meta_path = os.path.join(model_dir, META_NAME)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def open_store(store_dir, model_name):
+    """
+    Ouvre le store d'embeddings d'un modèle en mémoire mappée
+
+    Args:
+        store_dir: répertoire racine du store
+        model_name: nom du modèle d'embedding
+
+    Returns:
+        tuple: (clés uint64, vecteurs float16 mappés) ou (None, None) si le store est vide
+    """
+    model_dir = get_model_dir(store_dir, model_name)
+    meta = _read_meta(model_dir)
+    if meta is None or meta['count'] == 0:
+        return None, None
+
+    keys = np.load(os.path.join(model_dir, KEYS_NAME))[:meta['count']]
+    vectors = np.memmap(os.path.join(model_dir, VECTORS_NAME), dtype=np.float16, mode='r',
+                        shape=(meta['count'], meta['dim']))
+    return keys, vectors
+
+
+def _append_vectors(model_dir, model_name, keys, new_keys, new_vectors):
+    """Ajoute des vecteurs en fin de fichier puis met à jour les clés et les métadonnées"""
+    os.makedirs(model_dir, exist_ok=True)
+    # Les vecteurs sont écrits avant les clés : un arrêt brutal laisse un store cohérent,
+    # et un ajout interrompu (vecteurs sans clés) est écarté par la troncature
+    n_known = 0 if keys is None else len(keys)
+    with open(os.path.join(model_dir, VECTORS_NAME), 'ab') as f:
+        f.truncate(n_known * new_vectors.shape[1] * np.dtype(np.float16).itemsize)
+        f.write(np.ascontiguousarray(new_vectors, dtype=np.float16).tobytes())
+
+    all_keys = new_keys if keys is None else np.concatenate([keys, new_keys])
+    np.save(os.path.join(model_dir, KEYS_NAME), all_keys)
+
+    meta = {'model': model_name, 'dim': int(new_vectors.shape[1]), 'count': int(len(all_keys))}
+    tmp_path = os.path.join(model_dir, f"{META_NAME}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(model_dir, META_NAME))
+
+
+def get_embeddings(texts, model_name, store_dir, batch_size=64, verbose=False, backend=DEFAULT_BACKEND):
+    """
+    Retourne les embeddings des textes en n'encodant que ceux absents du store
+
+    Args:
+        texts: liste des textes
+        model_name: nom du modèle SentenceTransformer
+        store_dir: répertoire racine du store
+        batch_size: taille des batchs d'encodage pour des séquences de longueur maximale
+            (les textes plus courts sont regroupés en lots plus grands)
+        verbose: afficher la progression de l'encodage
+        backend: variante du modèle (voir embedding_backend.BACKENDS)
+
+    Returns:
+        array float32 (n_textes × dimension)
+    """
+    store_name = get_store_name(model_name, backend)
+    model_dir = get_model_dir(store_dir, store_name)
+    hashes = hash_texts(texts)
+    keys, vectors = open_store(store_dir, store_name)
+    if len(hashes) == 0:
+        # Dimension du store, ou du modèle si le store n'existe pas encore
+        if keys is not None:
+            return np.empty((0, vectors.shape[1]), dtype=np.float32)
+        dim = load_embedding_model(model_name, backend).get_sentence_embedding_dimension()
+        return np.empty((0, dim), dtype=np.float32)
+
+    known = np.zeros(len(hashes), dtype=bool) if keys is None else np.isin(hashes, keys)
+    if not known.all():
+        new_keys, first_rows = np.unique(hashes[~known], return_index=True)
+        missing_positions = np.flatnonzero(~known)[first_rows]
+        model = load_embedding_model(model_name, backend)
+        new_vectors = encode_texts(model, [texts[i] for i in missing_positions],
+                                   max_tokens=batch_size * model.max_seq_length, show_progress_bar=verbose)
+        _append_vectors(model_dir, store_name, keys, new_keys, new_vectors)
+        keys, vectors = open_store(store_dir, store_name)
+
+    # Position de chaque empreinte dans le store
+    order = np.argsort(keys, kind='stable')
+    rows = order[np.searchsorted(keys, hashes, sorter=order)]
+    return np.asarray(vectors[rows], dtype=np.float32)
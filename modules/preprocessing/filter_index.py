@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+# Colonnes catégorielles indexées par bitmap
+BITMAP_COLUMNS = ['Gender', 'Condition', 'sentiment']
+
+# Clé utilisée pour le bitmap des valeurs manquantes
+NA_KEY = None
+
+
+def _pack(mask):
+    """Compacte un masque booléen en bitmap (1 bit par ligne)"""
+    return np.packbits(mask)
+
+
+def _build_column_bitmaps(values):
+    """
+    Construit un bitmap par valeur distincte d'une colonne
+
+    Args:
+        values: Series de la colonne à indexer
+
+    Returns:
+        dict: {valeur: bitmap compacté}, les NaN sous la clé NA_KEY
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    bitmaps = {value: _pack(codes == code) for code, value in enumerate(uniques)}
+    if (codes == -1).any():
+        bitmaps[NA_KEY] = _pack(codes == -1)
+    return bitmaps
+
+
+def build_filter_index(df):
+    """
+    Construit l'index de filtrage une fois au chargement des données
+
+    Args:
+        df: DataFrame des avis
+
+    Returns:
+        dict contenant les bitmaps par catégorie et le tableau trié des âges
+    """
+    index = {'n_rows': len(df), 'bitmaps': {}}
+
+    for column in BITMAP_COLUMNS:
+        if column in df.columns:
+            index['bitmaps'][column] = _build_column_bitmaps(df[column])
+
+    if 'Age_numeric' in df.columns:
+        ages = df['Age_numeric'].to_numpy(dtype=np.float64)
+        valid_rows = np.flatnonzero(~np.isnan(ages))
+        order = valid_rows[np.argsort(ages[valid_rows], kind='stable')]
+        index['age_order'] = order
+        index['age_sorted'] = ages[order]
+
+    return index
+
+
+def _empty_bitmap(index):
+    return np.zeros((index['n_rows'] + 7) // 8, dtype=np.uint8)
+
+
+def column_bitmap(index, column, values):
+    """
+    Bitmap des lignes dont la colonne prend une des valeurs données (équivalent de isin)
+
+    Args:
+        index: index construit par build_filter_index
+        column: colonne indexée
+        values: liste des valeurs à garder
+
+    Returns:
+        bitmap compacté
+    """
+    bitmaps = index['bitmaps'][column]
+    result = _empty_bitmap(index)
+    for value in values:
+        key = NA_KEY if pd.isna(value) else value
+        bitmap = bitmaps.get(key)
+        if bitmap is not None:
+            np.bitwise_or(result, bitmap, out=result)
+    return result
+
+
+def age_bitmap(index, age_range):
+    """
+    Bitmap des lignes dont l'âge est compris dans l'intervalle (bornes incluses)
+
+    Args:
+        index: index construit par build_filter_index
+        age_range: tuple (min_age, max_age)
+
+    Returns:
+        bitmap compacté
+    """
+    age_sorted = index['age_sorted']
+    start = np.searchsorted(age_sorted, age_range[0], side='left')
+    stop = np.searchsorted(age_sorted, age_range[1], side='right')
+
+    mask = np.zeros(index['n_rows'], dtype=bool)
+    mask[index['age_order'][start:stop]] = True
+    return _pack(mask)
+
+
+def bitmap_to_rows(index, bitmap):
+    """Convertit un bitmap en positions de lignes (utilisables avec iloc)"""
+    return np.flatnonzero(np.unpackbits(bitmap, count=index['n_rows']))
+
+
+def filter_bitmap(index, age_range, gender_filter, condition_filter):
+    """
+    Bitmap des lignes correspondant aux filtres d'âge, de genre et de condition
+
+    Args:
+        index: index construit par build_filter_index
+        age_range: tuple (min_age, max_age)
+        gender_filter: liste des genres à inclure
+        condition_filter: liste des conditions médicales à inclure
+
+    Returns:
+        bitmap compacté (1 bit par ligne)
+    """
+    bitmap = column_bitmap(index, 'Gender', gender_filter)
+    np.bitwise_and(bitmap, column_bitmap(index, 'Condition', condition_filter), out=bitmap)
+    np.bitwise_and(bitmap, age_bitmap(index, age_range), out=bitmap)
+    return bitmap
+
+
+def filter_rows(index, age_range, gender_filter, condition_filter):
+    """Positions des lignes correspondant aux filtres (voir filter_bitmap)"""
+    return bitmap_to_rows(index, filter_bitmap(index, age_range, gender_filter, condition_filter))
+
+
+def column_rows(index, column, values):
+    """Positions des lignes dont la colonne prend une des valeurs données"""
+    return bitmap_to_rows(index, column_bitmap(index, column, values))
@@ -0,0 +1,378 @@
+"""
+Rafraîchissement incrémental des artefacts à partir d'un nouveau dump d'avis
+
+Chaque avis brut est identifié par une empreinte de son contenu (texte,
+condition, âge, genre) ; seuls les avis absents du dernier état sont nettoyés,
+scorés et assignés aux topics avec les modèles existants (sans réentraînement ;
+les modèles LDA entraînés en ligne peuvent intégrer les nouveaux avis).
+Les sorties lues par l'application (CSV, stores, bundle) sont complétées en
+place et les statistiques (plages des filtres, comptes par topic) sont mises
+à jour à partir de leur accumulateur.
+
+Les avis retirés du dump sont seulement comptés : une exécution complète du
+pipeline reconstruit tout (et réinitialise l'état du rafraîchissement).
+
+Usage :
+    python -m modules.preprocessing.incremental nouveau_dump.csv --output-dir data --work-dir artifacts
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from .pipeline import (
+    load_raw_reviews, clean_reviews, score_reviews, SENTIMENT_SPLITS, BERT_SUFFIXES, LDA_MODEL_SUFFIX, DEFAULT_PARAMS,
+    MANIFEST_NAME as PIPELINE_MANIFEST_NAME
+)
+from .topic_keywords import KEYWORDS_NAME
+from .data_store import write_store, load_store, append_to_csv, file_signature
+from .data_loader import init_data_ranges, update_data_ranges, finalize_data_ranges, STATS_NAME
+
+# Colonnes brutes qui identifient un avis
+KEY_COLUMNS = ['description-text', 'Condition', 'Age_numeric', 'Gender']
+
+STATE_DIR_NAME = 'refresh'
+STATE_NAME = 'refresh_state.json'
+HASHES_NAME = 'review_hashes.npy'
+
+# Étapes du pipeline dont dépend l'état : s'il les réexécute, l'état est reconstruit
+BASE_STAGES = ('score', 'lda')
+
+
+def hash_reviews(df):
+    """
+    Empreinte 64 bits de chaque avis brut (stable d'une exécution à l'autre)
+
+    Args:
+        df: DataFrame retourné par load_raw_reviews
+
+    Returns:
+        array uint64 des empreintes
+    """
+    return pd.util.hash_pandas_object(df[KEY_COLUMNS].astype(str), index=False).to_numpy()
+
+
+def _state_dir(work_dir):
+    return os.path.join(work_dir, STATE_DIR_NAME)
+
+
+def _base_fingerprints(work_dir, output_dir):
+    """
+    Empreintes des étapes du pipeline et signature du CSV exporté sur lesquels l'état a été construit
+
+    Un export du pipeline réécrit le CSV (sans les avis ajoutés depuis) : l'état est alors reconstruit.
+    """
+    path = os.path.join(work_dir, PIPELINE_MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    base = {stage: manifest.get(stage, {}).get('fingerprint') for stage in BASE_STAGES}
+    base['reviews_csv'] = file_signature(os.path.join(output_dir, 'reviews_cleaned.csv'))
+    return base
+
+
+def _serialize_ranges(acc):
+    # NaN (genre manquant) n'est pas une clé JSON : écrit comme null
+    return {
+        'age_min': None if acc['age_min'] is None else float(acc['age_min']),
+        'age_max': None if acc['age_max'] is None else float(acc['age_max']),
+        'genders': [None if pd.isna(gender) else str(gender) for gender in acc['genders']],
+        'conditions': [str(condition) for condition in acc['conditions']],
+        'sentiment_counts': {str(k): int(v) for k, v in acc['sentiment_counts'].items()},
+        'n_rows': int(acc['n_rows']),
+    }
+
+
+def _deserialize_ranges(data):
+    acc = init_data_ranges()
+    acc['age_min'], acc['age_max'], acc['n_rows'] = data['age_min'], data['age_max'], data['n_rows']
+    acc['genders'] = {np.nan if gender is None else gender: None for gender in data['genders']}
+    acc['conditions'] = dict.fromkeys(data['conditions'])
+    acc['sentiment_counts'] = Counter(data['sentiment_counts'])
+    return acc
+
+
+def _count_topics(counts, topics):
+    for topic, count in pd.Series(topics).value_counts().items():
+        counts[str(topic)] = counts.get(str(topic), 0) + int(count)
+    return counts
+
+
+def bootstrap_state(work_dir, output_dir):
+    """
+    Construit l'état du rafraîchissement à partir des artefacts d'une exécution complète du pipeline
+
+    Returns:
+        tuple: (état, empreintes triées des avis connus)
+    """
+    required = ['loaded.feather', 'scored.feather'] + [f'lda_{split}.feather' for split in SENTIMENT_SPLITS]
+    missing = [name for name in required if not os.path.exists(os.path.join(work_dir, name))]
+    if missing:
+        raise FileNotFoundError(f"Artefacts du pipeline manquants dans {work_dir} ({', '.join(missing)}) : "
+                                "lancez d'abord une exécution complète du pipeline")
+
+    hashes = np.unique(hash_reviews(load_store(os.path.join(work_dir, 'loaded.feather'))))
+    acc = update_data_ranges(init_data_ranges(), load_store(os.path.join(work_dir, 'scored.feather'),
+                                                            columns=['Age_numeric', 'Gender', 'Condition',
+                                                                     'sentiment']))
+    topic_counts = {
+        split: _count_topics({}, load_store(os.path.join(work_dir, f'lda_{split}.feather'), columns=['topic'])['topic'])
+        for split in SENTIMENT_SPLITS
+    }
+    state = {
+        'base': _base_fingerprints(work_dir, output_dir),
+        'ranges': _serialize_ranges(acc),
+        'lda_topic_counts': topic_counts,
+        'n_deltas': 0,
+        'history': [],
+    }
+    return state, hashes
+
+
+def load_state(work_dir, output_dir):
+    """
+    Charge l'état du rafraîchissement (reconstruit si le pipeline a été réexécuté ou exporté depuis)
+
+    Returns:
+        tuple: (état, empreintes triées des avis connus)
+    """
+    state_path = os.path.join(_state_dir(work_dir), STATE_NAME)
+    hashes_path = os.path.join(_state_dir(work_dir), HASHES_NAME)
+    if os.path.exists(state_path) and os.path.exists(hashes_path):
+        with open(state_path, encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('base') == _base_fingerprints(work_dir, output_dir):
+            return state, np.load(hashes_path)
+    return bootstrap_state(work_dir, output_dir)
+
+
+def save_state(work_dir, state, hashes):
+    """Écrit l'état et les empreintes (remplacement atomique de chaque fichier)"""
+    state_dir = _state_dir(work_dir)
+    os.makedirs(state_dir, exist_ok=True)
+    tmp_path = os.path.join(state_dir, f'{HASHES_NAME}.{os.getpid()}.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, hashes)
+    os.replace(tmp_path, os.path.join(state_dir, HASHES_NAME))
+    tmp_path = os.path.join(state_dir, f'{STATE_NAME}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, os.path.join(state_dir, STATE_NAME))
+
+
+def find_new_reviews(hashes, known_hashes):
+    """
+    Détecte les avis ajoutés et retirés par rapport aux avis connus
+
+    Args:
+        hashes: empreintes des avis du nouveau dump
+        known_hashes: empreintes triées des avis déjà traités
+
+    Returns:
+        tuple: (masque des nouveaux avis, une seule occurrence par doublon ; nombre d'avis retirés)
+    """
+    is_new = ~np.isin(hashes, known_hashes)
+    _, first = np.unique(hashes, return_index=True)
+    is_first = np.zeros(len(hashes), dtype=bool)
+    is_first[first] = True
+    n_removed = int((~np.isin(known_hashes, hashes)).sum())
+    return is_new & is_first, n_removed
+
+
+def _lda_model_path(work_dir, state, split):
+    """Modèle LDA courant : celui du pipeline, ou sa version mise à jour par un rafraîchissement"""
+    if split in state.get('updated_lda_models', []):
+        return os.path.join(_state_dir(work_dir), f'lda_{split}{LDA_MODEL_SUFFIX}')
+    return os.path.join(work_dir, f'lda_{split}{LDA_MODEL_SUFFIX}')
+
+
+def load_lda_engines(work_dir, state, update_lda=False):
+    """
+    Charge le moteur LDA de chaque sentiment (voir topic_analyzer)
+
+    Raises:
+        ValueError: si update_lda est demandé pour un modèle qui n'a pas été entraîné en ligne
+    """
+    from .topic_analyzer import TopicAnalyzer
+
+    analyzers = {split: TopicAnalyzer('lda').load(_lda_model_path(work_dir, state, split))
+                 for split in SENTIMENT_SPLITS}
+    if update_lda:
+        batch_models = [split for split, analyzer in analyzers.items() if not analyzer.engine.can_update()]
+        if batch_models:
+            raise ValueError(f"Modèles LDA non mis à jour ({', '.join(batch_models)}) : entraînés en mode batch, "
+                             "relancez le pipeline avec --lda-method online")
+    return analyzers
+
+
+def _refresh_lda(delta, analyzers, work_dir, output_dir, bundle, state, update_lda=False):
+    """
+    Assigne les topics LDA aux nouveaux avis de chaque sentiment
+
+    Avec update_lda, les modèles (entraînés en ligne) intègrent d'abord les
+    nouveaux avis et leurs mots-clés sont réécrits ; les topics des avis déjà
+    traités ne sont pas recalculés.
+    """
+    from .lda_analyzer import prepare_lda_data, assign_topics_to_documents, lda_model_parts
+    from .artifact_bundle import has_artifact, load_artifact
+    from .topic_index import build_topic_example_index
+    from .topic_keywords import save_topic_keywords, list_topics, read_topic
+
+    artifacts, updated = {}, False
+    for split, sentiment in SENTIMENT_SPLITS.items():
+        df_split, texts = prepare_lda_data(delta[delta['sentiment'] == sentiment])
+        if not texts:
+            continue
+        name = f'lda_doc_topics_{split}'
+        previous = load_artifact(bundle, name) if has_artifact(bundle, name) else None
+        top_k = previous['topic_ids'].shape[1] if previous is not None else DEFAULT_PARAMS['lda_top_k']
+
+        analyzer = analyzers[split]
+        if update_lda:
+            topic_ids, weights = analyzer.partial_update(texts, top_k=top_k)
+            model_path = os.path.join(_state_dir(work_dir), f'lda_{split}{LDA_MODEL_SUFFIX}')
+            analyzer.save(model_path)
+            # Modèle lu par le service d'inférence
+            artifacts[f'lda_model_{split}'] = ('lda_model', lda_model_parts(analyzer.engine.model,
+                                                                            analyzer.engine.vectorizer))
+            state['updated_lda_models'] = sorted(set(state.get('updated_lda_models', [])) | {split})
+            updated = True
+        else:
+            topic_ids, weights = analyzer.transform(texts, top_k=top_k)
+        df_topics = assign_topics_to_documents(df_split, (topic_ids, weights))
+        append_to_csv(os.path.join(output_dir, f'df_with_topics_{split}.csv'), df_topics)
+        _count_topics(state['lda_topic_counts'][split], df_topics['topic'])
+
+        # Positions des nouveaux avis à la suite des anciennes : topics par document et exemples reconstruits
+        if previous is not None:
+            topic_ids = np.concatenate([previous['topic_ids'], topic_ids])
+            weights = np.concatenate([previous['weights'], weights])
+            artifacts[name] = ('doc_topics', {'topic_ids': topic_ids, 'weights': weights})
+            artifacts[f'lda_examples_{split}'] = ('topic_examples',
+                                                  build_topic_example_index(topic_ids[:, 0], weights[:, 0]))
+
+    if updated:
+        # Même nombre de mots par topic que les mots-clés existants
+        keywords = load_artifact(bundle, 'lda_keywords') if has_artifact(bundle, 'lda_keywords') else None
+        n_words = DEFAULT_PARAMS['lda_words']
+        if keywords is not None and list_topics(keywords, 'negative'):
+            n_words = len(read_topic(keywords, 'negative', list_topics(keywords, 'negative')[0]))
+        keywords_path = os.path.join(_state_dir(work_dir), KEYWORDS_NAME)
+        save_topic_keywords({split: analyzer.engine.get_topic_table(n_words=n_words)
+                             for split, analyzer in analyzers.items()}, keywords_path)
+        artifacts['lda_keywords'] = ('topic_keywords', keywords_path)
+    return artifacts
+
+
+def _refresh_bertopic(delta, work_dir, bundle):
+    """Ajoute les nouveaux avis aux comptes des topics BERTopic (modèles existants)"""
+    from .bert_analyzer import prepare_bert_data
+    from .artifact_bundle import has_artifact, read_topic_info, topic_info_table
+    from .topic_analyzer import TopicAnalyzer
+
+    artifacts = {}
+    for split, sentiment in SENTIMENT_SPLITS.items():
+        model_path = os.path.join(work_dir, f'bert_model_{BERT_SUFFIXES[split]}')
+        name = f'bert_topic_info_{split}'
+        _, texts = prepare_bert_data(delta[delta['sentiment'] == sentiment])
+        if not texts or not os.path.exists(model_path) or not has_artifact(bundle, name):
+            continue
+        topics = TopicAnalyzer('bertopic').load(model_path).transform(texts)
+        counts = pd.Series(topics).value_counts()
+        topic_info = read_topic_info(bundle, name).copy()
+        topic_info['Count'] += topic_info['Topic'].map(counts).fillna(0).astype(topic_info['Count'].dtype)
+        artifacts[name] = ('topic_info', topic_info_table(topic_info))
+    return artifacts
+
+
+def refresh(input_path, output_dir='data', work_dir='artifacts', n_jobs=1, chunk_size=50_000, use_bertopic=True,
+            update_lda=False):
+    """
+    Intègre les avis nouveaux d'un dump aux artefacts existants, sans retraiter les autres
+
+    Args:
+        input_path: chemin du nouveau dump CSV brut (contient les avis déjà traités)
+        output_dir: répertoire des artefacts lus par l'application
+        work_dir: répertoire de travail du pipeline (modèles, cache des scores, état)
+        n_jobs: nombre de processus pour le nettoyage et le scoring
+        chunk_size: taille des morceaux en mode parallèle
+        use_bertopic: mettre aussi à jour les comptes des topics BERTopic (nécessite bertopic)
+        update_lda: intégrer les nouveaux avis aux modèles LDA (entraînés avec --lda-method online)
+
+    Returns:
+        dict: nombre d'avis du dump, nouveaux et retirés, durée (s)
+    """
+    from .artifact_bundle import get_bundle_dir, open_bundle, update_bundle
+
+    start = time.perf_counter()
+    state, known_hashes = load_state(work_dir, output_dir)
+    # Modèles chargés (et vérifiés) avant toute écriture
+    analyzers = load_lda_engines(work_dir, state, update_lda=update_lda)
+    raw = load_raw_reviews(input_path)
+    hashes = hash_reviews(raw)
+    new_mask, n_removed = find_new_reviews(hashes, known_hashes)
+    report = {'reviews': len(raw), 'new_reviews': int(new_mask.sum()), 'removed_reviews': n_removed}
+
+    if report['new_reviews']:
+        delta = clean_reviews(raw[new_mask], n_jobs=n_jobs, chunk_size=chunk_size)
+        delta = score_reviews(delta, cache_path=os.path.join(work_dir, 'sentiment_cache.feather'),
+                              n_jobs=n_jobs, chunk_size=chunk_size)
+        state['n_deltas'] += 1
+        os.makedirs(_state_dir(work_dir), exist_ok=True)
+        write_store(delta, os.path.join(_state_dir(work_dir), f"delta_{state['n_deltas']:04d}.feather"))
+        append_to_csv(os.path.join(output_dir, 'reviews_cleaned.csv'), delta)
+
+        bundle_dir = get_bundle_dir(output_dir)
+        bundle = open_bundle(bundle_dir, verify=False)
+        artifacts = _refresh_lda(delta, analyzers, work_dir, output_dir, bundle, state, update_lda=update_lda)
+        if use_bertopic:
+            artifacts.update(_refresh_bertopic(delta, work_dir, bundle))
+        if artifacts:
+            update_bundle(bundle_dir, artifacts)
+
+        state['ranges'] = _serialize_ranges(update_data_ranges(_deserialize_ranges(state['ranges']), delta))
+        known_hashes = np.union1d(known_hashes, hashes[new_mask])
+
+    report['seconds'] = round(time.perf_counter() - start, 3)
+    state['base'] = _base_fingerprints(work_dir, output_dir)
+    state['history'].append({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'input': input_path, **report})
+    save_state(work_dir, state, known_hashes)
+
+    ranges = finalize_data_ranges(_deserialize_ranges(state['ranges']))
+    # Lues par l'application (data_loader.load_stored_ranges) tant que le CSV n'a pas changé
+    stats = {
+        'reviews_csv': file_signature(os.path.join(output_dir, 'reviews_cleaned.csv')),
+        'ranges': {**ranges, 'genders': state['ranges']['genders'], 'conditions': state['ranges']['conditions']},
+        'lda_topic_counts': state['lda_topic_counts'],
+        'last_refresh': state['history'][-1],
+    }
+    with open(os.path.join(output_dir, STATS_NAME), 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Intègre les nouveaux avis d'un dump aux artefacts existants")
+    parser.add_argument('input_path', help="nouveau dump CSV brut des avis")
+    parser.add_argument('--output-dir', default='data', help="répertoire lu par l'application")
+    parser.add_argument('--work-dir', default='artifacts', help="répertoire de travail du pipeline")
+    parser.add_argument('--jobs', type=int, default=1, help="nombre de processus")
+    parser.add_argument('--chunk-size', type=int, default=50_000, help="taille des morceaux en mode parallèle")
+    parser.add_argument('--no-bertopic', action='store_true', help="ne pas mettre à jour les topics BERTopic")
+    parser.add_argument('--update-lda', action='store_true',
+                        help="mettre à jour les modèles LDA avec les nouveaux avis (pipeline --lda-method online)")
+    args = parser.parse_args(argv)
+
+    report = refresh(args.input_path, output_dir=args.output_dir, work_dir=args.work_dir, n_jobs=args.jobs,
+                     chunk_size=args.chunk_size, use_bertopic=not args.no_bertopic, update_lda=args.update_lda)
+    print(f"{report['new_reviews']} nouveaux avis sur {report['reviews']} "
+          f"({report['removed_reviews']} retirés, ignorés) en {report['seconds']:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
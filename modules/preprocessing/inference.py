@@ -0,0 +1,328 @@
+"""
+Assignation du sentiment et des topics à de nouveaux avis, sans réentraînement
+
+Les modèles produits par le pipeline (LDA et BERTopic par sentiment) sont
+chargés une seule fois ; les avis sont traités par lots.
+
+Usage :
+    python -m modules.preprocessing.inference predict nouveaux_avis.csv --output avis_scores.csv
+    python -m modules.preprocessing.inference serve --port 8080
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from .artifact_bundle import get_bundle_dir, has_artifact, load_artifact, open_bundle
+from .pipeline import SENTIMENT_SPLITS, BERT_SUFFIXES
+from .sentiment_scorer import score_texts, get_sentiment_labels
+from .text_cleaner import clean_series
+
+# Topic attribué quand aucun modèle ne couvre le sentiment de l'avis (ex: Neutre)
+NO_TOPIC = -1
+
+RESULT_COLUMNS = ['sentiment_score', 'sentiment', 'lda_topic', 'lda_probability', 'bert_topic']
+
+# Limites d'une requête POST /predict (au-delà : 413)
+MAX_REQUEST_TEXTS = 10_000
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+
+def get_lda_model_name(split):
+    """Nom de l'artefact du modèle LDA d'un sentiment dans le bundle exporté par le pipeline"""
+    return f'lda_model_{split}'
+
+
+class ServiceMetrics:
+    """Compteurs de débit et de latence, partagés par les threads du service"""
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._started = time.time()
+        self.batches = 0
+        self.reviews = 0
+        self.busy_seconds = 0.0
+
+    def record(self, n_reviews, seconds):
+        with self._lock:
+            self.batches += 1
+            self.reviews += n_reviews
+            self.busy_seconds += seconds
+            self._latencies.append(seconds)
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: lots et avis traités, débit (avis/s de calcul), latences des derniers lots (ms)
+        """
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            return {
+                'batches': self.batches,
+                'reviews': self.reviews,
+                'uptime_seconds': time.time() - self._started,
+                'reviews_per_second': self.reviews / self.busy_seconds if self.busy_seconds else 0.0,
+                'batch_latency_ms': {
+                    'p50': float(np.percentile(latencies, 50)) if len(latencies) else None,
+                    'p95': float(np.percentile(latencies, 95)) if len(latencies) else None,
+                    'max': float(latencies.max()) if len(latencies) else None,
+                },
+            }
+
+
+class InferenceService:
+    """
+    Modèles chargés une fois, appliqués par lots aux nouveaux avis
+
+    Chaque avis reçoit un score VADER et un label de sentiment ; les avis négatifs
+    et positifs reçoivent en plus le topic du modèle LDA / BERTopic de leur sentiment.
+    """
+
+    def __init__(self, model_dir='data', use_bertopic=True, n_jobs=1):
+        """
+        Args:
+            model_dir: répertoire des modèles exportés par le pipeline
+            use_bertopic: charger aussi les modèles BERTopic
+            n_jobs: processus pour le nettoyage et VADER
+
+        Raises:
+            FileNotFoundError: si le modèle d'un sentiment est absent (sans lui, tous
+                ses avis recevraient le topic NO_TOPIC)
+        """
+        from .lda_analyzer import lda_model_from_parts
+
+        bundle_dir = get_bundle_dir(model_dir)
+        bundle = open_bundle(bundle_dir)
+        lda_names = {split: get_lda_model_name(split) for split in SENTIMENT_SPLITS}
+        bert_paths = {split: os.path.join(model_dir, f'bert_model_{suffix}') for split, suffix in BERT_SUFFIXES.items()}
+        missing = [os.path.join(bundle_dir, name) for name in lda_names.values() if not has_artifact(bundle, name)]
+        if use_bertopic:
+            missing += [path for path in bert_paths.values() if not os.path.exists(path)]
+        if missing:
+            raise FileNotFoundError(f"Modèles absents de {model_dir} : {', '.join(missing)}. Lancez l'export du "
+                                    "pipeline dans ce répertoire (ou --no-bertopic sans modèles BERTopic).")
+
+        self.n_jobs = n_jobs
+        self.metrics = ServiceMetrics()
+        self.lda_models = {split: lda_model_from_parts(load_artifact(bundle, name)) for split, name in lda_names.items()}
+        self.bert_models = {}
+        if use_bertopic:
+            from modules.model_registry import get_bertopic_model
+            self.bert_models = {split: get_bertopic_model(path) for split, path in bert_paths.items()}
+
+    def predict(self, texts):
+        """
+        Sentiment, topic LDA et topic BERTopic de chaque avis
+
+        Args:
+            texts: liste des avis bruts
+
+        Returns:
+            DataFrame (une ligne par avis, dans l'ordre) avec les colonnes RESULT_COLUMNS
+        """
+        start = time.perf_counter()
+        texts = pd.Series(texts, dtype=object).fillna("").astype(str).reset_index(drop=True)
+        # Même préparation que le pipeline : nettoyage NLTK puis VADER sur le texte nettoyé
+        clean = clean_series(texts, n_jobs=self.n_jobs)
+        scores = score_texts(clean, n_jobs=self.n_jobs)
+        labels = get_sentiment_labels(scores)
+
+        lda_topics = np.full(len(texts), NO_TOPIC, dtype=np.int16)
+        lda_probabilities = np.zeros(len(texts), dtype=np.float32)
+        bert_topics = np.full(len(texts), NO_TOPIC, dtype=np.int16)
+        for split, sentiment in SENTIMENT_SPLITS.items():
+            rows = np.flatnonzero(labels.to_numpy() == sentiment)
+            if len(rows) == 0:
+                continue
+            if split in self.lda_models:
+                lda_model, vectorizer = self.lda_models[split]
+                doc_topics = lda_model.transform(vectorizer.transform(clean.iloc[rows]))
+                lda_topics[rows] = doc_topics.argmax(axis=1)
+                lda_probabilities[rows] = doc_topics.max(axis=1)
+            if split in self.bert_models:
+                # BERTopic a été entraîné sur les avis bruts
+                topics, _ = self.bert_models[split].transform(texts.iloc[rows].tolist())
+                bert_topics[rows] = topics
+
+        result = pd.DataFrame({
+            'sentiment_score': scores,
+            'sentiment': labels.to_numpy(),
+            'lda_topic': lda_topics,
+            'lda_probability': lda_probabilities,
+            'bert_topic': bert_topics,
+        })
+        self.metrics.record(len(texts), time.perf_counter() - start)
+        return result
+
+    def predict_batches(self, texts, batch_size=4096):
+        """Applique predict par lots de batch_size avis (mémoire bornée pour les gros fichiers)"""
+        texts = list(texts)
+        return pd.concat([self.predict(texts[start:start + batch_size])
+                          for start in range(0, len(texts), batch_size)], ignore_index=True)
+
+
+class MicroBatcher:
+    """
+    Regroupe les requêtes concurrentes en lots avant de les envoyer au service
+
+    Un lot part dès qu'il atteint max_batch_size avis ou que la première requête
+    attend depuis max_wait_ms.
+    """
+
+    def __init__(self, service, max_batch_size=512, max_wait_ms=10):
+        self.service = service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        """
+        Args:
+            texts: liste des avis d'une requête
+
+        Returns:
+            Future dont le résultat est le DataFrame des prédictions de ces avis
+        """
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future
+
+    def _run(self):
+        while True:
+            pending = [self._queue.get()]
+            size = len(pending[0][0])
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            try:
+                result = self.service.predict([text for texts, _ in pending for text in texts])
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for texts, future in pending:
+                future.set_result(result.iloc[start:start + len(texts)].reset_index(drop=True))
+                start += len(texts)
+
+
+def make_handler(batcher):
+    """Handler HTTP : POST /predict {"texts": [...]} et GET /metrics"""
+
+    class InferenceHandler(BaseHTTPRequestHandler):
+
+        def _send_json(self, payload, status=200):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/metrics':
+                self._send_json(batcher.service.metrics.snapshot())
+            else:
+                self._send_json({'error': 'not found'}, status=404)
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send_json({'error': 'not found'}, status=404)
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+            except ValueError:
+                length = -1
+            if length < 0 or length > MAX_REQUEST_BYTES:
+                self._send_json({'error': f"corps limité à {MAX_REQUEST_BYTES} octets"}, status=413)
+                self.close_connection = True
+                return
+            try:
+                texts = json.loads(self.rfile.read(length))['texts']
+            except (ValueError, KeyError, TypeError):
+                texts = None
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                self._send_json({'error': 'corps attendu : {"texts": [chaînes]}'}, status=400)
+                return
+            if len(texts) > MAX_REQUEST_TEXTS:
+                self._send_json({'error': f"au plus {MAX_REQUEST_TEXTS} avis par requête"}, status=413)
+                return
+            try:
+                result = batcher.submit(texts).result()
+            except Exception as e:
+                self._send_json({'error': f"{type(e).__name__}: {e}"}, status=500)
+                return
+            self._send_json({'predictions': result.to_dict(orient='records')})
+
+        def log_message(self, format, *args):
+            pass
+
+    return InferenceHandler
+
+
+def serve(service, host='127.0.0.1', port=8080, max_batch_size=512, max_wait_ms=10):
+    """Démarre le serveur HTTP local (bloquant)"""
+    batcher = MicroBatcher(service, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher))
+    print(f"Service d'inférence sur http://{host}:{port} (POST /predict, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Assignation du sentiment et des topics à de nouveaux avis")
+    parser.add_argument('--model-dir', default='data', help="répertoire des modèles exportés par le pipeline")
+    parser.add_argument('--no-bertopic', action='store_true', help="ne pas charger BERTopic (sentiment et LDA seulement)")
+    parser.add_argument('--jobs', type=int, default=1, help="processus pour le nettoyage et VADER")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    predict_parser = subparsers.add_parser('predict', help="traite un fichier CSV")
+    predict_parser.add_argument('path', help="CSV des nouveaux avis")
+    predict_parser.add_argument('--text-column', default='description-text')
+    predict_parser.add_argument('--output', help="CSV de sortie (avis + prédictions)")
+    predict_parser.add_argument('--batch-size', type=int, default=4096)
+
+    serve_parser = subparsers.add_parser('serve', help="démarre le serveur HTTP local")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8080)
+    serve_parser.add_argument('--max-batch-size', type=int, default=512)
+    serve_parser.add_argument('--max-wait-ms', type=float, default=10)
+
+    args = parser.parse_args(argv)
+    service = InferenceService(args.model_dir, use_bertopic=not args.no_bertopic, n_jobs=args.jobs)
+
+    if args.command == 'serve':
+        serve(service, args.host, args.port, args.max_batch_size, args.max_wait_ms)
+        return
+
+    # Lecture seule du CSV : aucun store n'est écrit à côté du fichier de l'utilisateur
+    df = pd.read_csv(args.path, usecols=[args.text_column])
+    result = service.predict_batches(df[args.text_column].tolist(), batch_size=args.batch_size)
+    print(json.dumps(service.metrics.snapshot(), indent=2))
+    if args.output:
+        pd.concat([df.reset_index(drop=True), result], axis=1).to_csv(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
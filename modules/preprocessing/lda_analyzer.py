@@ -1,6 +1,12 @@
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
+
+from modules.profiling import profiled
+
+from .topic_index import get_topic_rows
+
+# scikit-learn est importé dans les fonctions d'entraînement :
+# la page LDA n'affiche que des résultats précalculés et n'en a pas besoin
 
 def prepare_lda_data(df, text_column='clean_review'):
     """
@@ -17,7 +23,7 @@ def prepare_lda_data(df, text_column='clean_review'):
     texts = df_cleaned[text_column].tolist()
     return df_cleaned, texts
 
-def run_lda_analysis(texts, n_topics=8, max_df=0.95, min_df=2, random_state=42):
+def run_lda_analysis(texts, n_topics=8, max_df=0.95, min_df=2, random_state=42, top_k=None):
     """
     Exécute l'analyse LDA sur une liste de textes
     
@@ -27,20 +33,317 @@ def run_lda_analysis(texts, n_topics=8, max_df=0.95, min_df=2, random_state=42):
         max_df: fréquence maximale des termes (pour CountVectorizer)
         min_df: fréquence minimale des termes (pour CountVectorizer)
         random_state: graine pour la reproductibilité
+        top_k: si renseigné, retourne les k meilleurs topics par document
+            (voir transform_top_k) au lieu de la matrice dense
     
     Returns:
         tuple: (lda_model, vectorizer, doc_topic_matrix)
     """
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.decomposition import LatentDirichletAllocation
+    
     vectorizer = CountVectorizer(max_df=max_df, min_df=min_df, stop_words='english')
     X = vectorizer.fit_transform(texts)
     
     lda = LatentDirichletAllocation(n_components=n_topics, random_state=random_state)
     lda.fit(X)
     
+    if top_k is not None:
+        return lda, vectorizer, transform_top_k(lda, X, k=top_k)
+    
     doc_topics = lda.transform(X)
     
     return lda, vectorizer, doc_topics
 
+def compact_doc_topics(doc_topics, k=3):
+    """
+    Réduit une matrice dense topic-document à ses k meilleurs topics par document
+    
+    Args:
+        doc_topics: matrice des probabilités topic-document (documents × topics)
+        k: nombre de topics conservés par document
+    
+    Returns:
+        tuple: (topic_ids int16, weights float16), de forme (documents × k),
+               triés par poids décroissant
+    """
+    k = min(k, doc_topics.shape[1])
+    top = np.argpartition(-doc_topics, k - 1, axis=1)[:, :k]
+    weights = np.take_along_axis(doc_topics, top, axis=1)
+    order = np.argsort(-weights, axis=1)
+    topic_ids = np.take_along_axis(top, order, axis=1).astype(np.int16)
+    weights = np.take_along_axis(weights, order, axis=1).astype(np.float16)
+    return topic_ids, weights
+
+def transform_top_k(lda_model, X, k=3, batch_size=100_000):
+    """
+    Calcule les k meilleurs topics par document sans matérialiser la matrice dense complète
+    
+    Args:
+        lda_model: modèle LDA entraîné
+        X: matrice document-terme
+        k: nombre de topics conservés par document
+        batch_size: nombre de documents transformés à la fois
+    
+    Returns:
+        tuple: (topic_ids int16, weights float16)
+    """
+    k = min(k, lda_model.n_components)
+    topic_ids = np.empty((X.shape[0], k), dtype=np.int16)
+    weights = np.empty((X.shape[0], k), dtype=np.float16)
+    for start in range(0, X.shape[0], batch_size):
+        batch_ids, batch_weights = compact_doc_topics(lda_model.transform(X[start:start + batch_size]), k)
+        topic_ids[start:start + batch_size] = batch_ids
+        weights[start:start + batch_size] = batch_weights
+    return topic_ids, weights
+
+def save_doc_topics(doc_topics, path):
+    """Enregistre les topics compacts (topic_ids, weights) à côté des avis (format .npz)"""
+    topic_ids, weights = doc_topics
+    np.savez(path, topic_ids=topic_ids, weights=weights)
+
+def load_doc_topics(path):
+    """
+    Charge les topics compacts enregistrés par save_doc_topics
+    
+    Returns:
+        tuple: (topic_ids, weights)
+    """
+    with np.load(path, allow_pickle=False) as data:
+        return data['topic_ids'], data['weights']
+
+def _partial_fit_doc_topics(lda_model, X):
+    """
+    partial_fit sur un mini-batch, en conservant les distributions de topics de son E-step
+
+    L'E-step de partial_fit calcule déjà les paramètres variationnels (gamma) de chaque
+    document avant de mettre à jour les topics : ils sont récupérés au passage au lieu
+    d'être recalculés par un second transform.
+
+    Returns:
+        array: matrice des probabilités topic-document (lignes normalisées)
+    """
+    e_step = lda_model._e_step
+    doc_topics = []
+    
+    def capture(X, cal_sstats, random_init, parallel=None):
+        doc_topic_distr, suff_stats = e_step(X, cal_sstats, random_init, parallel=parallel)
+        if cal_sstats:
+            doc_topics.append(doc_topic_distr)
+        return doc_topic_distr, suff_stats
+    
+    # Attribut d'instance temporaire : retiré avant tout enregistrement du modèle
+    lda_model._e_step = capture
+    try:
+        lda_model.partial_fit(X)
+    finally:
+        del lda_model._e_step
+    if not doc_topics:
+        return np.empty((0, lda_model.n_components))
+    doc_topics = np.vstack(doc_topics)
+    return doc_topics / doc_topics.sum(axis=1)[:, np.newaxis]
+
+def run_online_lda(texts, n_topics=8, max_df=0.95, min_df=2, batch_size=1024, random_state=42, top_k=None):
+    """
+    Entraîne un modèle LDA en ligne (par mini-batchs) pouvant être mis à jour ensuite
+    
+    Le vocabulaire est appris une seule fois sur ces textes puis figé : les
+    mises à jour utilisent le même espace de features. Les topics de chaque
+    document sont ceux de l'E-step qui l'intègre au modèle (voir
+    _partial_fit_doc_topics) : le corpus n'est parcouru qu'une fois. Les
+    premiers mini-batchs sont donc assignés par un modèle peu avancé ;
+    transform_top_k donne l'assignation du modèle final.
+    
+    Args:
+        texts: liste des textes à analyser
+        n_topics: nombre de topics à extraire
+        max_df: fréquence maximale des termes (pour CountVectorizer)
+        min_df: fréquence minimale des termes (pour CountVectorizer)
+        batch_size: nombre de documents par mini-batch
+        random_state: graine pour la reproductibilité
+        top_k: si renseigné, retourne les k meilleurs topics par document
+            (voir compact_doc_topics) au lieu de la matrice dense
+    
+    Returns:
+        tuple: (lda_model, vectorizer, doc_topic_matrix)
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.decomposition import LatentDirichletAllocation
+    
+    vectorizer = CountVectorizer(max_df=max_df, min_df=min_df, stop_words='english')
+    X = vectorizer.fit_transform(texts)
+    
+    lda = LatentDirichletAllocation(
+        n_components=n_topics,
+        learning_method='online',
+        batch_size=batch_size,
+        total_samples=X.shape[0],
+        random_state=random_state
+    )
+    doc_topics = []
+    for start in range(0, X.shape[0], batch_size):
+        batch = X[start:start + batch_size]
+        batch_topics = _partial_fit_doc_topics(lda, batch)
+        doc_topics.append(compact_doc_topics(batch_topics, top_k) if top_k is not None else batch_topics)
+    # Taille réelle du corpus, reprise par update_lda_model pour pondérer les nouveaux documents
+    lda.n_documents_ = X.shape[0]
+    
+    if top_k is not None:
+        k = min(top_k, n_topics)
+        if not doc_topics:
+            return lda, vectorizer, (np.empty((0, k), dtype=np.int16), np.empty((0, k), dtype=np.float16))
+        return lda, vectorizer, (np.vstack([ids for ids, _ in doc_topics]), np.vstack([w for _, w in doc_topics]))
+    if not doc_topics:
+        return lda, vectorizer, np.empty((0, n_topics))
+    return lda, vectorizer, np.vstack(doc_topics)
+
+def is_updatable(lda_model):
+    """Indique si un modèle LDA peut être mis à jour par update_lda_model (entraîné par run_online_lda)"""
+    return lda_model.learning_method == 'online' and hasattr(lda_model, 'n_documents_')
+
+def update_lda_model(lda_model, vectorizer, texts, batch_size=1024):
+    """
+    Met à jour un modèle LDA en ligne avec de nouveaux textes, sans réentraînement complet
+    
+    Chaque mini-batch est vectorisé avec le vocabulaire figé et intégré au modèle
+    par partial_fit ; ses distributions de topics sont celles de cet E-step, sans
+    second transform. total_samples est porté au nombre réel de documents vus,
+    pour que les nouveaux documents aient leur juste poids.
+    
+    Args:
+        lda_model: modèle LDA entraîné par run_online_lda (learning_method='online')
+        vectorizer: vectorizer figé utilisé pour l'entraînement
+        texts: liste des nouveaux textes
+        batch_size: nombre de documents par mini-batch
+    
+    Returns:
+        array: matrice des probabilités topic-document des nouveaux textes
+    
+    Raises:
+        ValueError: si le modèle n'a pas été entraîné en ligne
+    """
+    if not is_updatable(lda_model):
+        raise ValueError("Seul un modèle entraîné par run_online_lda peut être mis à jour : "
+                         "réentraînez le modèle (pipeline --lda-method online)")
+    X = vectorizer.transform(texts)
+    lda_model.n_documents_ += X.shape[0]
+    lda_model.total_samples = lda_model.n_documents_
+    
+    doc_topics = []
+    for start in range(0, X.shape[0], batch_size):
+        batch = X[start:start + batch_size]
+        doc_topics.append(_partial_fit_doc_topics(lda_model, batch))
+    
+    if not doc_topics:
+        return np.empty((0, lda_model.n_components))
+    return np.vstack(doc_topics)
+
+# Attributs appris du modèle LDA conservés avec ses poids (n_documents_ : modèles entraînés en ligne)
+LDA_STATE_ATTRIBUTES = ('n_batch_iter_', 'n_iter_', 'bound_', 'doc_topic_prior_', 'topic_word_prior_', 'n_documents_')
+LDA_MODEL_ARTIFACT = 'lda_model'
+
+def _vectorizer_params(vectorizer):
+    """Paramètres du vectorizer sérialisables en JSON (le vocabulaire est enregistré à part)"""
+    params = vectorizer.get_params()
+    params.pop('vocabulary')
+    params['dtype'] = np.dtype(params['dtype']).name
+    if isinstance(params['stop_words'], (set, frozenset)):
+        params['stop_words'] = sorted(params['stop_words'])
+    custom = [name for name, value in params.items() if callable(value)]
+    if custom:
+        raise ValueError(f"Vectorizer non enregistrable : paramètres personnalisés {', '.join(custom)}")
+    return params
+
+def lda_model_parts(lda_model, vectorizer):
+    """
+    Décompose un modèle LDA et son vectorizer en tableaux et paramètres (sans pickle)
+    
+    Args:
+        lda_model: modèle LDA entraîné
+        vectorizer: CountVectorizer utilisé pour l'entraînement
+    
+    Returns:
+        dict: components et exp_dirichlet_component (poids des topics), vocabulary
+        (termes dans l'ordre des colonnes) et params (hyperparamètres et état
+        d'entraînement), au format des artefacts 'lda_model' du bundle
+    """
+    state = {}
+    for name in LDA_STATE_ATTRIBUTES:
+        if hasattr(lda_model, name):
+            value = getattr(lda_model, name)
+            state[name] = value.item() if isinstance(value, np.generic) else value
+    return {
+        'components': lda_model.components_,
+        'exp_dirichlet_component': lda_model.exp_dirichlet_component_,
+        'vocabulary': np.asarray(vectorizer.get_feature_names_out(), dtype=str),
+        'params': {'lda': lda_model.get_params(), 'state': state, 'vectorizer': _vectorizer_params(vectorizer)},
+    }
+
+def lda_model_from_parts(parts):
+    """
+    Reconstruit le modèle LDA et son vectorizer à partir de lda_model_parts
+    
+    Les poids sont copiés (les modèles en ligne les modifient lors des mises à
+    jour). Le générateur aléatoire repart de random_state : une mise à jour
+    après rechargement n'est pas identique à une mise à jour sans rechargement.
+    
+    Returns:
+        tuple: (lda_model, vectorizer)
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.decomposition import LatentDirichletAllocation
+    from sklearn.utils import check_random_state
+    
+    params = parts['params']
+    lda = LatentDirichletAllocation(**params['lda'])
+    lda.components_ = np.array(parts['components'], dtype=np.float64)
+    lda.exp_dirichlet_component_ = np.array(parts['exp_dirichlet_component'], dtype=np.float64)
+    lda.n_features_in_ = lda.components_.shape[1]
+    lda.random_state_ = check_random_state(lda.random_state)
+    for name, value in params['state'].items():
+        setattr(lda, name, value)
+    
+    vectorizer_params = dict(params['vectorizer'])
+    vectorizer_params['dtype'] = np.dtype(vectorizer_params['dtype'])
+    vectorizer_params['ngram_range'] = tuple(vectorizer_params['ngram_range'])
+    vectorizer = CountVectorizer(**vectorizer_params)
+    vectorizer.vocabulary_ = {term: column for column, term in enumerate(parts['vocabulary'].tolist())}
+    vectorizer.fixed_vocabulary_ = False
+    return lda, vectorizer
+
+def save_lda_model(lda_model, vectorizer, path):
+    """
+    Enregistre le modèle LDA et son vectorizer dans un bundle (répertoire path)
+    
+    Poids en .npy, vocabulaire et hyperparamètres en JSON : le chargement ne
+    désérialise aucun objet Python.
+    """
+    from .artifact_bundle import write_bundle
+    write_bundle(path, {LDA_MODEL_ARTIFACT: ('lda_model', lda_model_parts(lda_model, vectorizer))})
+
+def load_lda_model(path):
+    """
+    Charge un modèle LDA enregistré par save_lda_model
+    
+    Returns:
+        tuple: (lda_model, vectorizer)
+    
+    Raises:
+        FileNotFoundError: si path ne contient pas de modèle
+    """
+    from .artifact_bundle import has_artifact, load_artifact, open_bundle
+    bundle = open_bundle(path)
+    if not has_artifact(bundle, LDA_MODEL_ARTIFACT):
+        raise FileNotFoundError(f"Aucun modèle LDA dans {path}")
+    return lda_model_from_parts(load_artifact(bundle, LDA_MODEL_ARTIFACT))
+
+def _top_word_columns(components, n_words):
+    """Colonnes des n_words termes les plus lourds de chaque topic, triées par poids décroissant"""
+    n_words = min(n_words, components.shape[1])
+    top = np.argpartition(-components, n_words - 1, axis=1)[:, :n_words]
+    order = np.argsort(-np.take_along_axis(components, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
 def extract_lda_topics(lda_model, vectorizer, n_words=10):
     """
     Extrait les mots-clés pour chaque topic du modèle LDA
@@ -53,14 +356,41 @@ def extract_lda_topics(lda_model, vectorizer, n_words=10):
     Returns:
         list: liste des mots-clés par topic
     """
-    topics = []
     feature_names = vectorizer.get_feature_names_out()
+    return feature_names[_top_word_columns(lda_model.components_, n_words)].tolist()
+
+def extract_lda_topic_table(lda_model, vectorizer, n_words=10):
+    """
+    Table des mots-clés de tous les topics, avec leurs poids et leur exclusivité
     
-    for topic_idx, topic in enumerate(lda_model.components_):
-        keywords = [feature_names[i] for i in topic.argsort()[:-n_words - 1:-1]]
-        topics.append(keywords)
+    Args:
+        lda_model: modèle LDA entraîné
+        vectorizer: vectorizer utilisé pour l'entraînement
+        n_words: nombre de mots-clés par topic
     
-    return topics
+    Returns:
+        DataFrame (une ligne par topic et mot) : topic, rank, word,
+        weight (poids du mot dans le topic, normalisé pour sommer à 1 sur le vocabulaire)
+        et exclusivity (part du poids total du mot portée par ce topic)
+    """
+    components = lda_model.components_
+    top = _top_word_columns(components, n_words)
+    n_topics, n_words = top.shape
+    
+    topic_totals = components.sum(axis=1)
+    # Poids normalisés de chaque mot sommés sur les topics, sans matrice intermédiaire
+    word_totals = (1 / topic_totals) @ components
+    
+    topics = np.repeat(np.arange(n_topics), n_words)
+    columns = top.ravel()
+    weights = components[topics, columns] / topic_totals[topics]
+    return pd.DataFrame({
+        'topic': topics.astype(np.int16),
+        'rank': np.tile(np.arange(n_words), n_topics).astype(np.int16),
+        'word': vectorizer.get_feature_names_out()[columns],
+        'weight': weights.astype(np.float32),
+        'exclusivity': (weights / word_totals[columns]).astype(np.float32),
+    })
 
 def assign_topics_to_documents(df, doc_topics):
     """
@@ -68,16 +398,24 @@ def assign_topics_to_documents(df, doc_topics):
     
     Args:
         df: DataFrame des documents
-        doc_topics: matrice des probabilités topic-document
+        doc_topics: matrice des probabilités topic-document, ou tuple
+            (topic_ids, weights) retourné par compact_doc_topics
     
     Returns:
         DataFrame avec une colonne 'topic' ajoutée
     """
-    df_copy = df.copy()
-    df_copy['topic'] = doc_topics.argmax(axis=1)
-    return df_copy
+    if isinstance(doc_topics, tuple):
+        topics = doc_topics[0][:, 0]
+    else:
+        topics = doc_topics.argmax(axis=1).astype(np.int16)
+    
+    # Copie superficielle : les colonnes existantes sont partagées, seule 'topic' est ajoutée
+    df_with_topics = df.copy(deep=False)
+    df_with_topics['topic'] = topics
+    return df_with_topics
 
-def get_topic_examples(df, topic_num, text_column='description-text', n_examples=3, random_state=42):
+@profiled
+def get_topic_examples(df, topic_num, text_column='description-text', n_examples=3, random_state=42, index=None):
     """
     Récupère des exemples d'avis pour un topic donné
     
@@ -87,10 +425,16 @@ def get_topic_examples(df, topic_num, text_column='description-text', n_examples
         text_column: colonne contenant le texte original
         n_examples: nombre d'exemples à retourner
         random_state: graine pour la reproductibilité
+        index: index d'exemples construit par build_topic_example_index (optionnel).
+            S'il est fourni, les avis les plus représentatifs sont retournés
+            au lieu d'un échantillon aléatoire.
     
     Returns:
         Series: exemples d'avis pour le topic
     """
+    if index is not None:
+        return df[text_column].iloc[get_topic_rows(index, topic_num, n_examples)].dropna()
+    
     topic_docs = df[df['topic'] == topic_num][text_column].dropna()
     n_samples = min(n_examples, len(topic_docs))
     
@@ -0,0 +1,169 @@
+"""
+Balayage des hyperparamètres LDA (n_topics, max_df, min_df)
+
+Les textes sont vectorisés une seule fois ; la matrice document-terme est
+écrite en fichiers .npy et partagée sans copie avec les workers (mémoire mappée).
+
+Usage :
+    python -m modules.preprocessing.lda_sweep data/df_with_topics_negative.csv --topics 4 6 8 10 --jobs 4
+"""
+import argparse
+import itertools
+import numbers
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.feature_extraction.text import CountVectorizer
+
+# Matrice partagée, ouverte une fois par worker (voir _init_worker)
+_shared = {}
+
+
+def _init_worker(matrix_dir, shape):
+    """Ouvre la matrice document-terme en mémoire mappée dans le worker"""
+    data, indices, indptr = (np.load(os.path.join(matrix_dir, f'{name}.npy'), mmap_mode='r')
+                             for name in ('data', 'indices', 'indptr'))
+    _shared['X'] = sparse.csr_matrix((data, indices, indptr), shape=shape, copy=False)
+    _shared['doc_freq'] = np.load(os.path.join(matrix_dir, 'doc_freq.npy'))
+
+
+def _save_matrix(X, doc_freq, matrix_dir):
+    np.save(os.path.join(matrix_dir, 'data.npy'), X.data)
+    np.save(os.path.join(matrix_dir, 'indices.npy'), X.indices)
+    np.save(os.path.join(matrix_dir, 'indptr.npy'), X.indptr)
+    np.save(os.path.join(matrix_dir, 'doc_freq.npy'), doc_freq)
+
+
+def select_features(doc_freq, n_docs, max_df, min_df):
+    """
+    Colonnes conservées pour des seuils max_df / min_df (mêmes règles que CountVectorizer)
+
+    Args:
+        doc_freq: nombre de documents contenant chaque terme
+        n_docs: nombre de documents
+        max_df: fréquence maximale (proportion si float, nombre de documents si int)
+        min_df: fréquence minimale (proportion si float, nombre de documents si int)
+
+    Returns:
+        array des indices de colonnes conservées
+    """
+    max_count = max_df if isinstance(max_df, numbers.Integral) else max_df * n_docs
+    min_count = min_df if isinstance(min_df, numbers.Integral) else min_df * n_docs
+    return np.flatnonzero((doc_freq <= max_count) & (doc_freq >= min_count))
+
+
+def umass_coherence(X, components, n_words=10):
+    """
+    Cohérence UMass moyenne des topics, calculée sur la matrice document-terme
+
+    Args:
+        X: matrice document-terme (csr)
+        components: matrice topics × termes du modèle
+        n_words: nombre de mots par topic pris en compte
+
+    Returns:
+        float: cohérence moyenne (plus proche de 0 = plus cohérent)
+    """
+    scores = []
+    for topic in components:
+        top = np.argsort(topic)[::-1][:n_words]
+        occurrences = (X[:, top] > 0).astype(np.float64)
+        co_doc = (occurrences.T @ occurrences).toarray()
+        doc_counts = np.diag(co_doc)
+        score = 0.0
+        for i in range(1, len(top)):
+            for j in range(i):
+                score += np.log((co_doc[i, j] + 1) / max(doc_counts[j], 1))
+        scores.append(score)
+    return float(np.mean(scores))
+
+
+def _fit_config(config):
+    """Entraîne un modèle pour une configuration de la grille (exécuté dans un worker)"""
+    n_topics, max_df, min_df, n_words, random_state = config
+    X = _shared['X']
+    columns = select_features(_shared['doc_freq'], X.shape[0], max_df, min_df)
+    X_config = X[:, columns]
+
+    start = time.perf_counter()
+    lda = LatentDirichletAllocation(n_components=n_topics, random_state=random_state)
+    lda.fit(X_config)
+    fit_seconds = time.perf_counter() - start
+
+    return {
+        'n_topics': n_topics,
+        'max_df': max_df,
+        'min_df': min_df,
+        'n_features': len(columns),
+        'perplexity': float(lda.perplexity(X_config)),
+        'coherence': umass_coherence(X_config, lda.components_, n_words),
+        'fit_seconds': fit_seconds,
+    }
+
+
+def run_lda_sweep(texts, n_topics_grid=(4, 6, 8, 10), max_df_grid=(0.95,), min_df_grid=(2,),
+                  n_words=10, n_jobs=None, random_state=42):
+    """
+    Entraîne un modèle LDA par combinaison de la grille, en parallèle
+
+    Args:
+        texts: liste des textes à analyser
+        n_topics_grid: nombres de topics à tester
+        max_df_grid: valeurs de max_df à tester
+        min_df_grid: valeurs de min_df à tester
+        n_words: nombre de mots par topic pour la cohérence
+        n_jobs: nombre de processus (None pour tous les cœurs)
+        random_state: graine pour la reproductibilité
+
+    Returns:
+        DataFrame: une ligne par configuration (perplexité, cohérence, durée)
+    """
+    # Vectorisation unique avec les seuils les plus larges, filtrés ensuite par configuration
+    vectorizer = CountVectorizer(stop_words='english')
+    X = vectorizer.fit_transform(texts).tocsr()
+    doc_freq = np.bincount(X.indices, minlength=X.shape[1])
+
+    configs = [
+        (n_topics, max_df, min_df, n_words, random_state)
+        for n_topics, max_df, min_df in itertools.product(n_topics_grid, max_df_grid, min_df_grid)
+    ]
+
+    with tempfile.TemporaryDirectory() as matrix_dir:
+        _save_matrix(X, doc_freq, matrix_dir)
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(matrix_dir, X.shape)) as executor:
+            results = list(executor.map(_fit_config, configs))
+
+    return pd.DataFrame(results).sort_values(['coherence', 'perplexity'], ascending=[False, True]).reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Balayage des hyperparamètres LDA")
+    parser.add_argument('path', help="CSV contenant les textes nettoyés")
+    parser.add_argument('--text-column', default='clean_review')
+    parser.add_argument('--topics', type=int, nargs='+', default=[4, 6, 8, 10])
+    parser.add_argument('--max-df', type=float, nargs='+', default=[0.95])
+    parser.add_argument('--min-df', type=int, nargs='+', default=[2])
+    parser.add_argument('--n-words', type=int, default=10)
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--output', help="chemin CSV du tableau de résultats")
+    args = parser.parse_args(argv)
+
+    from .lda_analyzer import prepare_lda_data
+
+    # Lecture seule du CSV : aucun store n'est écrit à côté du fichier de l'utilisateur
+    _, texts = prepare_lda_data(pd.read_csv(args.path, usecols=[args.text_column]), text_column=args.text_column)
+    results = run_lda_sweep(texts, args.topics, args.max_df, args.min_df, n_words=args.n_words, n_jobs=args.jobs)
+    print(results.to_string(index=False))
+    if args.output:
+        results.to_csv(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
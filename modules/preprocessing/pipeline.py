@@ -0,0 +1,450 @@
+"""
+Pipeline hors ligne de génération des artefacts de l'application
+
+Étapes : load → clean → score → lda / bertopic → similarity → export.
+Chaque étape écrit ses artefacts dans un répertoire de travail et n'est
+réexécutée que si ses entrées (fichiers amont et paramètres) ont changé.
+
+Usage :
+    python -m modules.preprocessing.pipeline avis_bruts.csv --output-dir data --jobs 4
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .data_store import write_store, load_store, apply_column_dtypes
+from .artifact_bundle import SENTIMENT_SPLITS, BERT_SUFFIXES
+from .topic_index import INDEX_SUFFIX
+from .embedding_backend import BACKENDS
+from .topic_keywords import KEYWORDS_NAME
+from .similarity_index import INDEX_NAME as SIMILARITY_INDEX_NAME, VECTORS_NAME as SIMILARITY_VECTORS_NAME
+
+EXPORT_COLUMNS = ['description-text', 'clean_review', 'sentiment', 'sentiment_score', 'Condition', 'Age_numeric', 'Gender']
+
+# Valeurs invalides de la colonne Age / Gender dans le dump brut (dates Excel, colonnes décalées)
+INVALID_AGES = ["12-Jul", "Female", "6-Mar", "Male", "0-2", "Patient"]
+INVALID_GENDERS = ["patient", "caregiver"]
+
+DEFAULT_PARAMS = {
+    'lda_topics': {'negative': 6, 'positive': 5},
+    'lda_words': 5,
+    'lda_top_k': 3,
+    # 'online' : modèle entraîné par mini-batchs, pouvant être mis à jour avec de nouveaux avis
+    'lda_method': 'batch',
+    'bert_topics': 'auto',
+    'embedding_model': 'all-MiniLM-L12-v2',
+    'embedding_backend': 'torch',
+}
+
+MANIFEST_NAME = 'manifest.json'
+
+# Topics compacts par document (k meilleurs topics en int16 / float16)
+DOC_TOPICS_SUFFIX = '_doc_topics.npz'
+
+# Modèle LDA et vectorizer entraînés (bundle : poids .npy, vocabulaire et paramètres JSON)
+LDA_MODEL_SUFFIX = '_model'
+
+
+def parse_age(value):
+    """
+    Convertit une tranche d'âge ("25-34", "75 or over") en âge numérique (centre de la tranche)
+
+    Args:
+        value: tranche d'âge brute
+
+    Returns:
+        float ou None si la tranche n'est pas reconnue
+    """
+    if pd.isna(value):
+        return None
+    value = str(value).strip()
+    match = re.fullmatch(r"(\d+)\s*-\s*(\d+)", value)
+    if match:
+        return (int(match.group(1)) + int(match.group(2))) / 2
+    match = re.fullmatch(r"(\d+)\s+or over", value)
+    if match:
+        return float(int(match.group(1)) + 5)
+    return None
+
+
+# Étapes du pipeline
+# Chaque étape reçoit le contexte d'exécution et écrit ses sorties dans context['work_dir']
+
+def load_raw_reviews(input_path):
+    """
+    Charge le dump brut et normalise les colonnes démographiques
+
+    Returns:
+        DataFrame : description-text, Condition, Age_numeric, Gender
+    """
+    df = pd.read_csv(input_path, encoding='latin1', on_bad_lines='skip', header=0)
+    df = df.rename(columns={' Condition': 'Condition'})
+
+    ages = df['Age'].astype(str).str.strip()
+    df = df[~ages.isin(INVALID_AGES)].assign(Age_numeric=lambda d: d['Age'].map(parse_age).astype('float32'))
+    return df[['description-text', 'Condition', 'Age_numeric', 'Gender']]
+
+
+def clean_reviews(df, n_jobs=1, chunk_size=50_000):
+    """
+    Nettoie les avis (colonne clean_review) et la colonne Gender, retire les genres invalides
+
+    Args:
+        df: DataFrame retourné par load_raw_reviews
+        n_jobs: nombre de processus pour le nettoyage
+        chunk_size: taille des morceaux en mode parallèle
+
+    Returns:
+        DataFrame nettoyé
+    """
+    from .text_cleaner import clean_series
+
+    df = df.copy(deep=False)
+    df['clean_review'] = clean_series(df['description-text'], n_jobs=n_jobs, chunk_size=chunk_size)
+    genders = clean_series(df['Gender'])
+    df['Gender'] = genders.mask(genders == "")
+    return df[~df['Gender'].isin(INVALID_GENDERS)]
+
+
+def run_load(context):
+    """Charge le dump brut et normalise les colonnes démographiques"""
+    write_store(load_raw_reviews(context['input_path']), _work_path(context, 'loaded.feather'))
+
+
+def run_clean(context):
+    """Nettoie les avis et la colonne Gender"""
+    df = load_store(_work_path(context, 'loaded.feather'))
+    write_store(clean_reviews(df, context['n_jobs'], context['chunk_size']), _work_path(context, 'cleaned.feather'))
+
+
+def score_reviews(df, cache_path=None, n_jobs=1, chunk_size=50_000):
+    """
+    Ajoute les scores VADER (cache par empreinte) et les labels de sentiment aux avis nettoyés
+
+    Returns:
+        DataFrame aux colonnes EXPORT_COLUMNS, aux types compacts
+    """
+    from .sentiment_scorer import score_sentiment, get_sentiment_labels
+
+    df = df.copy(deep=False)
+    df['sentiment_score'] = score_sentiment(df['clean_review'], cache_path=cache_path, n_jobs=n_jobs,
+                                            chunk_size=chunk_size)
+    df['sentiment'] = get_sentiment_labels(df['sentiment_score'])
+    return apply_column_dtypes(df[EXPORT_COLUMNS])
+
+
+def run_score(context):
+    """Calcule les scores VADER (avec cache par empreinte) et les labels de sentiment"""
+    df = load_store(_work_path(context, 'cleaned.feather'))
+    df = score_reviews(df, cache_path=_work_path(context, 'sentiment_cache.feather'),
+                       n_jobs=context['n_jobs'], chunk_size=context['chunk_size'])
+    write_store(df, _work_path(context, 'scored.feather'))
+
+
+def run_lda(context):
+    """Entraîne un modèle LDA par sentiment et assigne les topics aux avis"""
+    from .lda_analyzer import (
+        prepare_lda_data, run_lda_analysis, run_online_lda, extract_lda_topic_table, assign_topics_to_documents, save_doc_topics,
+        save_lda_model
+    )
+    from .topic_keywords import save_topic_keywords
+    from .topic_index import build_topic_example_index, save_topic_example_index
+
+    df = load_store(_work_path(context, 'scored.feather'))
+    params = context['params']
+    keywords = {}
+    for split, sentiment in SENTIMENT_SPLITS.items():
+        df_cleaned, texts = prepare_lda_data(df[df['sentiment'] == sentiment])
+        train = run_online_lda if params['lda_method'] == 'online' else run_lda_analysis
+        lda_model, vectorizer, doc_topics = train(texts, n_topics=params['lda_topics'][split], top_k=params['lda_top_k'])
+        keywords[split] = extract_lda_topic_table(lda_model, vectorizer, n_words=params['lda_words'])
+        # Modèle conservé pour l'assignation des nouveaux avis (voir inference.py)
+        save_lda_model(lda_model, vectorizer, _work_path(context, f'lda_{split}{LDA_MODEL_SUFFIX}'))
+        write_store(assign_topics_to_documents(df_cleaned, doc_topics), _work_path(context, f'lda_{split}.feather'))
+        save_doc_topics(doc_topics, _work_path(context, f'lda_{split}{DOC_TOPICS_SUFFIX}'))
+        # Exemples représentatifs : documents classés par probabilité du topic assigné
+        topic_ids, weights = doc_topics
+        examples = build_topic_example_index(topic_ids[:, 0], weights[:, 0])
+        save_topic_example_index(examples, _work_path(context, f'lda_{split}{INDEX_SUFFIX}'))
+
+    save_topic_keywords(keywords, _work_path(context, KEYWORDS_NAME))
+
+
+def run_bertopic(context):
+    """Entraîne un modèle BERTopic par sentiment sur les avis bruts"""
+    from .bert_analyzer import prepare_bert_data, run_bert_analysis
+
+    df = load_store(_work_path(context, 'scored.feather'))
+    params = context['params']
+    for split, sentiment in SENTIMENT_SPLITS.items():
+        _, texts = prepare_bert_data(df[df['sentiment'] == sentiment])
+        topic_model, _, _ = run_bert_analysis(
+            texts,
+            n_topics=params['bert_topics'],
+            embedding_model_name=params['embedding_model'],
+            embedding_backend=params['embedding_backend'],
+            verbose=False,
+            embedding_store_dir=_work_path(context, 'embeddings')
+        )
+        suffix = BERT_SUFFIXES[split]
+        topic_model.save(_work_path(context, f'bert_model_{suffix}'))
+        write_store(topic_model.get_topic_info(), _work_path(context, f'topic_info_{suffix}.feather'))
+
+
+def run_similarity(context):
+    """Construit l'index de recherche des avis similaires sur les embeddings de tous les avis"""
+    from .embedding_store import get_embeddings
+    from .similarity_index import build_similarity_index, save_similarity_index
+
+    df = load_store(_work_path(context, 'scored.feather'), columns=['description-text'])
+    # Une position par ligne de reviews_cleaned.csv ; les embeddings calculés par BERTopic sont réutilisés
+    texts = df['description-text'].fillna('').astype(str).tolist()
+    model_name = context['params']['embedding_model']
+    vectors = get_embeddings(texts, model_name, _work_path(context, 'embeddings'),
+                             backend=context['params']['embedding_backend'])
+    save_similarity_index(build_similarity_index(vectors), context['work_dir'], model_name=model_name,
+                          backend=context['params']['embedding_backend'])
+
+
+def run_export(context):
+    """Copie les artefacts finaux dans le répertoire lu par l'application"""
+    from .artifact_bundle import get_bundle_dir, topic_info_table, write_bundle
+    from .lda_analyzer import load_doc_topics, load_lda_model, lda_model_parts
+    from .topic_index import load_topic_example_index
+
+    output_dir = context['output_dir']
+    os.makedirs(output_dir, exist_ok=True)
+
+    load_store(_work_path(context, 'scored.feather')).to_csv(os.path.join(output_dir, 'reviews_cleaned.csv'), index=False)
+
+    # Mots-clés, modèles LDA, topics par document, exemples et topics BERTopic : bundle mappable, sans pickle
+    bundle = {'lda_keywords': ('topic_keywords', _work_path(context, KEYWORDS_NAME))}
+    for split in SENTIMENT_SPLITS:
+        df = load_store(_work_path(context, f'lda_{split}.feather'))
+        df.to_csv(os.path.join(output_dir, f'df_with_topics_{split}.csv'), index=False)
+        bundle[f'lda_model_{split}'] = ('lda_model', lda_model_parts(
+            *load_lda_model(_work_path(context, f'lda_{split}{LDA_MODEL_SUFFIX}'))))
+        topic_ids, weights = load_doc_topics(_work_path(context, f'lda_{split}{DOC_TOPICS_SUFFIX}'))
+        bundle[f'lda_doc_topics_{split}'] = ('doc_topics', {'topic_ids': topic_ids, 'weights': weights})
+        bundle[f'lda_examples_{split}'] = ('topic_examples',
+                                           load_topic_example_index(_work_path(context, f'lda_{split}{INDEX_SUFFIX}')))
+
+    for split, suffix in BERT_SUFFIXES.items():
+        topic_info = load_store(_work_path(context, f'topic_info_{suffix}.feather'))
+        bundle[f'bert_topic_info_{split}'] = ('topic_info', topic_info_table(topic_info))
+        # CSV lisible conservé : les listes y sont écrites sous forme de chaînes, comme dans l'export du notebook
+        for column in ['Representation', 'Representative_Docs']:
+            if column in topic_info.columns:
+                topic_info[column] = topic_info[column].map(lambda values: str([str(v) for v in values]))
+        topic_info.to_csv(os.path.join(output_dir, f'topic_info_{suffix}.csv'), index=False)
+        shutil.copy2(_work_path(context, f'bert_model_{suffix}'), os.path.join(output_dir, f'bert_model_{suffix}'))
+
+    write_bundle(get_bundle_dir(output_dir), bundle)
+
+    for name in (SIMILARITY_INDEX_NAME, SIMILARITY_VECTORS_NAME):
+        shutil.copy2(_work_path(context, name), os.path.join(output_dir, name))
+
+
+# Graphe des dépendances : étape -> (fonction, étapes amont, sorties, paramètres utilisés)
+STAGES = {
+    'load': (run_load, [], ['loaded.feather'], []),
+    'clean': (run_clean, ['load'], ['cleaned.feather'], []),
+    'score': (run_score, ['clean'], ['scored.feather'], []),
+    'lda': (run_lda, ['score'],
+            ['lda_negative.feather', 'lda_positive.feather', KEYWORDS_NAME,
+             f'lda_negative{INDEX_SUFFIX}', f'lda_positive{INDEX_SUFFIX}',
+             f'lda_negative{DOC_TOPICS_SUFFIX}', f'lda_positive{DOC_TOPICS_SUFFIX}',
+             f'lda_negative{LDA_MODEL_SUFFIX}', f'lda_positive{LDA_MODEL_SUFFIX}'],
+            ['lda_topics', 'lda_words', 'lda_top_k', 'lda_method']),
+    'bertopic': (run_bertopic, ['score'],
+                 ['bert_model_neg', 'bert_model_pos', 'topic_info_neg.feather', 'topic_info_pos.feather'],
+                 ['bert_topics', 'embedding_model', 'embedding_backend']),
+    # Dépend de bertopic pour réutiliser ses embeddings au lieu d'encoder en parallèle
+    'similarity': (run_similarity, ['score', 'bertopic'],
+                   [SIMILARITY_INDEX_NAME, SIMILARITY_VECTORS_NAME], ['embedding_model', 'embedding_backend']),
+    'export': (run_export, ['score', 'lda', 'bertopic', 'similarity'], [], []),
+}
+
+
+def _work_path(context, name):
+    return os.path.join(context['work_dir'], name)
+
+
+def file_digest(path):
+    """Empreinte SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_fingerprint(stage, context):
+    """
+    Empreinte des entrées d'une étape : contenu des sorties amont et paramètres utilisés
+
+    Args:
+        stage: nom de l'étape
+        context: contexte d'exécution
+
+    Returns:
+        str: empreinte hexadécimale
+    """
+    _, deps, _, param_names = STAGES[stage]
+    inputs = {'params': {name: context['params'][name] for name in param_names}}
+    if stage == 'load':
+        inputs['input'] = file_digest(context['input_path'])
+    for dep in deps:
+        for output in STAGES[dep][2]:
+            inputs[output] = file_digest(_work_path(context, output))
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def resolve_stages(targets):
+    """
+    Liste des étapes à exécuter pour produire les cibles, groupées par niveau du graphe
+
+    Args:
+        targets: liste des étapes cibles
+
+    Returns:
+        list: niveaux successifs (les étapes d'un même niveau sont indépendantes)
+    """
+    needed = set()
+    pending = list(targets)
+    while pending:
+        stage = pending.pop()
+        if stage not in needed:
+            needed.add(stage)
+            pending.extend(STAGES[stage][1])
+
+    levels, done = [], set()
+    while len(done) < len(needed):
+        level = [s for s in STAGES if s in needed and s not in done and set(STAGES[s][1]) <= done]
+        levels.append(level)
+        done.update(level)
+    return levels
+
+
+def _run_stage(stage, context):
+    start = time.perf_counter()
+    STAGES[stage][0](context)
+    return time.perf_counter() - start
+
+
+def run_pipeline(input_path, output_dir='data', work_dir='artifacts', targets=('export',),
+                 params=None, n_jobs=1, chunk_size=50_000, force=False):
+    """
+    Exécute le pipeline en sautant les étapes dont les entrées n'ont pas changé
+
+    Args:
+        input_path: chemin du dump CSV brut
+        output_dir: répertoire des artefacts lus par l'application
+        work_dir: répertoire des artefacts intermédiaires et du manifeste
+        targets: étapes cibles (leurs dépendances sont exécutées avant)
+        params: paramètres des modèles (complètent DEFAULT_PARAMS)
+        n_jobs: nombre de processus (nettoyage, scoring et étapes indépendantes)
+        chunk_size: taille des morceaux en mode parallèle
+        force: réexécuter toutes les étapes
+
+    Returns:
+        dict: statut et durée de chaque étape
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    context = {
+        'input_path': input_path,
+        'output_dir': output_dir,
+        'work_dir': work_dir,
+        'params': {**DEFAULT_PARAMS, **(params or {})},
+        'n_jobs': n_jobs,
+        'chunk_size': chunk_size,
+    }
+
+    manifest_path = os.path.join(work_dir, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    report = {}
+    for level in resolve_stages(targets):
+        to_run = {}
+        for stage in level:
+            fingerprint = stage_fingerprint(stage, context)
+            outputs_exist = all(os.path.exists(_work_path(context, o)) for o in STAGES[stage][2])
+            up_to_date = manifest.get(stage, {}).get('fingerprint') == fingerprint and outputs_exist
+            if up_to_date and not force and stage != 'export':
+                report[stage] = {'status': 'skipped', 'seconds': 0.0}
+            else:
+                to_run[stage] = fingerprint
+
+        if n_jobs > 1 and len(to_run) > 1:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(to_run))) as executor:
+                futures = {stage: executor.submit(_run_stage, stage, context) for stage in to_run}
+                durations = {stage: future.result() for stage, future in futures.items()}
+        else:
+            durations = {stage: _run_stage(stage, context) for stage in to_run}
+
+        for stage, seconds in durations.items():
+            manifest[stage] = {'fingerprint': to_run[stage], 'seconds': round(seconds, 3)}
+            report[stage] = {'status': 'ran', 'seconds': seconds}
+            print(f"[{stage}] terminé en {seconds:.1f}s")
+
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère les artefacts de l'application à partir du dump brut des avis")
+    parser.add_argument('input_path', help="CSV brut des avis (dataset Kaggle Abilify)")
+    parser.add_argument('--output-dir', default='data', help="répertoire lu par l'application")
+    parser.add_argument('--work-dir', default='artifacts', help="répertoire des artefacts intermédiaires")
+    parser.add_argument('--targets', nargs='+', default=['export'], choices=list(STAGES), help="étapes cibles")
+    parser.add_argument('--jobs', type=int, default=1, help="nombre de processus")
+    parser.add_argument('--chunk-size', type=int, default=50_000, help="taille des morceaux en mode parallèle")
+    parser.add_argument('--lda-topics-negative', type=int, default=DEFAULT_PARAMS['lda_topics']['negative'])
+    parser.add_argument('--lda-topics-positive', type=int, default=DEFAULT_PARAMS['lda_topics']['positive'])
+    parser.add_argument('--lda-words', type=int, default=DEFAULT_PARAMS['lda_words'])
+    parser.add_argument('--lda-top-k', type=int, default=DEFAULT_PARAMS['lda_top_k'],
+                        help="nombre de topics conservés par document")
+    parser.add_argument('--lda-method', default=DEFAULT_PARAMS['lda_method'], choices=['batch', 'online'],
+                        help="entraînement LDA ; 'online' permet la mise à jour par le rafraîchissement incrémental")
+    parser.add_argument('--bert-topics', default=DEFAULT_PARAMS['bert_topics'], help="nombre de topics ou 'auto'")
+    parser.add_argument('--embedding-backend', default=DEFAULT_PARAMS['embedding_backend'], choices=BACKENDS,
+                        help="variante du modèle d'embedding (int8 / onnx pour accélérer l'encodage sur CPU)")
+    parser.add_argument('--force', action='store_true', help="réexécuter toutes les étapes")
+    args = parser.parse_args(argv)
+
+    params = {
+        'lda_topics': {'negative': args.lda_topics_negative, 'positive': args.lda_topics_positive},
+        'lda_words': args.lda_words,
+        'lda_top_k': args.lda_top_k,
+        'lda_method': args.lda_method,
+        'bert_topics': args.bert_topics if args.bert_topics == 'auto' else int(args.bert_topics),
+        'embedding_backend': args.embedding_backend,
+    }
+    report = run_pipeline(
+        args.input_path,
+        output_dir=args.output_dir,
+        work_dir=args.work_dir,
+        targets=args.targets,
+        params=params,
+        n_jobs=args.jobs,
+        chunk_size=args.chunk_size,
+        force=args.force
+    )
+    for stage, info in report.items():
+        print(f"{stage:<10} {info['status']:<8} {info['seconds']:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .data_store import write_store, load_store, hash_texts
+
+SENTIMENT_LABELS = ['Négatif', 'Neutre', 'Positif']
+
+# Analyseur VADER propre à chaque processus (créé par _init_worker)
+_analyzer = None
+
+
+def _init_worker():
+    """Instancie un SentimentIntensityAnalyzer par processus"""
+    global _analyzer
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    _analyzer = SentimentIntensityAnalyzer()
+
+
+def _score_chunk(texts):
+    """Calcule le score compound VADER d'un morceau de textes"""
+    if _analyzer is None:
+        _init_worker()
+    return np.array([_analyzer.polarity_scores(text)['compound'] for text in texts], dtype=np.float64)
+
+
+def score_texts(texts, n_jobs=1, chunk_size=10_000):
+    """
+    Calcule les scores VADER d'une liste de textes
+
+    Args:
+        texts: liste (ou Series) de textes nettoyés
+        n_jobs: nombre de processus (1 pour rester dans le processus courant)
+        chunk_size: nombre de textes envoyés à chaque worker
+
+    Returns:
+        array des scores compound
+    """
+    texts = ["" if pd.isna(text) else str(text) for text in texts]
+    if n_jobs == 1 or len(texts) <= chunk_size:
+        return _score_chunk(texts)
+
+    chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as executor:
+        return np.concatenate(list(executor.map(_score_chunk, chunks)))
+
+
+def get_sentiment_labels(scores, positive_threshold=0.05, negative_threshold=-0.05):
+    """
+    Catégorise les scores en 'Positif', 'Négatif' ou 'Neutre' en une passe vectorisée
+
+    Args:
+        scores: Series ou array des scores compound
+        positive_threshold: score minimal d'un avis positif
+        negative_threshold: score maximal d'un avis négatif
+
+    Returns:
+        Series catégorielle des sentiments
+    """
+    values = np.asarray(scores, dtype=np.float64)
+    codes = np.where(values >= positive_threshold, 2, np.where(values <= negative_threshold, 0, 1))
+    labels = pd.Categorical.from_codes(codes, categories=SENTIMENT_LABELS)
+    index = scores.index if isinstance(scores, pd.Series) else None
+    return pd.Series(labels, index=index, name='sentiment')
+
+
+def load_score_cache(cache_path):
+    """
+    Charge le cache des scores déjà calculés
+
+    Args:
+        cache_path: chemin du fichier de cache
+
+    Returns:
+        Series des scores indexée par empreinte de texte
+    """
+    if not os.path.exists(cache_path):
+        return pd.Series(dtype=np.float64, index=pd.Index([], dtype=np.uint64))
+    cache = load_store(cache_path)
+    return pd.Series(cache['sentiment_score'].to_numpy(), index=cache['hash'].to_numpy())
+
+
+def save_score_cache(cache, cache_path):
+    """Enregistre le cache des scores (Series indexée par empreinte)"""
+    write_store(pd.DataFrame({'hash': cache.index.to_numpy(dtype=np.uint64),
+                              'sentiment_score': cache.to_numpy()}), cache_path)
+
+
+def score_sentiment(texts, cache_path=None, n_jobs=1, chunk_size=10_000):
+    """
+    Calcule les scores de sentiment en ne recalculant que les textes nouveaux ou modifiés
+
+    Args:
+        texts: Series de textes nettoyés
+        cache_path: chemin du cache par empreinte de contenu (None pour désactiver)
+        n_jobs: nombre de processus pour les textes à scorer
+        chunk_size: nombre de textes envoyés à chaque worker
+
+    Returns:
+        Series des scores, avec le même index que texts
+    """
+    if cache_path is None:
+        return pd.Series(score_texts(texts, n_jobs, chunk_size), index=texts.index, name='sentiment_score')
+
+    cache = load_score_cache(cache_path)
+    scores, cache, updated = _score_with_cache(texts, cache, n_jobs, chunk_size)
+    if updated:
+        save_score_cache(cache, cache_path)
+    return scores
+
+
+def _score_with_cache(texts, cache, n_jobs, chunk_size):
+    """Score les textes absents du cache et retourne (scores, cache complété, cache modifié)"""
+    hashes = hash_texts(texts)
+    missing = ~pd.Index(hashes).isin(cache.index)
+    if missing.any():
+        new_hashes, first_rows = np.unique(hashes[missing], return_index=True)
+        new_texts = texts[missing].iloc[first_rows]
+        new_scores = pd.Series(score_texts(new_texts, n_jobs, chunk_size), index=new_hashes)
+        cache = pd.concat([cache, new_scores])
+
+    scores = pd.Series(cache.reindex(hashes).to_numpy(), index=texts.index, name='sentiment_score')
+    return scores, cache, bool(missing.any())
+
+
+def score_chunks(chunks, text_column='clean_review', cache_path=None, n_jobs=1, chunk_size=10_000):
+    """
+    Score des lots de données au fil de l'eau et ajoute les colonnes sentiment_score et sentiment
+
+    Le cache est chargé une fois et enregistré quand tous les lots ont été traités.
+
+    Args:
+        chunks: itérable de DataFrames (par exemple la sortie de text_cleaner.clean_chunks)
+        text_column: colonne contenant le texte nettoyé
+        cache_path: chemin du cache par empreinte de contenu (None pour désactiver)
+        n_jobs: nombre de processus pour les textes à scorer
+        chunk_size: nombre de textes envoyés à chaque worker
+
+    Yields:
+        chaque lot avec les colonnes de sentiment ajoutées
+    """
+    cache = load_score_cache(cache_path) if cache_path is not None else None
+    updated = False
+    for chunk in chunks:
+        if cache is None:
+            scores = score_sentiment(chunk[text_column], n_jobs=n_jobs, chunk_size=chunk_size)
+        else:
+            scores, cache, chunk_updated = _score_with_cache(chunk[text_column], cache, n_jobs, chunk_size)
+            updated = updated or chunk_updated
+        chunk['sentiment_score'] = scores
+        chunk['sentiment'] = get_sentiment_labels(scores)
+        yield chunk
+
+    if updated:
+        save_score_cache(cache, cache_path)
@@ -0,0 +1,174 @@
+"""
+Recherche des avis similaires (plus proches voisins approchés sur les embeddings)
+
+Index de type IVF : les vecteurs normalisés sont répartis en listes autour de
+centroïdes (k-means) ; une requête ne parcourt que les n_probe listes les plus
+proches au lieu de tout le corpus. Les vecteurs sont rangés liste par liste en
+float16, dans un .npy lu en mémoire mappée.
+"""
+import os
+
+import numpy as np
+
+INDEX_NAME = 'similarity_index.npz'
+VECTORS_NAME = 'similarity_vectors.npy'
+
+
+def normalize(vectors):
+    """Normalise les vecteurs (norme L2 = 1) pour que le produit scalaire soit un cosinus"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores, k):
+    """Indices des k meilleurs scores de chaque ligne, triés par score décroissant"""
+    k = min(k, scores.shape[1])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def _kmeans(vectors, n_lists, n_iter, random_state):
+    """k-means sphérique (centroïdes normalisés) sur des vecteurs normalisés"""
+    rng = np.random.default_rng(random_state)
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind='stable')
+        lists, starts = np.unique(assignments[order], return_index=True)
+        # Une liste vide garde son ancien centroïde
+        sums = centroids.copy()
+        sums[lists] = np.add.reduceat(vectors[order], starts, axis=0)
+        centroids = normalize(sums)
+    return centroids
+
+
+def build_similarity_index(vectors, n_lists=None, n_iter=10, sample_size=100_000, batch_size=65_536,
+                           random_state=42):
+    """
+    Construit l'index IVF des embeddings
+
+    Args:
+        vectors: embeddings (n_documents × dimension), position = position de l'avis
+        n_lists: nombre de listes (par défaut racine du nombre de documents)
+        n_iter: itérations du k-means
+        sample_size: nombre de vecteurs utilisés pour entraîner le k-means
+        batch_size: taille des lots pour l'affectation des vecteurs aux listes
+        random_state: graine pour la reproductibilité
+
+    Returns:
+        dict: centroids, offsets (début de chaque liste), rows (positions des avis
+              rangées par liste), vectors (float16, dans l'ordre de rows)
+    """
+    n_documents = len(vectors)
+    if n_lists is None:
+        n_lists = int(np.sqrt(n_documents))
+    n_lists = max(1, min(n_lists, n_documents))
+
+    rng = np.random.default_rng(random_state)
+    sample = np.sort(rng.choice(n_documents, min(sample_size, n_documents), replace=False))
+    centroids = _kmeans(normalize(vectors[sample]), n_lists, n_iter, random_state)
+
+    assignments = np.empty(n_documents, dtype=np.int32)
+    for start in range(0, n_documents, batch_size):
+        batch = normalize(vectors[start:start + batch_size])
+        assignments[start:start + batch_size] = np.argmax(batch @ centroids.T, axis=1)
+
+    rows = np.argsort(assignments, kind='stable')
+    offsets = np.searchsorted(assignments[rows], np.arange(n_lists + 1)).astype(np.int64)
+    ordered = np.empty((n_documents, centroids.shape[1]), dtype=np.float16)
+    for start in range(0, n_documents, batch_size):
+        ordered[start:start + batch_size] = normalize(vectors[rows[start:start + batch_size]])
+
+    return {
+        'centroids': centroids,
+        'offsets': offsets,
+        'rows': rows.astype(np.int64),
+        'vectors': ordered,
+    }
+
+
+def search_similar(index, queries, k=10, n_probe=8, exclude=None):
+    """
+    Avis les plus proches de chaque requête
+
+    Args:
+        index: index construit par build_similarity_index (ou chargé)
+        queries: embeddings des requêtes (n_requêtes × dimension)
+        k: nombre de voisins par requête
+        n_probe: nombre de listes parcourues (plus = plus précis, plus lent)
+        exclude: positions d'avis à écarter, une par requête (ex: l'avis de départ)
+
+    Returns:
+        tuple: (positions des avis, similarités cosinus), chacun n_requêtes × k ;
+               -1 / -inf si moins de k candidats
+    """
+    queries = normalize(np.atleast_2d(queries))
+    n_probe = min(n_probe, len(index['centroids']))
+    probes = _top_k(queries @ index['centroids'].T, n_probe)
+
+    positions = np.full((len(queries), k), -1, dtype=np.int64)
+    similarities = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    offsets = index['offsets']
+    for i, (query, lists) in enumerate(zip(queries, probes)):
+        # Les listes sont contiguës : lecture par tranches, sans indexation aléatoire
+        candidates = np.concatenate([np.arange(offsets[l], offsets[l + 1]) for l in lists])
+        if len(candidates) == 0:
+            continue
+        block = np.concatenate([index['vectors'][offsets[l]:offsets[l + 1]] for l in lists])
+        scores = block.astype(np.float32) @ query
+        if exclude is not None:
+            scores[index['rows'][candidates] == exclude[i]] = -np.inf
+        best = _top_k(scores[np.newaxis, :], k)[0]
+        best = best[np.isfinite(scores[best])]
+        positions[i, :len(best)] = index['rows'][candidates[best]]
+        similarities[i, :len(best)] = scores[best]
+    return positions, similarities
+
+
+def brute_force_search(vectors, queries, k=10):
+    """Recherche exacte par parcours complet (référence pour mesurer le rappel de l'index)"""
+    scores = normalize(np.atleast_2d(queries)) @ normalize(vectors).T
+    best = _top_k(scores, k)
+    return best, np.take_along_axis(scores, best, axis=1)
+
+
+def get_document_vector(index, position):
+    """Embedding normalisé d'un avis de l'index, à partir de sa position"""
+    return np.asarray(index['vectors'][np.flatnonzero(index['rows'] == position)[0]], dtype=np.float32)
+
+
+def save_similarity_index(index, directory, model_name=None, backend=None):
+    """
+    Enregistre l'index : structure en .npz, vecteurs en .npy (lisible en mémoire mappée)
+
+    Args:
+        index: index construit par build_similarity_index
+        directory: répertoire de destination
+        model_name: modèle d'embedding utilisé (nécessaire pour encoder les requêtes texte)
+        backend: variante du modèle utilisée (voir embedding_backend.BACKENDS)
+    """
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, VECTORS_NAME), index['vectors'])
+    np.savez(os.path.join(directory, INDEX_NAME), centroids=index['centroids'], offsets=index['offsets'],
+             rows=index['rows'], model_name=np.array(model_name or ''), backend=np.array(backend or ''))
+
+
+def load_similarity_index(directory):
+    """
+    Charge un index enregistré, vecteurs en mémoire mappée
+
+    Returns:
+        dict de l'index (avec model_name et backend), ou None si l'index n'existe pas
+    """
+    index_path = os.path.join(directory, INDEX_NAME)
+    if not os.path.exists(index_path):
+        return None
+    with np.load(index_path, allow_pickle=False) as data:
+        index = {key: data[key] for key in ('centroids', 'offsets', 'rows')}
+        index['model_name'] = str(data['model_name']) or None
+        # Index antérieurs à l'enregistrement du backend : modèle torch
+        index['backend'] = (str(data['backend']) if 'backend' in data.files else '') or 'torch'
+    index['vectors'] = np.load(os.path.join(directory, VECTORS_NAME), mmap_mode='r')
+    return index
@@ -0,0 +1,114 @@
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+
+import pandas as pd
+
+# Tout ce qui n'est pas une lettre ou un espace (même règle que le notebook)
+NON_ALPHA_RE = re.compile(r"[^a-zA-Z\s]")
+
+
+@lru_cache(maxsize=None)
+def get_stop_words(source='nltk'):
+    """
+    Retourne la liste de mots vides sous forme de frozenset (chargée une seule fois)
+
+    Args:
+        source: 'nltk' (stopwords anglais NLTK, utilisés par le pipeline)
+                ou 'sklearn' (ENGLISH_STOP_WORDS, utilisés par l'application)
+
+    Returns:
+        frozenset des mots vides
+    """
+    if source == 'nltk':
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words("english"))
+    if source == 'sklearn':
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        return frozenset(ENGLISH_STOP_WORDS)
+    raise ValueError("Source de mots vides inconnue. Utilisez 'nltk' ou 'sklearn'")
+
+
+def _filter_tokens(text, stop_words, min_length):
+    return " ".join([w for w in text.split() if w not in stop_words and len(w) >= min_length])
+
+
+def clean_text(text, stop_words=None, min_length=1, alpha_only=True):
+    """
+    Nettoie un texte : minuscules, suppression des caractères non alphabétiques,
+    des mots vides et des mots trop courts
+
+    Args:
+        text: texte à nettoyer (NaN donne une chaîne vide)
+        stop_words: frozenset des mots vides (par défaut ceux de NLTK)
+        min_length: longueur minimale des mots conservés
+        alpha_only: supprimer les caractères non alphabétiques
+
+    Returns:
+        str: texte nettoyé
+    """
+    if pd.isna(text):
+        return ""
+    if stop_words is None:
+        stop_words = get_stop_words('nltk')
+    text = str(text).lower()
+    if alpha_only:
+        text = NON_ALPHA_RE.sub("", text)
+    return _filter_tokens(text, stop_words, min_length)
+
+
+def _clean_chunk(texts, stop_words, min_length, alpha_only):
+    """Nettoie un morceau de Series (exécuté dans un worker)"""
+    texts = texts.fillna("").astype(str).str.lower()
+    if alpha_only:
+        texts = texts.str.replace(NON_ALPHA_RE, "", regex=True)
+    return texts.map(partial(_filter_tokens, stop_words=stop_words, min_length=min_length))
+
+
+def clean_series(texts, stop_words=None, min_length=1, alpha_only=True, n_jobs=1, chunk_size=50_000):
+    """
+    Nettoie une Series de textes en lot
+
+    La mise en minuscules et la suppression des caractères sont vectorisées,
+    le filtrage des mots vides se fait par lookup dans un frozenset.
+    Avec n_jobs > 1, la Series est découpée en morceaux répartis sur un pool de processus.
+
+    Args:
+        texts: Series de textes
+        stop_words: frozenset des mots vides (par défaut ceux de NLTK)
+        min_length: longueur minimale des mots conservés
+        alpha_only: supprimer les caractères non alphabétiques
+        n_jobs: nombre de processus (1 pour rester dans le processus courant)
+        chunk_size: nombre de textes par morceau en mode multiprocessus
+
+    Returns:
+        Series des textes nettoyés, avec le même index
+    """
+    if stop_words is None:
+        stop_words = get_stop_words('nltk')
+    clean_chunk = partial(_clean_chunk, stop_words=stop_words, min_length=min_length, alpha_only=alpha_only)
+
+    if n_jobs == 1 or len(texts) <= chunk_size:
+        return clean_chunk(texts)
+
+    chunks = [texts.iloc[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        return pd.concat(list(executor.map(clean_chunk, chunks)))
+
+
+def clean_chunks(chunks, text_column='description-text', output_column='clean_review', **clean_kwargs):
+    """
+    Nettoie des lots de données au fil de l'eau (voir data_loader.iter_data)
+
+    Args:
+        chunks: itérable de DataFrames
+        text_column: colonne contenant le texte à nettoyer
+        output_column: colonne recevant le texte nettoyé
+        **clean_kwargs: paramètres transmis à clean_series
+
+    Yields:
+        chaque lot avec la colonne nettoyée ajoutée
+    """
+    for chunk in chunks:
+        chunk[output_column] = clean_series(chunk[text_column], **clean_kwargs)
+        yield chunk
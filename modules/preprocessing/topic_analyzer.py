@@ -1,12 +1,250 @@
-from .lda_analyzer import LDAAnalyzer
-from .bert_analyzer import BERTAnalyzer
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    # Windows : pas de getrusage, le pic RSS du processus n'est pas relevé
+    resource = None
+
+
+class TopicEngine(ABC):
+    """
+    Interface commune des moteurs de topics (LDA, BERTopic)
+
+    Les dépendances lourdes (scikit-learn, bertopic, torch) ne sont importées
+    qu'au premier appel d'une méthode qui en a besoin.
+    """
+
+    name = None
+
+    def __init__(self, **params):
+        self.params = params
+        self.model = None
+        self.stats = {}
+
+    @contextmanager
+    def _measure(self, stage):
+        """
+        Mesure le temps réel et le temps CPU d'une étape
+
+        process_peak_rss_mb est le pic RSS du processus depuis son démarrage (pas
+        celui de l'étape) : il ne change qu'après l'étape la plus gourmande.
+        """
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            stats = self.stats.setdefault(stage, {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+            stats['calls'] += 1
+            stats['wall_seconds'] += time.perf_counter() - wall
+            stats['cpu_seconds'] += time.process_time() - cpu
+            if resource is not None:
+                # ru_maxrss est en Ko sous Linux
+                stats['process_peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def _check_fitted(self):
+        if self.model is None:
+            raise ValueError(f"Le moteur '{self.name}' n'est pas entraîné : appelez fit() ou load()")
+
+    @abstractmethod
+    def fit(self, texts):
+        """Entraîne le modèle et retourne le topic de chaque texte"""
+
+    @abstractmethod
+    def transform(self, texts):
+        """Retourne le topic de chaque texte avec le modèle existant"""
+
+    @abstractmethod
+    def partial_update(self, texts):
+        """Met à jour le modèle avec de nouveaux textes et retourne leurs topics"""
+
+    @abstractmethod
+    def get_topics(self, n_words=10):
+        """Retourne les mots-clés par topic : {topic_id: [mots]}"""
+
+    @abstractmethod
+    def save(self, path):
+        """Enregistre le modèle"""
+
+    @abstractmethod
+    def load(self, path):
+        """Charge un modèle enregistré et retourne le moteur"""
+
+
+class LDAEngine(TopicEngine):
+    """
+    Moteur LDA (scikit-learn), entraîné en ligne pour permettre les mises à jour
+
+    Avec top_k, transform et partial_update retournent les k meilleurs topics
+    par document (topic_ids, weights) au lieu du topic principal.
+    """
+
+    name = 'lda'
+
+    def fit(self, texts):
+        from .lda_analyzer import run_online_lda
+        with self._measure('fit'):
+            self.model, self.vectorizer, doc_topics = run_online_lda(texts, **self.params)
+        return doc_topics.argmax(axis=1)
+
+    def transform(self, texts, top_k=None):
+        from .lda_analyzer import transform_top_k
+        self._check_fitted()
+        with self._measure('transform'):
+            X = self.vectorizer.transform(texts)
+            if top_k is not None:
+                return transform_top_k(self.model, X, k=top_k)
+            doc_topics = self.model.transform(X)
+        return doc_topics.argmax(axis=1)
+
+    def can_update(self):
+        """Indique si le modèle peut être mis à jour (entraîné en ligne par run_online_lda)"""
+        from .lda_analyzer import is_updatable
+        self._check_fitted()
+        return is_updatable(self.model)
+
+    def partial_update(self, texts, top_k=None):
+        from .lda_analyzer import update_lda_model, compact_doc_topics
+        self._check_fitted()
+        with self._measure('partial_update'):
+            doc_topics = update_lda_model(self.model, self.vectorizer, texts,
+                                          batch_size=self.params.get('batch_size', 1024))
+        if top_k is not None:
+            return compact_doc_topics(doc_topics, top_k)
+        return doc_topics.argmax(axis=1)
+
+    def get_topic_table(self, n_words=10):
+        """Table des mots-clés (voir lda_analyzer.extract_lda_topic_table)"""
+        from .lda_analyzer import extract_lda_topic_table
+        self._check_fitted()
+        return extract_lda_topic_table(self.model, self.vectorizer, n_words=n_words)
+
+    def get_topics(self, n_words=10):
+        from .lda_analyzer import extract_lda_topics
+        self._check_fitted()
+        return dict(enumerate(extract_lda_topics(self.model, self.vectorizer, n_words=n_words)))
+
+    def save(self, path):
+        from .lda_analyzer import save_lda_model
+        self._check_fitted()
+        with self._measure('save'):
+            save_lda_model(self.model, self.vectorizer, path)
+
+    def load(self, path):
+        from .lda_analyzer import load_lda_model
+        with self._measure('load'):
+            self.model, self.vectorizer = load_lda_model(path)
+        return self
+
+
+class BERTopicEngine(TopicEngine):
+    """Moteur BERTopic ; les mises à jour fusionnent un modèle entraîné sur les nouveaux textes"""
+
+    name = 'bertopic'
+
+    def fit(self, texts):
+        from .bert_analyzer import run_bert_analysis
+        with self._measure('fit'):
+            self.model, topics, _ = run_bert_analysis(texts, verbose=False, **self.params)
+        return np.asarray(topics)
+
+    def transform(self, texts):
+        self._check_fitted()
+        with self._measure('transform'):
+            topics, _ = self.model.transform(texts)
+        return np.asarray(topics)
+
+    def partial_update(self, texts):
+        from bertopic import BERTopic
+        from .bert_analyzer import run_bert_analysis
+        self._check_fitted()
+        with self._measure('partial_update'):
+            new_model, _, _ = run_bert_analysis(texts, verbose=False, **self.params)
+            # Les topics nouveaux sont ajoutés, les topics proches de l'existant y sont rattachés
+            self.model = BERTopic.merge_models([self.model, new_model])
+            topics, _ = self.model.transform(texts)
+        return np.asarray(topics)
+
+    def get_topics(self, n_words=10):
+        self._check_fitted()
+        return {
+            topic_id: [word for word, _ in self.model.get_topic(topic_id)[:n_words]]
+            for topic_id in self.model.get_topic_info()["Topic"].values
+            if topic_id != -1
+        }
+
+    def save(self, path):
+        self._check_fitted()
+        with self._measure('save'):
+            self.model.save(path, serialization='safetensors', save_ctfidf=True,
+                            save_embedding_model=self.params.get('embedding_model_name', 'all-MiniLM-L12-v2'))
+
+    def load(self, path):
+        from modules.model_registry import get_bertopic_model
+        with self._measure('load'):
+            self.model = get_bertopic_model(path)
+        return self
+
+
+# Moteurs disponibles ; d'autres peuvent être ajoutés avec register_engine
+ENGINES = {
+    'lda': LDAEngine,
+    'bertopic': BERTopicEngine,
+}
+
+
+def register_engine(name, engine_class):
+    """Ajoute un moteur de topics (sous-classe de TopicEngine)"""
+    ENGINES[name] = engine_class
+
 
 class TopicAnalyzer:
-	def _init_(self, method='bert'):
-		if method == 'lda':
-			self.analyzer = LDAAnalyzer()
-		else:
-			self.analyzer = BERTAnalyzer()
-
-	def analyze(self, texts, **kwargs):
-		return self.analyzer.analyze()
\ No newline at end of file
+    """
+    Façade unique sur les moteurs de topics
+
+    Exemple :
+        analyzer = TopicAnalyzer('lda', n_topics=6)
+        topics = analyzer.fit(texts)
+        analyzer.stats
+    """
+
+    def __init__(self, method='bertopic', **params):
+        if method == 'bert':
+            method = 'bertopic'
+        if method not in ENGINES:
+            raise ValueError(f"Moteur inconnu : {method}. Disponibles : {', '.join(ENGINES)}")
+        self.method = method
+        self.engine = ENGINES[method](**params)
+
+    def fit(self, texts):
+        return self.engine.fit(texts)
+
+    def transform(self, texts, **kwargs):
+        return self.engine.transform(texts, **kwargs)
+
+    def partial_update(self, texts, **kwargs):
+        return self.engine.partial_update(texts, **kwargs)
+
+    def get_topics(self, n_words=10):
+        return self.engine.get_topics(n_words)
+
+    def save(self, path):
+        self.engine.save(path)
+
+    def load(self, path):
+        self.engine.load(path)
+        return self
+
+    def analyze(self, texts, **kwargs):
+        """Entraîne le moteur et retourne (topics par texte, mots-clés par topic)"""
+        topics = self.fit(texts)
+        return topics, self.get_topics(**kwargs)
+
+    @property
+    def stats(self):
+        """Temps réel, temps CPU et pic RSS du processus par étape"""
+        return self.engine.stats
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+
+INDEX_SUFFIX = '_examples.npz'
+
+
+def build_topic_example_index(topics, scores):
+    """
+    Construit l'index des exemples par topic, classés par probabilité décroissante
+
+    Args:
+        topics: topic assigné à chaque document (position de ligne = position dans le DataFrame)
+        scores: probabilité du topic assigné pour chaque document
+
+    Returns:
+        dict: topic_ids (topics triés), offsets (début de chaque topic dans rows),
+              rows (positions de lignes groupées par topic)
+    """
+    topics = np.asarray(topics)
+    scores = np.asarray(scores, dtype=np.float64)
+    order = np.lexsort((-scores, topics))
+    topic_ids, starts = np.unique(topics[order], return_index=True)
+    return {
+        'topic_ids': topic_ids,
+        'offsets': np.append(starts, len(order)).astype(np.int64),
+        'rows': order.astype(np.int64),
+    }
+
+
+def get_topic_rows(index, topic, n=None):
+    """
+    Positions des n documents les plus représentatifs d'un topic
+
+    Args:
+        index: index construit par build_topic_example_index
+        topic: identifiant du topic
+        n: nombre de documents (None pour tous)
+
+    Returns:
+        array des positions de lignes (vide si le topic est absent)
+    """
+    i = np.searchsorted(index['topic_ids'], topic)
+    if i >= len(index['topic_ids']) or index['topic_ids'][i] != topic:
+        return np.empty(0, dtype=np.int64)
+    start, stop = index['offsets'][i], index['offsets'][i + 1]
+    if n is not None:
+        stop = min(stop, start + n)
+    return index['rows'][start:stop]
+
+
+def get_index_path(data_path):
+    """Chemin de l'index d'exemples associé à un fichier de documents"""
+    return os.path.splitext(data_path)[0] + INDEX_SUFFIX
+
+
+def save_topic_example_index(index, path):
+    """Enregistre l'index d'exemples (format .npz)"""
+    np.savez(path, **index)
+
+
+def load_topic_example_index(path):
+    """
+    Charge un index d'exemples enregistré
+
+    Returns:
+        dict de l'index, ou None si le fichier n'existe pas
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in ('topic_ids', 'offsets', 'rows')}
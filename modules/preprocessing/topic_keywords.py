@@ -0,0 +1,133 @@
+"""
+Stockage des mots-clés des topics (remplace topics_keywords.pkl)
+
+Fichier Arrow IPC versionné, un lot (record batch) par couple (sentiment, topic) :
+l'application ouvre le fichier en mémoire mappée et ne lit que les topics affichés.
+"""
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+KEYWORDS_NAME = 'topics_keywords.arrow'
+FORMAT_VERSION = 1
+
+KEYWORDS_SCHEMA = pa.schema([
+    ('topic', pa.int16()),
+    ('rank', pa.int16()),
+    ('word', pa.string()),
+    ('weight', pa.float32()),
+    ('exclusivity', pa.float32()),
+])
+
+
+def _write_keywords(tables, sink):
+    batches, layout = [], {}
+    for split, table in tables.items():
+        layout[split] = {}
+        for topic, rows in table.groupby('topic', sort=True):
+            layout[split][str(topic)] = len(batches)
+            batches.append(pa.RecordBatch.from_pandas(rows.sort_values('rank')[KEYWORDS_SCHEMA.names],
+                                                      schema=KEYWORDS_SCHEMA, preserve_index=False))
+
+    schema = KEYWORDS_SCHEMA.with_metadata({
+        'format_version': str(FORMAT_VERSION),
+        'layout': json.dumps(layout),
+    })
+    with pa.ipc.new_file(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def save_topic_keywords(tables, path):
+    """
+    Enregistre les tables de mots-clés (voir lda_analyzer.extract_lda_topic_table)
+
+    Args:
+        tables: dict {sentiment ('negative', 'positive'): DataFrame des mots-clés}
+        path: chemin du fichier .arrow
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        _write_keywords(tables, sink)
+    os.replace(tmp_path, path)
+
+
+def _open_reader(reader):
+    metadata = reader.schema.metadata or {}
+    version = int(metadata.get(b'format_version', b'0'))
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Version du fichier de mots-clés non supportée : {version} (attendue : {FORMAT_VERSION})")
+    layout = json.loads(metadata[b'layout'])
+    return {
+        'reader': reader,
+        'layout': {split: {int(topic): batch for topic, batch in topics.items()} for split, topics in layout.items()},
+    }
+
+
+def tables_from_word_lists(word_lists):
+    """
+    Tables de mots-clés à partir de simples listes de mots (poids et exclusivité à NaN)
+
+    Args:
+        word_lists: dict {sentiment: [[mots du topic 0], [mots du topic 1], ...]}
+
+    Returns:
+        dict {sentiment: DataFrame des mots-clés}, au format de save_topic_keywords
+    """
+    return {
+        split: pd.DataFrame(
+            [(topic, rank, word) for topic, words in enumerate(topics) for rank, word in enumerate(words)],
+            columns=['topic', 'rank', 'word']
+        ).assign(weight=float('nan'), exclusivity=float('nan'))
+        for split, topics in word_lists.items()
+    }
+
+
+def keywords_from_word_lists(word_lists):
+    """
+    Construit en mémoire des mots-clés à partir de simples listes de mots (sans poids)
+
+    Returns:
+        même structure que open_topic_keywords (poids et exclusivité à NaN)
+    """
+    sink = pa.BufferOutputStream()
+    _write_keywords(tables_from_word_lists(word_lists), sink)
+    return _open_reader(pa.ipc.open_file(sink.getvalue()))
+
+
+def open_topic_keywords(path):
+    """
+    Ouvre le fichier de mots-clés sans lire les topics
+
+    Returns:
+        dict: reader (lecteur Arrow en mémoire mappée), layout ({sentiment: {topic: lot}}),
+        ou None si le fichier n'existe pas
+    """
+    if not os.path.exists(path):
+        return None
+    return _open_reader(pa.ipc.open_file(pa.memory_map(path, 'r')))
+
+
+def list_topics(keywords, split):
+    """Topics disponibles pour un sentiment, triés"""
+    return sorted(keywords['layout'].get(split, {}))
+
+
+def read_topic(keywords, split, topic):
+    """
+    Lit les mots-clés d'un seul topic
+
+    Returns:
+        DataFrame : rank, word, weight, exclusivity (vide si le topic est absent)
+    """
+    batch = keywords['layout'].get(split, {}).get(topic)
+    if batch is None:
+        return pd.DataFrame(columns=KEYWORDS_SCHEMA.names[1:])
+    return keywords['reader'].get_batch(batch).to_pandas().drop(columns='topic')
+
+
+def read_topic_words(keywords, split, topic):
+    """Mots-clés d'un topic, du plus au moins important"""
+    return read_topic(keywords, split, topic)['word'].tolist()
@@ -0,0 +1,232 @@
+"""
+Instrumentation des étapes coûteuses de l'application
+
+Chaque étape instrumentée (décorateur profiled ou bloc profile_stage) enregistre
+par appel le temps réel, le temps CPU du thread et, si demandé, le pic
+d'allocation mémoire (tracemalloc, mesuré par un seul thread à la fois : voir
+profile_stage). Désactivé, un appel instrumenté ne coûte qu'un test de booléen.
+
+Activation : variable d'environnement APP_PROFILING=1 (APP_PROFILING_MEMORY=1
+pour les allocations), ou depuis le panneau ?perf=1 de l'application.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+# Nombre de durées gardées par étape pour les percentiles
+DEFAULT_WINDOW = 512
+
+_state = {
+    'enabled': os.environ.get('APP_PROFILING') == '1',
+    'memory': os.environ.get('APP_PROFILING_MEMORY') == '1',
+}
+_stages = {}
+_lock = threading.Lock()
+_local = threading.local()
+# tracemalloc n'a qu'un pic pour tout le processus : un seul thread à la fois mesure les pics
+_memory_owner = {'thread': None, 'depth': 0}
+
+if _state['enabled'] and _state['memory']:
+    tracemalloc.start()
+
+
+def is_enabled():
+    """Indique si le profilage est actif"""
+    return _state['enabled']
+
+
+def is_memory_enabled():
+    """Indique si les pics d'allocation sont suivis"""
+    return _state['memory']
+
+
+def set_enabled(enabled, memory=None):
+    """
+    Active ou désactive le profilage pour tout le processus
+
+    Args:
+        enabled: enregistrer les appels instrumentés
+        memory: suivre aussi les pics d'allocation (tracemalloc ralentit toutes les allocations)
+    """
+    if memory is not None:
+        _state['memory'] = memory
+    _state['enabled'] = enabled
+    if enabled and _state['memory']:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    elif tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def _record(name, wall, cpu, peak):
+    with _lock:
+        stats = _stages.get(name)
+        if stats is None:
+            stats = _stages[name] = {
+                'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'wall_max': 0.0,
+                'peak_bytes': None, 'recent': deque(maxlen=DEFAULT_WINDOW),
+            }
+        stats['calls'] += 1
+        stats['wall_seconds'] += wall
+        stats['cpu_seconds'] += cpu
+        stats['wall_max'] = max(stats['wall_max'], wall)
+        stats['recent'].append(wall)
+        if peak is not None:
+            stats['peak_bytes'] = max(stats['peak_bytes'] or 0, peak)
+
+
+def _acquire_memory_tracking():
+    # Sans attente : un thread qui attendrait ici pourrait bloquer celui qui détient un verrou de cache
+    thread = threading.get_ident()
+    with _lock:
+        if _memory_owner['thread'] not in (None, thread):
+            return False
+        _memory_owner['thread'] = thread
+        _memory_owner['depth'] += 1
+        return True
+
+
+def _release_memory_tracking():
+    with _lock:
+        _memory_owner['depth'] -= 1
+        if _memory_owner['depth'] == 0:
+            _memory_owner['thread'] = None
+
+
+@contextmanager
+def profile_stage(name):
+    """
+    Mesure un bloc de code sous le nom d'étape donné
+
+    Les étapes imbriquées sont mesurées chacune ; le pic mémoire d'une étape
+    inclut celui de ses sous-étapes.
+
+    Le pic de tracemalloc est global au processus : un seul thread à la fois
+    mesure les pics de ses étapes, les étapes lancées entre-temps par d'autres
+    threads (autres sessions) n'enregistrent que leurs durées. Le pic mesuré
+    inclut les allocations faites par les autres threads pendant l'étape.
+    """
+    if not _state['enabled']:
+        yield
+        return
+
+    memory = tracemalloc.is_tracing() and _acquire_memory_tracking()
+    if memory:
+        # Pile des pics par thread : le pic de l'étape englobante est conservé avant remise à zéro
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        stack.append([current, current])
+        tracemalloc.reset_peak()
+
+    start_wall, start_cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        wall, cpu = time.perf_counter() - start_wall, time.thread_time() - start_cpu
+        peak_bytes = None
+        if memory:
+            start, running_peak = stack.pop()
+            if tracemalloc.is_tracing():
+                peak = max(running_peak, tracemalloc.get_traced_memory()[1])
+                peak_bytes = peak - start
+                if stack:
+                    stack[-1][1] = max(stack[-1][1], peak)
+            _release_memory_tracking()
+        _record(name, wall, cpu, peak_bytes)
+
+
+def profiled(func=None, name=None):
+    """
+    Décorateur : mesure chaque appel de la fonction (étape nommée d'après la fonction par défaut)
+
+    Usage : @profiled ou @profiled(name='BERTopic.load')
+    """
+    if func is None:
+        return functools.partial(profiled, name=name)
+    stage = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _state['enabled']:
+            return func(*args, **kwargs)
+        with profile_stage(stage):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def reset():
+    """Efface les mesures enregistrées"""
+    with _lock:
+        _stages.clear()
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def snapshot():
+    """
+    Mesures par étape
+
+    Returns:
+        dict {étape: appels, temps réel / CPU cumulés (s), temps réel moyen, p50, p95 et max (s),
+        pic d'allocation maximal (octets, None sans suivi mémoire)}
+    """
+    with _lock:
+        stages = {name: (dict(stats), list(stats['recent'])) for name, stats in _stages.items()}
+    return {
+        name: {
+            'calls': stats['calls'],
+            'wall_seconds': stats['wall_seconds'],
+            'cpu_seconds': stats['cpu_seconds'],
+            'wall_mean': stats['wall_seconds'] / stats['calls'],
+            'wall_p50': _percentile(recent, 0.5),
+            'wall_p95': _percentile(recent, 0.95),
+            'wall_max': stats['wall_max'],
+            'peak_bytes': stats['peak_bytes'],
+        }
+        for name, (stats, recent) in sorted(stages.items())
+    }
+
+
+def export_json(indent=2):
+    """Mesures au format JSON"""
+    return json.dumps({'enabled': _state['enabled'], 'memory': _state['memory'], 'stages': snapshot()},
+                      indent=indent)
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def export_prometheus(prefix='app_stage'):
+    """Mesures au format texte d'exposition Prometheus"""
+    metrics = [
+        ('calls_total', 'counter', "Nombre d'appels", 'calls'),
+        ('wall_seconds_total', 'counter', 'Temps réel cumulé', 'wall_seconds'),
+        ('cpu_seconds_total', 'counter', 'Temps CPU cumulé', 'cpu_seconds'),
+        ('wall_seconds_max', 'gauge', 'Temps réel maximal par appel', 'wall_max'),
+        ('peak_bytes', 'gauge', "Pic d'allocation maximal par appel", 'peak_bytes'),
+    ]
+    stages = snapshot()
+    lines = []
+    for suffix, kind, description, key in metrics:
+        values = [(name, stats[key]) for name, stats in stages.items() if stats[key] is not None]
+        if not values:
+            continue
+        lines.append(f"# HELP {prefix}_{suffix} {description}")
+        lines.append(f"# TYPE {prefix}_{suffix} {kind}")
+        lines.extend(f'{prefix}_{suffix}{{stage="{_escape_label(name)}"}} {value}' for name, value in values)
+    return "\n".join(lines) + "\n"
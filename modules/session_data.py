@@ -0,0 +1,177 @@
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from modules.preprocessing.data_loader import load_data, get_data_ranges, get_data_version, load_stored_ranges
+from modules.preprocessing.filter_index import build_filter_index, filter_bitmap, bitmap_to_rows
+from modules.preprocessing.aggregate_cube import build_aggregate_cube
+
+# Colonnes utilisées par le tableau de bord (clean_review n'est pas lue ; sentiment_score alimente le cube)
+DASHBOARD_COLUMNS = ['description-text', 'sentiment', 'sentiment_score', 'Condition', 'Age_numeric', 'Gender']
+
+# Sessions sans activité depuis plus longtemps sont retirées du rapport mémoire
+SESSION_TTL_SECONDS = 3600
+
+_session_memory = {}
+_session_lock = threading.Lock()
+
+
+def _freeze(value):
+    """Rend les tableaux numpy d'une structure (dict, list) non modifiables"""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _freeze(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _freeze(item)
+    return value
+
+
+def load_shared_dataset(path='data/reviews_cleaned.csv', columns=tuple(DASHBOARD_COLUMNS)):
+    """
+    Charge le jeu de données une seule fois pour tout le processus
+
+    Contrairement à st.cache_data, st.cache_resource ne copie pas le résultat :
+    toutes les sessions partagent les mêmes objets, qui ne doivent pas être modifiés
+    (le copy-on-write de pandas protège le DataFrame, les index sont en lecture seule).
+    Le cache est indexé sur la version du CSV (voir get_data_version) : il est
+    rechargé après un rafraîchissement incrémental.
+
+    Args:
+        path: chemin du CSV nettoyé
+        columns: colonnes à charger
+
+    Returns:
+        dict: df, ranges (plages des filtres), index (bitmaps), cube (agrégats)
+    """
+    return _load_shared_dataset(path, columns, get_data_version(path))
+
+
+# Une seule version du jeu de données est gardée : l'ancienne est libérée après un rafraîchissement
+@st.cache_resource(max_entries=1)
+def _load_shared_dataset(path, columns, version):
+    df = load_data(path, columns=list(columns))
+    # Plages tenues à jour par le rafraîchissement incrémental, sinon recalculées
+    ranges = load_stored_ranges(path, len(df))
+    return {
+        'df': df,
+        'ranges': _freeze(ranges if ranges is not None else get_data_ranges(df)),
+        'index': _freeze(build_filter_index(df)),
+        'cube': build_aggregate_cube(df),
+    }
+
+
+def load_shared_frame(path, columns=None):
+    """
+    Charge un fichier de données une seule fois pour tout le processus (lecture seule)
+
+    Comme load_shared_dataset, le cache suit la version du fichier.
+
+    Args:
+        path: chemin du CSV
+        columns: colonnes à charger (tuple, toutes si None)
+
+    Returns:
+        DataFrame partagé entre les sessions
+    """
+    return _load_shared_frame(path, columns, get_data_version(path))
+
+
+@st.cache_resource(max_entries=8)
+def _load_shared_frame(path, columns, version):
+    return load_data(path, columns=list(columns) if columns else None)
+
+
+def make_selection(index, filters):
+    """
+    Sélection compacte de lignes pour une session (1 bit par ligne du jeu partagé)
+
+    Args:
+        index: index construit par build_filter_index
+        filters: dict age_range, gender_filter, condition_filter
+
+    Returns:
+        dict: filters, bitmap, count
+    """
+    bitmap = filter_bitmap(index, **filters)
+    return {
+        'filters': filters,
+        'bitmap': bitmap,
+        'count': int(np.unpackbits(bitmap, count=index['n_rows']).sum()),
+    }
+
+
+def materialize_rows(df, index, selection, columns=None, n=None):
+    """
+    Construit le DataFrame des seules lignes à afficher
+
+    Args:
+        df: DataFrame partagé
+        index: index construit par build_filter_index
+        selection: sélection construite par make_selection
+        columns: colonnes à garder (toutes si None)
+        n: nombre maximal de lignes (toutes si None)
+
+    Returns:
+        DataFrame des lignes sélectionnées
+    """
+    rows = bitmap_to_rows(index, selection['bitmap'])[:n]
+    return df.iloc[rows] if columns is None else df.iloc[rows][columns]
+
+
+def estimate_size(value, seen=None):
+    """Estimation de la mémoire (octets) occupée par une valeur et son contenu"""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        size = value.memory_usage(deep=True)
+        return int(size.sum() if isinstance(value, pd.DataFrame) else size)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in value)
+    return size
+
+
+def record_session_memory():
+    """Enregistre la mémoire occupée par l'état de la session courante"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    state = {key: st.session_state[key] for key in st.session_state}
+    with _session_lock:
+        _session_memory[ctx.session_id] = {
+            'keys': len(state),
+            'bytes': estimate_size(state),
+            'last_seen': time.time(),
+        }
+
+
+def session_memory_report():
+    """
+    Mémoire par session active (états enregistrés par record_session_memory)
+
+    Returns:
+        DataFrame: une ligne par session (clés, octets, dernière activité)
+    """
+    now = time.time()
+    with _session_lock:
+        for session_id in [s for s, info in _session_memory.items() if now - info['last_seen'] > SESSION_TTL_SECONDS]:
+            del _session_memory[session_id]
+        report = pd.DataFrame.from_dict(_session_memory, orient='index', columns=['keys', 'bytes', 'last_seen'])
+    report.index.name = 'session'
+    report['last_seen'] = pd.to_datetime(report['last_seen'], unit='s')
+    return report.sort_values('bytes', ascending=False)
@@ -1,6 +1,8 @@
 import pandas as pd
 import streamlit as st
-from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+from modules.preprocessing.filter_index import column_rows
+from modules.preprocessing import text_cleaner
 
 def safe_sample(df, n_samples=3, random_state=1):
     """
@@ -50,7 +52,7 @@ def get_unique_values(df, column):
     """
     return df[column].dropna().unique()
 
-def filter_dataframe_by_column(df, column, values):
+def filter_dataframe_by_column(df, column, values, index=None):
     """
     Filtre un DataFrame par une colonne avec une liste de valeurs
     
@@ -58,12 +60,15 @@ def filter_dataframe_by_column(df, column, values):
         df: DataFrame à filtrer
         column: nom de la colonne
         values: liste des valeurs à garder
+        index: index de filtrage construit par build_filter_index (optionnel)
     
     Returns:
         DataFrame filtré
     """
     if not values:  # Si la liste est vide, retourner DataFrame vide
         return df.iloc[0:0]
+    if index is not None and column in index['bitmaps']:
+        return df.iloc[column_rows(index, column, values)]
     return df[df[column].isin(values)]
 
 def handle_empty_dataframe(df, message="Aucune donnée ne correspond aux critères sélectionnés."):
@@ -117,7 +122,9 @@ def clean_text(text):
     Returns:
         str: texte nettoyé
     """
-    if pd.isna(text):
-        return ""
-    words = text.lower().split()
-    return " ".join([w for w in words if w not in ENGLISH_STOP_WORDS and len(w) > 2])
\ No newline at end of file
+    return text_cleaner.clean_text(
+        text,
+        stop_words=text_cleaner.get_stop_words('sklearn'),
+        min_length=3,
+        alpha_only=False
+    )
\ No newline at end of file
@@ -1,8 +1,10 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
+# matplotlib, seaborn et plotly sont importés dans les fonctions qui les utilisent :
+# importer ce module ne coûte rien tant qu'aucun graphique n'est construit.
+# Les figures matplotlib sont créées avec Figure() et non pyplot : pas d'état global
+# partagé entre les threads des sessions Streamlit, rien à fermer si une construction échoue.
+from modules.profiling import profiled
 
+@profiled
 def create_countplot(data, x_column, title=None, palette='pastel', figsize=(8, 6)):
     """
     Crée un graphique en barres générique
@@ -17,14 +19,19 @@ def create_countplot(data, x_column, title=None, palette='pastel', figsize=(8, 6
     Returns:
         Figure matplotlib
     """
-    fig = plt.figure(figsize=figsize)
-    sns.countplot(data=data, x=x_column, palette=palette)
+    from matplotlib.figure import Figure
+    import seaborn as sns
+    
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    sns.countplot(data=data, x=x_column, palette=palette, ax=ax)
     if title:
-        plt.title(title)
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+        ax.set_title(title)
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
     return fig
 
+@profiled
 def create_boxplot(data, x_column, y_column, title=None, palette='coolwarm', figsize=(8, 6)):
     """
     Crée un boxplot générique
@@ -40,14 +47,19 @@ def create_boxplot(data, x_column, y_column, title=None, palette='coolwarm', fig
     Returns:
         Figure matplotlib
     """
-    fig = plt.figure(figsize=figsize)
-    sns.boxplot(data=data, x=x_column, y=y_column, palette=palette)
+    from matplotlib.figure import Figure
+    import seaborn as sns
+    
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    sns.boxplot(data=data, x=x_column, y=y_column, palette=palette, ax=ax)
     if title:
-        plt.title(title)
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+        ax.set_title(title)
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
     return fig
 
+@profiled
 def create_histogram(data, column, title=None, bins=30, figsize=(8, 6)):
     """
     Crée un histogramme
@@ -62,28 +74,96 @@ def create_histogram(data, column, title=None, bins=30, figsize=(8, 6)):
     Returns:
         Figure matplotlib
     """
-    fig = plt.figure(figsize=figsize)
-    plt.hist(data[column].dropna(), bins=bins, alpha=0.7, edgecolor='black')
+    from matplotlib.figure import Figure
+    
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    ax.hist(data[column].dropna(), bins=bins, alpha=0.7, edgecolor='black')
+    if title:
+        ax.set_title(title)
+    ax.set_xlabel(column)
+    ax.set_ylabel('Fréquence')
+    fig.tight_layout()
+    return fig
+
+@profiled
+def create_count_barplot(counts, title=None, palette='pastel', figsize=(8, 6)):
+    """
+    Crée un graphique en barres à partir de comptes déjà agrégés
+    
+    Args:
+        counts: Series des comptes (index = catégories)
+        title: titre du graphique
+        palette: palette de couleurs
+        figsize: taille de la figure
+    
+    Returns:
+        Figure matplotlib
+    """
+    from matplotlib.figure import Figure
+    import seaborn as sns
+    
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    ax.bar([str(label) for label in counts.index], counts.values,
+           color=sns.color_palette(palette, len(counts)))
+    if title:
+        ax.set_title(title)
+    ax.set_ylabel('count')
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    return fig
+
+@profiled
+def create_boxplot_from_stats(stats, y_label=None, title=None, palette='coolwarm', figsize=(8, 6)):
+    """
+    Crée un boxplot à partir de statistiques précalculées (quartiles, moustaches)
+    
+    Args:
+        stats: liste de dicts au format de matplotlib Axes.bxp
+        y_label: libellé de l'axe y
+        title: titre du graphique
+        palette: palette de couleurs
+        figsize: taille de la figure
+    
+    Returns:
+        Figure matplotlib
+    """
+    from matplotlib.figure import Figure
+    import seaborn as sns
+    
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    boxes = ax.bxp(stats, showfliers=True, patch_artist=True)
+    for patch, color in zip(boxes['boxes'], sns.color_palette(palette, len(stats))):
+        patch.set_facecolor(color)
+    if y_label:
+        ax.set_ylabel(y_label)
     if title:
-        plt.title(title)
-    plt.xlabel(column)
-    plt.ylabel('Fréquence')
-    plt.tight_layout()
+        ax.set_title(title)
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
     return fig
 
+@profiled
 def create_interactive_countplot(data, x_column, title=None):
     """
     Crée un graphique en barres interactif avec Plotly
     
+    Seuls les comptes sont transmis au navigateur ; passer directement une Series
+    de comptes (ex: issue du cube d'agrégats) évite de parcourir les lignes.
+    
     Args:
-        data: DataFrame
-        x_column: colonne pour l'axe x
+        data: DataFrame, ou Series des comptes déjà agrégés
+        x_column: colonne pour l'axe x (libellé de l'axe si data est une Series)
         title: titre du graphique
     
     Returns:
         Figure Plotly
     """
-    counts = data[x_column].value_counts()
+    import plotly.express as px
+    
+    counts = data[x_column].value_counts() if hasattr(data, 'columns') else data
     fig = px.bar(
         x=counts.index, 
         y=counts.values,
@@ -93,6 +173,7 @@ def create_interactive_countplot(data, x_column, title=None):
     return fig
 
 
+@profiled
 def create_sentiment_countplot(data, figsize=(5, 3)):
     """Fonction spécifique pour les sentiments (wrapper de la fonction générique)"""
     return create_countplot(
@@ -102,6 +183,7 @@ def create_sentiment_countplot(data, figsize=(5, 3)):
         figsize=figsize
     )
 
+@profiled
 def create_age_sentiment_boxplot(data, figsize=(5, 3)):
     """Fonction spécifique pour âge vs sentiment (wrapper de la fonction générique)"""
     return create_boxplot(
@@ -110,4 +192,23 @@ def create_age_sentiment_boxplot(data, figsize=(5, 3)):
         y_column='Age_numeric',
         title='Distribution de l\'âge selon le sentiment',
         figsize=figsize
-    )
\ No newline at end of file
+    )
+
+@profiled
+def create_sentiment_countplot_from_counts(counts, figsize=(5, 3)):
+    """Répartition des sentiments à partir des comptes du cube d'agrégats"""
+    return create_count_barplot(
+        counts=counts,
+        title='Répartition des sentiments',
+        figsize=figsize
+    )
+
+@profiled
+def create_age_sentiment_boxplot_from_stats(stats, figsize=(5, 3)):
+    """Âge selon le sentiment à partir des statistiques du cube d'agrégats"""
+    return create_boxplot_from_stats(
+        stats=stats,
+        y_label='Age_numeric',
+        title='Distribution de l\'âge selon le sentiment',
+        figsize=figsize
+    )
@@ -1,25 +1,25 @@
 import streamlit as st
 import pandas as pd
 
-from modules.preprocessing.data_loader import load_data, get_data_ranges
-from modules.preprocessing.data_filter import filter_data, get_sample_reviews
+from modules.preprocessing.data_filter import get_sample_reviews
+from modules.preprocessing.aggregate_cube import filter_cube, cube_counts, cube_box_stats
+from modules.session_data import load_shared_dataset
 
-from modules.visualization import create_sentiment_countplot, create_age_sentiment_boxplot
+from modules.chart_cache import render_chart
 from modules.utils import handle_empty_dataframe
+from ui.common_components import display_perf_panel
 
 st.set_page_config(page_title="Sentiment Analyse - Abilify", layout="wide")
 
-@st.cache_data
-def load_and_cache_data():
-    return load_data("data/reviews_cleaned.csv")
-
-df = load_and_cache_data()
+# Données, index et cube d'agrégats partagés par toutes les sessions (pas de copie par session)
+dataset = load_shared_dataset()
+df, filter_index, cube = dataset['df'], dataset['index'], dataset['cube']
 
 st.title("Analyse des avis patients sur l'Abilify")
 st.markdown("Explorez les avis patients selon l'âge, le genre, et les conditions médicales.")
 
 # Récupération des plages de données pour les filtres
-data_ranges = get_data_ranges(df)
+data_ranges = dataset['ranges']
 
 # Filtres utilisateur
 age_range = st.slider(
@@ -41,31 +41,29 @@ condition_filter = st.multiselect(
     default=list(data_ranges['conditions'][:5])
 )
 
-# Filtrage dynamique des données
-filtered_df = filter_data(df, age_range, gender_filter, condition_filter)
+# Filtrage dynamique du cube d'agrégats
+filtered_cube = filter_cube(cube, age_range, gender_filter, condition_filter)
 
 col1, col2 = st.columns(2)
 
 # Visualisation des sentiments
 with col1:
     st.subheader("Répartition des sentiments")
-    if handle_empty_dataframe(filtered_df):
-        fig1 = create_sentiment_countplot(filtered_df)
-        st.pyplot(fig1)
+    if handle_empty_dataframe(filtered_cube):
+        st.image(render_chart('sentiment_countplot', cube_counts(filtered_cube, 'sentiment', sort=False), figsize=(5, 3)))
 
 # Distribution d'âge selon le sentiment
 with col2:
     st.subheader("Âge selon sentiment")
-    if handle_empty_dataframe(filtered_df):
-        fig2 = create_age_sentiment_boxplot(filtered_df)
-        st.pyplot(fig2)
+    if handle_empty_dataframe(filtered_cube):
+        st.image(render_chart('age_sentiment_boxplot', cube_box_stats(filtered_cube), figsize=(5, 3)))
 
 # Exemples d'avis
 st.subheader("Exemples d'avis")
 sentiment_choisi = st.selectbox("Choisissez un type d'avis :", ['Positif', 'Négatif'])
 
 try:
-    sample_reviews = get_sample_reviews(df, sentiment_choisi)
+    sample_reviews = get_sample_reviews(df, sentiment_choisi, index=filter_index)
     
     st.subheader(f"Exemples d'avis {sentiment_choisi.lower()}s")
     
@@ -75,4 +73,6 @@ try:
         st.markdown("---")
         
 except ValueError as e:
-    st.error(f"Pas assez d'avis {sentiment_choisi.lower()}s disponibles pour générer des exemples.")
\ No newline at end of file
+    st.error(f"Pas assez d'avis {sentiment_choisi.lower()}s disponibles pour générer des exemples.")
+
+display_perf_panel()
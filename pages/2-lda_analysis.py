@@ -1,8 +1,10 @@
+import os
+
+import numpy as np
 import streamlit as st
 import pandas as pd
-import pickle
 
-from modules.preprocessing.data_loader import load_data
+from modules.session_data import load_shared_frame
 
 from modules.preprocessing.lda_analyzer import ( 
     prepare_lda_data, 
@@ -11,10 +13,17 @@ from modules.preprocessing.lda_analyzer import (
     assign_topics_to_documents, 
     get_topic_examples
 )
+from modules.preprocessing.artifact_bundle import (
+    get_bundle_dir, open_bundle, has_artifact, load_artifact, read_legacy_word_lists
+)
+from modules.preprocessing.topic_keywords import list_topics, read_topic, keywords_from_word_lists
 from modules.utils import handle_empty_dataframe
+from ui.common_components import display_perf_panel
 
 st.set_page_config(page_title="Analyse LDA - Topics", layout="wide")
 
+LEGACY_KEYWORDS_PATH = "data/topics_keywords.pkl"
+
 
 @st.cache_data
 def run_cached_lda_analysis(texts_tuple, n_topics):
@@ -22,14 +31,64 @@ def run_cached_lda_analysis(texts_tuple, n_topics):
     texts = list(texts_tuple)  # Reconvertir le tuple en liste pour LDA
     return run_lda_analysis(texts, n_topics=n_topics)
 
+def _load_optional(bundle, name):
+    return load_artifact(bundle, name) if has_artifact(bundle, name) else None
+
+def load_lda_artifacts():
+    """
+    Mots-clés, topics par document et index des exemples depuis le bundle de data/
+    (ouvert une fois par processus)
+
+    Sans bundle, les mots-clés sont relus depuis l'ancien data/topics_keywords.pkl
+    (sans poids ni exemples représentatifs).
+
+    Returns:
+        tuple: (mots-clés lus topic par topic, {sentiment: (topics par document ou None,
+        index des exemples ou None)}, source) où source vaut "bundle", "legacy" ou None
+        si aucun artefact n'est disponible
+    """
+    bundle = open_bundle(get_bundle_dir("data"))
+    if not has_artifact(bundle, "lda_keywords"):
+        if not os.path.exists(LEGACY_KEYWORDS_PATH):
+            return None, {}, None
+        return load_legacy_keywords(), {"negative": (None, None), "positive": (None, None)}, "legacy"
+    splits = {
+        split: (_load_optional(bundle, f"lda_doc_topics_{split}"), _load_optional(bundle, f"lda_examples_{split}"))
+        for split in ("negative", "positive")
+    }
+    return load_artifact(bundle, "lda_keywords"), splits, "bundle"
+
+def load_split_frame(split, doc_topics):
+    """
+    Avis d'un sentiment avec leur topic principal
+
+    Les topics viennent du bundle quand il en contient un par avis (dans l'ordre
+    du CSV) : seule la colonne des textes est alors lue dans le CSV.
+    """
+    path = f"data/df_with_topics_{split}.csv"
+    if doc_topics is not None:
+        df = load_shared_frame(path, columns=('description-text',))
+        if len(doc_topics['topic_ids']) == len(df):
+            return df.assign(topic=np.asarray(doc_topics['topic_ids'][:, 0]))
+    return load_shared_frame(path, columns=('description-text', 'topic'))
+
 def main():
     st.title("Problèmes identifiés (LDA)")
     st.markdown("Explorez les sujets récurrents dans les avis des patients.")
     
-    df_negative = load_data("data/df_with_topics_negative.csv")
-    df_positive = load_data("data/df_with_topics_positive.csv")
-    with open("data/topics_keywords.pkl", "rb") as f:
-        topics_keywords = pickle.load(f)
+    # Index des exemples représentatifs (généré par le pipeline ; sinon échantillonnage aléatoire)
+    topics_keywords, splits, source = load_lda_artifacts()
+    if source is None:
+        st.error(f"Aucun artefact LDA trouvé (ni bundle dans data/, ni {LEGACY_KEYWORDS_PATH}) : "
+                 "lancez le pipeline de prétraitement.")
+        return
+    if source == "legacy":
+        st.warning("Bundle d'artefacts introuvable : mots-clés lus depuis l'ancien topics_keywords.pkl. "
+                   "Lancez `python -m modules.preprocessing.artifact_bundle migrate` pour le convertir.")
+    (doc_topics_negative, examples_negative), (doc_topics_positive, examples_positive) = \
+        splits["negative"], splits["positive"]
+    df_negative = load_split_frame("negative", doc_topics_negative)
+    df_positive = load_split_frame("positive", doc_topics_positive)
     
 
     
@@ -61,20 +120,22 @@ def main():
         #df_with_topics = assign_topics_to_documents(df_negative, doc_topics)
         
         # Affichage des résultats
-        display_lda_results(df_negative, topics_keywords["negative"], n_examples)
+        display_lda_results(df_negative, topics_keywords, "negative", n_examples, examples_negative)
 
     with col2:
         st.info(f"📊 Analyse sur {len(df_positive)} avis positive nettoyés")
-        display_lda_results(df_positive, topics_keywords["positive"], n_examples)
+        display_lda_results(df_positive, topics_keywords, "positive", n_examples, examples_positive)
 
-def display_lda_results(df_with_topics, topics_keywords, n_examples):
+def display_lda_results(df_with_topics, topics_keywords, split, n_examples, examples_index=None):
     """
     Affiche les résultats de l'analyse LDA de manière organisée
     
     Args:
         df_with_topics: DataFrame avec les topics assignés
-        topics_keywords: liste des mots-clés par topic
+        topics_keywords: mots-clés ouverts par open_topic_keywords (lus topic par topic)
+        split: 'negative' ou 'positive'
         n_examples: nombre d'exemples à afficher par topic
+        examples_index: index des exemples représentatifs par topic (optionnel)
     """
     
     # Statistiques générales
@@ -96,17 +157,21 @@ def display_lda_results(df_with_topics, topics_keywords, n_examples):
     # Détail des topics
     st.subheader("🔍 Analyse détaillée des topics")
     
-    for topic_num, keywords in enumerate(topics_keywords):
+    for topic_num in list_topics(topics_keywords, split):
+        keywords_table = read_topic(topics_keywords, split, topic_num)
+        keywords = keywords_table['word'].tolist()
         st.write(f" 🔹 Topic {topic_num}: {topic_counts.get(topic_num, 0)} avis", unsafe_allow_html=True)
 
         with st.expander(f" Mots-clés principaux : {', '.join(keywords)}", expanded=False):
                     
             # Mots-clés
             st.write(f"**Mots-clés principaux:** {', '.join(keywords)}")
+            if keywords_table['weight'].notna().any():
+                st.dataframe(keywords_table.drop(columns='rank').set_index('word'), use_container_width=True)
             
             # Exemples d'avis
             st.write("**Exemples d'avis représentatifs:**")
-            examples = get_topic_examples(df_with_topics, topic_num, n_examples=n_examples)
+            examples = get_topic_examples(df_with_topics, topic_num, n_examples=n_examples, index=examples_index)
             
             if len(examples) > 0:
                 for i, example in enumerate(examples, 1):
@@ -117,4 +182,5 @@ def display_lda_results(df_with_topics, topics_keywords, n_examples):
             st.markdown("---")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+    display_perf_panel()
\ No newline at end of file
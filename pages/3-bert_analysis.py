@@ -1,8 +1,14 @@
 import streamlit as st
 import pandas as pd
-from bertopic import BERTopic
 
 from modules.preprocessing.data_loader import load_data
+from modules.model_registry import get_bertopic_model, get_embedding_model, registry
+from modules.preprocessing.artifact_bundle import (
+    BERT_SUFFIXES, get_bundle_dir, open_bundle, has_artifact, read_topic_info, parse_list_column
+)
+from modules.preprocessing.similarity_index import load_similarity_index, search_similar, get_document_vector
+from modules.session_data import load_shared_frame
+from ui.common_components import display_perf_panel
 
 #from modules.utils import handle_empty_dataframe, clean_text
 
@@ -19,42 +25,11 @@ def main():
     st.title("Insights BERTopic")
     st.markdown("Découvrez les sujets émergents avec l'analyse BERTopic basée sur les embeddings.")
     
-    df_negative = load_data("data/topic_info_neg.csv")
-    df_positive = load_data("data/topic_info_pos.csv")
+    df_negative, topics_info_neg = load_topic_info("negative")
+    topic_keywords_neg, topic_labels_neg, topic_docs_neg = build_topic_dicts(df_negative)
 
-# negatif
-    topic_model = BERTopic.load("data/bert_model_neg")
-    topics_info_neg = topic_model.get_topic_info()
-
-
-    # Construire dictionnaire mots-clés par topic
-    topic_keywords_neg = {
-        row["Topic"]: row["Representation"].split(", ") 
-        for _, row in df_negative.iterrows() if row["Topic"] != -1
-    }
-
-    # Construire dictionnaire labels (nom simplifié du topic)
-    topic_labels_neg = {
-        row["Topic"]: row["Name"] if "Name" in df_negative.columns else row["Representation"] 
-        for _, row in df_negative.iterrows() if row["Topic"] != -1
-    }
-
-# Positif
-
-    topic_model = BERTopic.load("data/bert_model_pos")
-    topics_info_pos = topic_model.get_topic_info()
-
-    # Construire dictionnaire mots-clés par topic
-    topic_keywords_pos = {
-        row["Topic"]: row["Representation"].split(", ") 
-        for _, row in df_positive.iterrows() if row["Topic"] != -1
-    }
-
-    # Construire dictionnaire labels (nom simplifié du topic)
-    topic_labels_pos = {
-        row["Topic"]: row["Name"] if "Name" in df_positive.columns else row["Representation"] 
-        for _, row in df_positive.iterrows() if row["Topic"] != -1
-    }
+    df_positive, topics_info_pos = load_topic_info("positive")
+    topic_keywords_pos, topic_labels_pos, topic_docs_pos = build_topic_dicts(df_positive)
 
 
     st.subheader("Paramètres BERTopic")
@@ -114,15 +89,110 @@ def main():
         #df_with_topics = assign_bert_topics_to_documents(df_cleaned, topics)
         
         # Affichage des résultats
-        display_bert_results(df_negative, topics_info_neg, topic_keywords_neg, topic_labels_neg, n_examples)
+        display_bert_results(df_negative, topics_info_neg, topic_keywords_neg, topic_labels_neg, topic_docs_neg,
+                             n_examples)
 
     with col2:
         st.info(f"📊 Analyse BERTopic sur {df_positive['Count'].sum()} avis positifs")
-        display_bert_results(df_positive, topics_info_pos, topic_keywords_pos, topic_labels_pos, n_examples)
+        display_bert_results(df_positive, topics_info_pos, topic_keywords_pos, topic_labels_pos, topic_docs_pos,
+                             n_examples)
+
+    display_similar_reviews()
+
+    display_registry_stats()
 
 
+def load_topic_info(split):
+    """
+    Informations des topics BERTopic d'un sentiment
+
+    Lues dans le bundle de data/ (listes Arrow, converties une fois par processus) ;
+    à défaut, dans l'ancien CSV dont les listes sont relues comme littéraux Python.
+
+    Returns:
+        tuple: (informations des topics, tableau affiché)
+    """
+    bundle = open_bundle(get_bundle_dir("data"))
+    if has_artifact(bundle, f"bert_topic_info_{split}"):
+        topic_info = read_topic_info(bundle, f"bert_topic_info_{split}")
+        return topic_info, topic_info
+
+    topic_info = load_data(f"data/topic_info_{BERT_SUFFIXES[split]}.csv")
+    for column in ("Representation", "Representative_Docs"):
+        topic_info[column] = parse_list_column(topic_info[column])
+    topic_model = get_bertopic_model(f"data/bert_model_{BERT_SUFFIXES[split]}")
+    return topic_info, topic_model.get_topic_info()
+
+
+def build_topic_dicts(topic_info):
+    """
+    Mots-clés, labels et avis représentatifs par topic (hors outliers)
 
-def display_bert_results(df_with_topics, topics_info, topic_keywords, topic_labels, n_examples):
+    Returns:
+        tuple de dict {topic: mots-clés}, {topic: label}, {topic: avis représentatifs}
+    """
+    topics = topic_info[topic_info["Topic"] != -1]
+    keywords = dict(zip(topics["Topic"], topics["Representation"]))
+    labels = dict(zip(topics["Topic"], topics["Name"] if "Name" in topics.columns else topics["Representation"]))
+    docs = dict(zip(topics["Topic"], topics["Representative_Docs"]))
+    return keywords, labels, docs
+
+
+@st.cache_resource
+def load_cached_similarity_index():
+    """Index des avis similaires, chargé une fois par processus (vecteurs en mémoire mappée)"""
+    return load_similarity_index("data")
+
+
+def display_similar_reviews():
+    """Recherche des avis les plus proches d'un avis existant ou d'un texte libre"""
+    st.subheader("🔎 Avis similaires")
+
+    index = load_cached_similarity_index()
+    reviews = load_shared_frame("data/reviews_cleaned.csv", columns=('description-text', 'sentiment'))
+    # Après un rafraîchissement incrémental, l'index ne couvre que les premiers avis (les nouveaux sont à la fin)
+    n_indexed = 0 if index is None else len(index['rows'])
+    if n_indexed == 0 or n_indexed > len(reviews):
+        st.info("Index de similarité indisponible : lancez l'étape `similarity` du pipeline.")
+        return
+
+    mode = st.radio("Rechercher à partir de", ["Un avis existant", "Un texte libre"], horizontal=True)
+    n_similar = st.slider("Nombre d'avis similaires", min_value=1, max_value=20, value=5)
+
+    if mode == "Un avis existant":
+        position = int(st.number_input("Numéro de l'avis", min_value=0, max_value=n_indexed - 1, value=0))
+        st.write(reviews.iloc[position]['description-text'])
+        query, exclude = get_document_vector(index, position), [position]
+    else:
+        text = st.text_input("Texte de la recherche")
+        if not text:
+            return
+        # Le modèle d'embedding n'est chargé qu'à la première recherche texte, dans la variante de l'index
+        query, exclude = get_embedding_model(index['model_name'], backend=index['backend']).encode([text]), None
+
+    positions, similarities = search_similar(index, query, k=n_similar, exclude=exclude)
+    for position, similarity in zip(positions[0], similarities[0]):
+        if position < 0:
+            continue
+        row = reviews.iloc[position]
+        st.markdown(f"**Similarité** : {similarity:.2f} — **Sentiment** : {row['sentiment']}")
+        st.write(row['description-text'])
+        st.markdown("---")
+
+
+def display_registry_stats():
+    """Affiche les statistiques du registre de modèles (chargements, hits/misses, mémoire)"""
+    stats = registry.stats()
+    with st.expander("⚙️ Registre des modèles", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Hits", stats['hits'])
+        col2.metric("Misses", stats['misses'])
+        col3.metric("Mémoire (Mo)", f"{stats['memory_bytes'] / 1024 ** 2:.0f} / {stats['budget_bytes'] / 1024 ** 2:.0f}")
+        st.dataframe(pd.DataFrame.from_dict(stats['models'], orient='index'), use_container_width=True)
+
+
+
+def display_bert_results(df_with_topics, topics_info, topic_keywords, topic_labels, topic_docs, n_examples):
     """
     Affiche les résultats de l'analyse BERTopic de manière organisée
     
@@ -131,6 +201,7 @@ def display_bert_results(df_with_topics, topics_info, topic_keywords, topic_labe
         topics_info: DataFrame des informations des topics
         topic_keywords: dictionnaire des mots-clés par topic
         topic_labels: dictionnaire des labels par topic
+        topic_docs: dictionnaire des avis représentatifs par topic
         n_examples: nombre d'exemples à afficher par topic
     """
     
@@ -177,15 +248,14 @@ def display_bert_results(df_with_topics, topics_info, topic_keywords, topic_labe
             
             # Mots-clés avec scores
             st.write("**Mots-clés principaux:**")
-            st.write(df_with_topics["Representation"][topic_id+1])
+            st.write(", ".join(keywords))
 
             
             # Exemples d'avis
             st.write("**Exemples d'avis représentatifs:**")
 
-            rep_docs = df_with_topics["Representative_Docs"]
-            #rep_docs = ast.literal_eval(rep_docs)  # convertit la string en liste python
-               
+            rep_docs = topic_docs.get(topic_id, [])
+
 
             # Afficher seulement les N premiers exemples (par ex.)
             for i, doc in enumerate(rep_docs[:n_examples], 1):
@@ -203,4 +273,5 @@ def display_bert_results(df_with_topics, topics_info, topic_keywords, topic_labe
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+    display_perf_panel()
\ No newline at end of file
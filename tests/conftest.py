@@ -0,0 +1,51 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Les modules sont importés depuis la racine du dépôt (pas de paquet installé)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+AGE_BINS = [np.nan, 1.0, 15.0, 21.0, 29.5, 39.5, 49.5, 59.5, 69.5, 79.5]
+GENDERS = ['female', 'male', np.nan]
+CONDITIONS = ['Bipolar I Disorder', 'Schizophrenia', 'Major Depressive Disorder', 'Autism', 'Other']
+SENTIMENTS = ['Positif', 'Négatif', 'Neutre']
+
+
+@pytest.fixture
+def reviews_df():
+    """Avis synthétiques avec les colonnes et valeurs manquantes du dataset"""
+    rng = np.random.default_rng(0)
+    n_rows = 2_000
+    return pd.DataFrame({
+        'description-text': [f"review {i}" for i in range(n_rows)],
+        'Age_numeric': rng.choice(AGE_BINS, n_rows).astype('float32'),
+        'Gender': rng.choice(np.array(GENDERS, dtype=object), n_rows, p=[0.6, 0.3, 0.1]),
+        'Condition': rng.choice(CONDITIONS, n_rows),
+        'sentiment': rng.choice(SENTIMENTS, n_rows),
+        'sentiment_score': rng.uniform(-1, 1, n_rows).astype('float32'),
+    })
+
+
+class FakeSentimentAnalyzer:
+    """Remplace VADER (lexique NLTK absent) : score fixé par quelques mots"""
+
+    def polarity_scores(self, text):
+        words = set(text.split())
+        if 'great' in words:
+            return {'compound': 0.6}
+        if 'awful' in words:
+            return {'compound': -0.6}
+        return {'compound': 0.0}
+
+
+@pytest.fixture
+def fake_nlp(monkeypatch):
+    """Mots vides scikit-learn et faux VADER à la place des données NLTK"""
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    from modules.preprocessing import sentiment_scorer, text_cleaner
+
+    monkeypatch.setattr(text_cleaner, 'get_stop_words', lambda source='nltk': frozenset(ENGLISH_STOP_WORDS))
+    monkeypatch.setattr(sentiment_scorer, '_analyzer', FakeSentimentAnalyzer())
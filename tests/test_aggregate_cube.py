@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.preprocessing.aggregate_cube import (
+    SCORE_BIN_COLUMNS, build_aggregate_cube, cube_box_stats, cube_counts, cube_mean, cube_score_mean,
+    cube_score_quantiles, cube_total, filter_cube
+)
+from modules.preprocessing.data_filter import filter_data
+from modules.preprocessing.data_store import apply_column_dtypes
+
+from conftest import CONDITIONS
+
+FILTERS = [
+    ((0, 100), ['female', 'male'], CONDITIONS),
+    ((25, 45), ['female'], CONDITIONS[:2]),
+    ((18, 80), ['male', np.nan], ['Autism', 'Other']),
+    ((90, 100), ['female'], CONDITIONS),
+]
+
+
+@pytest.fixture(params=[False, True], ids=['csv', 'store'])
+def reviews(request, reviews_df):
+    return apply_column_dtypes(reviews_df) if request.param else reviews_df
+
+
+def test_cube_keeps_every_review(reviews):
+    cube = build_aggregate_cube(reviews)
+
+    assert cube_total(cube) == len(reviews)
+    assert list(cube.columns[:5]) == ['Age_numeric', 'Gender', 'Condition', 'sentiment', 'count']
+    assert cube[SCORE_BIN_COLUMNS].to_numpy().sum() == cube['score_count'].sum() == len(reviews)
+
+
+@pytest.mark.parametrize('age_range, genders, conditions', FILTERS)
+@pytest.mark.parametrize('column', ['sentiment', 'Condition', 'Gender'])
+def test_cube_counts_match_value_counts(reviews, age_range, genders, conditions, column):
+    cube = filter_cube(build_aggregate_cube(reviews), age_range, genders, conditions)
+    rows = filter_data(reviews, age_range, genders, conditions)
+
+    expected = rows[column].value_counts()
+    actual = cube_counts(cube, column)
+
+    assert cube_total(cube) == len(rows)
+    assert actual.astype(int).to_dict() == expected[expected > 0].astype(int).to_dict()
+
+
+@pytest.mark.parametrize('age_range, genders, conditions', FILTERS)
+def test_cube_mean_matches_row_mean(reviews, age_range, genders, conditions):
+    cube = filter_cube(build_aggregate_cube(reviews), age_range, genders, conditions)
+    rows = filter_data(reviews, age_range, genders, conditions)
+
+    expected = rows['Age_numeric'].astype(np.float64).mean()
+
+    if np.isnan(expected):
+        assert np.isnan(cube_mean(cube))
+    else:
+        assert cube_mean(cube) == pytest.approx(expected)
+
+
+def test_cube_box_stats_match_row_quantiles(reviews):
+    cube = build_aggregate_cube(reviews)
+
+    stats = {entry['label']: entry for entry in cube_box_stats(cube)}
+
+    for label, group in reviews.groupby('sentiment', observed=True):
+        ages = group['Age_numeric'].dropna().to_numpy(dtype=np.float64)
+        q1, med, q3 = np.quantile(ages, [0.25, 0.5, 0.75], method='lower')
+        assert (stats[label]['q1'], stats[label]['med'], stats[label]['q3']) == (q1, med, q3)
+        assert stats[label]['mean'] == pytest.approx(ages.mean())
+
+
+@pytest.mark.parametrize('age_range, genders, conditions', FILTERS[:3])
+def test_cube_score_measures_match_rows(reviews, age_range, genders, conditions):
+    cube = filter_cube(build_aggregate_cube(reviews), age_range, genders, conditions)
+    scores = filter_data(reviews, age_range, genders, conditions)['sentiment_score'].to_numpy(dtype=np.float64)
+
+    assert cube_score_mean(cube) == pytest.approx(scores.mean())
+    # Esquisse à pas fixe : quantiles à un pas (0,05) près
+    np.testing.assert_allclose(cube_score_quantiles(cube), np.quantile(scores, [0.25, 0.5, 0.75]), atol=0.05)
+
+
+def test_cube_score_box_stats_match_rows(reviews):
+    stats = {entry['label']: entry for entry in cube_box_stats(build_aggregate_cube(reviews), 'sentiment_score')}
+
+    for label, group in reviews.groupby('sentiment', observed=True):
+        scores = group['sentiment_score'].to_numpy(dtype=np.float64)
+        q1, med, q3 = np.quantile(scores, [0.25, 0.5, 0.75])
+        np.testing.assert_allclose([stats[label]['q1'], stats[label]['med'], stats[label]['q3']], [q1, med, q3],
+                                   atol=0.05)
+        assert stats[label]['mean'] == pytest.approx(scores.mean())
+        assert stats[label]['whislo'] <= stats[label]['q1'] <= stats[label]['q3'] <= stats[label]['whishi']
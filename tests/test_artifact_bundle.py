@@ -0,0 +1,154 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.preprocessing.artifact_bundle import (
+    get_bundle_dir, has_artifact, load_artifact, main, migrate_legacy_artifacts, open_bundle, read_legacy_word_lists,
+    read_topic_info, topic_info_table, update_bundle, write_bundle
+)
+from modules.preprocessing.lda_analyzer import (
+    load_lda_model, lda_model_from_parts, lda_model_parts, run_lda_analysis, run_online_lda, save_lda_model,
+    update_lda_model
+)
+from modules.preprocessing.topic_index import build_topic_example_index, get_topic_rows
+from modules.preprocessing.topic_keywords import list_topics, read_topic_words, save_topic_keywords, \
+    tables_from_word_lists
+
+WORD_LISTS = {
+    'negative': [['weight', 'gain', 'hungry'], ['tired', 'sleep', 'drowsy']],
+    'positive': [['mood', 'stable', 'better']],
+}
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    rng = np.random.default_rng(0)
+    topic_ids = rng.integers(0, 6, (500, 3)).astype(np.int16)
+    weights = rng.uniform(0, 1, (500, 3)).astype(np.float16)
+    keywords_path = str(tmp_path / 'keywords.arrow')
+    save_topic_keywords(tables_from_word_lists(WORD_LISTS), keywords_path)
+    topic_info = pd.DataFrame({
+        'Topic': [-1, 0, 1],
+        'Count': [12, 30, 8],
+        'Name': ['-1_side_effects', '0_weight_gain', '1_sleep'],
+        'Representation': [['side', 'effects'], ['weight', 'gain'], ['sleep']],
+        'Representative_Docs': [['doc a'], ['doc b', 'doc c'], []],
+    })
+    return {
+        'lda_keywords': ('topic_keywords', keywords_path),
+        'lda_doc_topics_negative': ('doc_topics', {'topic_ids': topic_ids, 'weights': weights}),
+        'lda_examples_negative': ('topic_examples', build_topic_example_index(topic_ids[:, 0], weights[:, 0])),
+        'bert_topic_info_negative': ('topic_info', topic_info_table(topic_info)),
+    }
+
+
+def test_written_bundle_verifies_and_reads_back(tmp_path, artifacts):
+    bundle_dir = str(tmp_path / 'bundle')
+    write_bundle(bundle_dir, artifacts)
+
+    bundle = open_bundle(bundle_dir)
+
+    keywords = load_artifact(bundle, 'lda_keywords')
+    assert [read_topic_words(keywords, 'negative', topic) for topic in list_topics(keywords, 'negative')] == \
+        WORD_LISTS['negative']
+    doc_topics = load_artifact(bundle, 'lda_doc_topics_negative')
+    np.testing.assert_array_equal(doc_topics['topic_ids'], artifacts['lda_doc_topics_negative'][1]['topic_ids'])
+    np.testing.assert_array_equal(doc_topics['weights'], artifacts['lda_doc_topics_negative'][1]['weights'])
+    examples = load_artifact(bundle, 'lda_examples_negative')
+    expected = artifacts['lda_examples_negative'][1]
+    np.testing.assert_array_equal(get_topic_rows(examples, 2, n=5), get_topic_rows(expected, 2, n=5))
+    topic_info = read_topic_info(bundle, 'bert_topic_info_negative')
+    assert topic_info['Representative_Docs'].tolist() == [['doc a'], ['doc b', 'doc c'], []]
+    assert read_topic_info(bundle, 'bert_topic_info_negative') is topic_info
+    assert main(['verify', '--data-dir', str(tmp_path)]) is None
+
+
+def test_tampered_artifact_is_rejected(tmp_path, artifacts):
+    bundle_dir = str(tmp_path / 'bundle')
+    write_bundle(bundle_dir, artifacts)
+    path = os.path.join(bundle_dir, 'lda_doc_topics_negative.weights.npy')
+    with open(path, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 0xFF]))
+
+    with pytest.raises(ValueError, match='somme de contrôle'):
+        open_bundle(bundle_dir)
+
+
+def test_update_keeps_other_artifacts(tmp_path, artifacts):
+    bundle_dir = str(tmp_path / 'bundle')
+    write_bundle(bundle_dir, {name: artifacts[name] for name in ('lda_keywords', 'lda_doc_topics_negative')})
+    topic_ids = np.zeros((3, 3), dtype=np.int16)
+
+    update_bundle(bundle_dir, {'lda_doc_topics_negative': ('doc_topics', {'topic_ids': topic_ids,
+                                                                          'weights': topic_ids.astype(np.float16)})})
+
+    bundle = open_bundle(bundle_dir)
+    assert has_artifact(bundle, 'lda_keywords')
+    assert load_artifact(bundle, 'lda_doc_topics_negative')['topic_ids'].shape == (3, 3)
+
+
+def test_migrated_legacy_pickle_matches_word_lists(tmp_path):
+    with open(tmp_path / 'topics_keywords.pkl', 'wb') as f:
+        pickle.dump(WORD_LISTS, f)
+
+    assert migrate_legacy_artifacts(str(tmp_path)) == ['lda_keywords']
+
+    keywords = load_artifact(open_bundle(get_bundle_dir(str(tmp_path))), 'lda_keywords')
+    assert [read_topic_words(keywords, 'positive', topic) for topic in list_topics(keywords, 'positive')] == \
+        WORD_LISTS['positive']
+
+
+def test_migrated_topic_column_becomes_doc_topics(tmp_path):
+    pd.DataFrame({'description-text': ['a', 'b', 'c'], 'topic': [2, 0, 2]}).to_csv(
+        tmp_path / 'df_with_topics_negative.csv', index=False)
+
+    assert migrate_legacy_artifacts(str(tmp_path)) == ['lda_doc_topics_negative']
+
+    doc_topics = load_artifact(open_bundle(get_bundle_dir(str(tmp_path))), 'lda_doc_topics_negative')
+    np.testing.assert_array_equal(doc_topics['topic_ids'][:, 0], [2, 0, 2])
+    assert np.isnan(doc_topics['weights']).all()
+
+
+def test_legacy_pickle_with_objects_is_refused(tmp_path):
+    path = tmp_path / 'topics_keywords.pkl'
+    with open(path, 'wb') as f:
+        pickle.dump({'negative': [pd.Timestamp('2020-01-01')]}, f)
+
+    with pytest.raises(pickle.UnpicklingError):
+        read_legacy_word_lists(str(path))
+
+
+LDA_TEXTS = [['weight gain hungry pounds', 'sleep tired drowsy night', 'anxiety panic restless'][i % 3] + f' dose{i % 5}'
+             for i in range(120)]
+
+
+@pytest.mark.parametrize('train', [run_lda_analysis, run_online_lda])
+def test_saved_lda_model_reloads_without_pickle(tmp_path, train):
+    lda, vectorizer, _ = train(LDA_TEXTS, n_topics=3, min_df=1)
+    path = str(tmp_path / 'lda_model')
+    save_lda_model(lda, vectorizer, path)
+
+    assert not [name for name in os.listdir(path) if not name.endswith(('.npy', '.json'))]
+    loaded, loaded_vectorizer = load_lda_model(path)
+    np.testing.assert_allclose(loaded.transform(loaded_vectorizer.transform(LDA_TEXTS)),
+                               lda.transform(vectorizer.transform(LDA_TEXTS)))
+    assert loaded.get_params() == lda.get_params()
+
+
+def test_bundled_online_lda_model_keeps_updating(tmp_path):
+    lda, vectorizer, _ = run_online_lda(LDA_TEXTS, n_topics=3, min_df=1, batch_size=32)
+    write_bundle(str(tmp_path / 'bundle'), {'lda_model_negative': ('lda_model', lda_model_parts(lda, vectorizer))})
+
+    parts = load_artifact(open_bundle(str(tmp_path / 'bundle')), 'lda_model_negative')
+    loaded, loaded_vectorizer = lda_model_from_parts(parts)
+    update_lda_model(loaded, loaded_vectorizer, LDA_TEXTS[:30], batch_size=32)
+
+    assert loaded.n_documents_ == len(LDA_TEXTS) + 30
+    # Les poids mappés du bundle ne sont pas modifiés par la mise à jour
+    np.testing.assert_array_equal(parts['components'], lda.components_)
@@ -0,0 +1,71 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from modules.preprocessing.data_store import (
+    append_to_csv, append_to_store, apply_column_dtypes, convert_csv_to_store, get_store_path, is_store_fresh,
+    iter_store, load_store
+)
+
+
+def read_csv_typed(csv_path):
+    return apply_column_dtypes(pd.read_csv(csv_path))
+
+
+def assert_same_rows(store_df, csv_df):
+    # Les catégories du store suivent l'ordre d'apparition : seules les valeurs sont comparées
+    pd.testing.assert_frame_equal(store_df, csv_df, check_categorical=False)
+
+
+def test_chunked_conversion_round_trip(tmp_path, reviews_df):
+    # Tri par condition : chaque morceau apporte de nouvelles catégories (deltas de dictionnaire)
+    csv_path = str(tmp_path / 'reviews.csv')
+    reviews_df.sort_values('Condition', kind='stable').to_csv(csv_path, index=False)
+
+    store_path = convert_csv_to_store(csv_path, chunk_size=150)
+
+    assert store_path == get_store_path(csv_path)
+    assert is_store_fresh(csv_path, store_path)
+    assert_same_rows(load_store(store_path), read_csv_typed(csv_path))
+    assert sum(len(batch) for batch in iter_store(store_path)) == len(reviews_df)
+    assert sorted(os.listdir(tmp_path)) == ['reviews.csv', 'reviews.feather']
+
+
+def test_append_with_new_categories_round_trip(tmp_path, reviews_df):
+    csv_path = str(tmp_path / 'reviews.csv')
+    base, delta = reviews_df.iloc[:1_500].copy(), reviews_df.iloc[1_500:].copy()
+    base = base[base['Condition'] != 'Autism']
+    delta.loc[delta.index[:10], 'Condition'] = 'New condition'
+    base.to_csv(csv_path, index=False)
+    store_path = convert_csv_to_store(csv_path, chunk_size=300)
+
+    append_to_csv(csv_path, delta)
+
+    store_df = load_store(store_path)
+    assert_same_rows(store_df, read_csv_typed(csv_path))
+    assert {'Autism', 'New condition'} <= set(store_df['Condition'].cat.categories)
+
+
+def test_append_to_store_keeps_schema(tmp_path, reviews_df):
+    store_path = str(tmp_path / 'reviews.feather')
+    append_to_store(store_path, reviews_df.iloc[:500])
+    append_to_store(store_path, reviews_df.iloc[500:])
+
+    table = pa.ipc.open_file(pa.memory_map(store_path)).read_all()
+
+    assert pa.types.is_dictionary(table.schema.field('Condition').type)
+    assert_same_rows(load_store(store_path), apply_column_dtypes(reviews_df))
+
+
+def test_failed_conversion_leaves_no_temporary_file(tmp_path):
+    csv_path = str(tmp_path / 'reviews.csv')
+    lines = ['Age_numeric,Gender'] + [f'{age},female' for age in range(50)] + ['not-a-number,male,extra']
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+    with pytest.raises(Exception):
+        convert_csv_to_store(csv_path, chunk_size=10)
+
+    assert os.listdir(tmp_path) == ['reviews.csv']
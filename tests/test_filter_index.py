@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.preprocessing.data_filter import filter_data
+from modules.preprocessing.data_store import apply_column_dtypes
+from modules.preprocessing.filter_index import build_filter_index, column_rows, filter_bitmap, bitmap_to_rows
+
+from conftest import CONDITIONS
+
+FILTERS = [
+    ((18, 80), ['female', 'male'], CONDITIONS),
+    ((25, 45), ['female'], CONDITIONS[:2]),
+    ((29.5, 29.5), ['male'], ['Schizophrenia']),
+    ((0, 100), ['female', 'male', np.nan], CONDITIONS),
+    ((18, 80), [], CONDITIONS),
+    ((18, 80), ['female'], ['Unknown condition']),
+    ((90, 100), ['female', 'male'], CONDITIONS),
+]
+
+
+@pytest.mark.parametrize('typed', [False, True])
+@pytest.mark.parametrize('age_range, genders, conditions', FILTERS)
+def test_bitmap_filter_matches_mask_filter(reviews_df, typed, age_range, genders, conditions):
+    df = apply_column_dtypes(reviews_df) if typed else reviews_df
+    index = build_filter_index(df)
+
+    expected = filter_data(df, age_range, genders, conditions)
+    actual = filter_data(df, age_range, genders, conditions, index=index)
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_bitmap_has_one_bit_per_row(reviews_df):
+    index = build_filter_index(reviews_df)
+    bitmap = filter_bitmap(index, (0, 100), ['female', 'male'], CONDITIONS)
+
+    assert bitmap.dtype == np.uint8
+    assert len(bitmap) == (len(reviews_df) + 7) // 8
+    assert bitmap_to_rows(index, bitmap).max() < len(reviews_df)
+
+
+def test_column_rows_matches_isin(reviews_df):
+    index = build_filter_index(reviews_df)
+
+    rows = column_rows(index, 'sentiment', ['Positif'])
+
+    np.testing.assert_array_equal(rows, np.flatnonzero(reviews_df['sentiment'].isin(['Positif'])))
@@ -0,0 +1,166 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.preprocessing.artifact_bundle import (
+    get_bundle_dir, has_artifact, load_artifact, open_bundle, write_bundle
+)
+from modules.preprocessing.data_loader import (
+    finalize_data_ranges, get_data_ranges, get_data_version, init_data_ranges, load_stored_ranges, update_data_ranges
+)
+from modules.preprocessing.incremental import STATE_DIR_NAME, STATE_NAME, refresh
+from modules.preprocessing.lda_analyzer import lda_model_parts, load_doc_topics, load_lda_model
+from modules.preprocessing.pipeline import (
+    DOC_TOPICS_SUFFIX, LDA_MODEL_SUFFIX, SENTIMENT_SPLITS, run_pipeline
+)
+from modules.preprocessing.topic_analyzer import TopicAnalyzer
+from modules.preprocessing.topic_index import INDEX_SUFFIX, load_topic_example_index
+from modules.preprocessing.topic_keywords import KEYWORDS_NAME
+
+TOPIC_WORDS = [
+    ['weight', 'gain', 'hungry', 'pounds', 'appetite'],
+    ['sleep', 'tired', 'drowsy', 'insomnia', 'night'],
+    ['anxiety', 'restless', 'akathisia', 'panic', 'nervous'],
+    ['mood', 'stable', 'voices', 'depression', 'focus'],
+]
+AGES = ['19-24', '25-34', '35-44', '45-54', '55-64', '75 or over']
+CONDITIONS = [' Bipolar I Disorder', ' Schizophrenia', ' Major Depressive Disorder']
+
+
+def make_raw_reviews(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    texts = []
+    for i in range(n_rows):
+        words = list(rng.choice(TOPIC_WORDS[i % len(TOPIC_WORDS)], 6)) + [f'dose{seed}x{i}']
+        texts.append(' '.join(words + [['great', 'awful', 'okay'][i % 3]]))
+    return pd.DataFrame({
+        'description-text': texts,
+        ' Condition': rng.choice(CONDITIONS, n_rows),
+        'Age': rng.choice(AGES, n_rows),
+        'Gender': rng.choice(['Female', 'Male'], n_rows),
+    })
+
+
+def export_lda_outputs(work_dir, output_dir):
+    """Sorties LDA de l'étape export (sans BERTopic ni index de similarité)"""
+    os.makedirs(output_dir, exist_ok=True)
+    pd.read_feather(os.path.join(work_dir, 'scored.feather')).to_csv(
+        os.path.join(output_dir, 'reviews_cleaned.csv'), index=False)
+    bundle = {'lda_keywords': ('topic_keywords', os.path.join(work_dir, KEYWORDS_NAME))}
+    for split in SENTIMENT_SPLITS:
+        pd.read_feather(os.path.join(work_dir, f'lda_{split}.feather')).to_csv(
+            os.path.join(output_dir, f'df_with_topics_{split}.csv'), index=False)
+        topic_ids, weights = load_doc_topics(os.path.join(work_dir, f'lda_{split}{DOC_TOPICS_SUFFIX}'))
+        bundle[f'lda_doc_topics_{split}'] = ('doc_topics', {'topic_ids': topic_ids, 'weights': weights})
+        bundle[f'lda_model_{split}'] = ('lda_model', lda_model_parts(
+            *load_lda_model(os.path.join(work_dir, f'lda_{split}{LDA_MODEL_SUFFIX}'))))
+        examples = load_topic_example_index(os.path.join(work_dir, f'lda_{split}{INDEX_SUFFIX}'))
+        bundle[f'lda_examples_{split}'] = ('topic_examples', examples)
+    write_bundle(get_bundle_dir(output_dir), bundle)
+
+
+@pytest.fixture
+def pipeline_dirs(tmp_path, fake_nlp):
+    """Pipeline exécuté jusqu'à LDA (entraînement en ligne) sur 240 avis, sorties exportées"""
+    raw = make_raw_reviews(240, seed=0)
+    raw.to_csv(tmp_path / 'raw.csv', index=False, encoding='latin1')
+    work_dir, output_dir = str(tmp_path / 'work'), str(tmp_path / 'data')
+    run_pipeline(str(tmp_path / 'raw.csv'), output_dir=output_dir, work_dir=work_dir, targets=('lda',),
+                 params={'lda_method': 'online', 'lda_topics': {'negative': 3, 'positive': 3}})
+    export_lda_outputs(work_dir, output_dir)
+
+    # Nouveau dump : 3 avis retirés, 30 ajoutés (dont un en double)
+    added = make_raw_reviews(30, seed=1)
+    new_dump = pd.concat([raw.iloc[3:], added, added.iloc[:1]])
+    new_dump.to_csv(tmp_path / 'raw2.csv', index=False, encoding='latin1')
+    return {'raw': str(tmp_path / 'raw2.csv'), 'work_dir': work_dir, 'output_dir': output_dir}
+
+
+def read_csv(output_dir, name):
+    return pd.read_csv(os.path.join(output_dir, name))
+
+
+def test_refresh_appends_only_new_reviews(pipeline_dirs):
+    output_dir, work_dir = pipeline_dirs['output_dir'], pipeline_dirs['work_dir']
+    before = {split: len(read_csv(output_dir, f'df_with_topics_{split}.csv')) for split in SENTIMENT_SPLITS}
+    n_reviews = len(read_csv(output_dir, 'reviews_cleaned.csv'))
+    version = get_data_version(os.path.join(output_dir, 'reviews_cleaned.csv'))
+
+    report = refresh(pipeline_dirs['raw'], output_dir=output_dir, work_dir=work_dir, use_bertopic=False)
+
+    assert (report['new_reviews'], report['removed_reviews']) == (30, 3)
+    reviews = read_csv(output_dir, 'reviews_cleaned.csv')
+    assert len(reviews) == n_reviews + 30
+    # Version différente : le jeu de données partagé de l'application est rechargé
+    assert get_data_version(os.path.join(output_dir, 'reviews_cleaned.csv')) != version
+
+    # Topics des nouveaux avis : ceux du modèle existant, non réentraîné
+    bundle = open_bundle(get_bundle_dir(output_dir))
+    for split in SENTIMENT_SPLITS:
+        df = read_csv(output_dir, f'df_with_topics_{split}.csv')
+        new_rows = df.iloc[before[split]:]
+        assert len(new_rows) > 0
+        analyzer = TopicAnalyzer('lda').load(os.path.join(work_dir, f'lda_{split}{LDA_MODEL_SUFFIX}'))
+        topic_ids, _ = analyzer.transform(new_rows['clean_review'].tolist(), top_k=3)
+        np.testing.assert_array_equal(new_rows['topic'].to_numpy(), topic_ids[:, 0])
+        assert len(load_artifact(bundle, f'lda_doc_topics_{split}')['topic_ids']) == len(df)
+
+    # Plages des filtres tenues à jour : identiques à un recalcul sur le CSV
+    stored = load_stored_ranges(os.path.join(output_dir, 'reviews_cleaned.csv'), len(reviews))
+    expected = get_data_ranges(reviews)
+    assert (stored['age_min'], stored['age_max']) == (expected['age_min'], expected['age_max'])
+    assert set(stored['genders']) == set(expected['genders'])
+    assert set(stored['conditions']) == set(expected['conditions'])
+
+    again = refresh(pipeline_dirs['raw'], output_dir=output_dir, work_dir=work_dir, use_bertopic=False)
+    assert again['new_reviews'] == 0
+    assert len(read_csv(output_dir, 'reviews_cleaned.csv')) == len(reviews)
+
+
+def test_ranges_without_ages_have_no_age_bounds():
+    acc = update_data_ranges(init_data_ranges(), pd.DataFrame({'Age_numeric': [np.nan], 'Gender': ['female'],
+                                                               'Condition': ['Autism']}))
+
+    ranges = finalize_data_ranges(acc)
+
+    assert (ranges['age_min'], ranges['age_max']) == (None, None)
+    assert list(ranges['genders']) == ['female']
+
+
+def test_refresh_updates_online_lda_models(pipeline_dirs):
+    output_dir, work_dir = pipeline_dirs['output_dir'], pipeline_dirs['work_dir']
+
+    refresh(pipeline_dirs['raw'], output_dir=output_dir, work_dir=work_dir, use_bertopic=False, update_lda=True)
+
+    with open(os.path.join(work_dir, STATE_DIR_NAME, STATE_NAME), encoding='utf-8') as f:
+        state = json.load(f)
+    assert state['updated_lda_models'] == sorted(SENTIMENT_SPLITS)
+    for split in SENTIMENT_SPLITS:
+        model = TopicAnalyzer('lda').load(os.path.join(work_dir, STATE_DIR_NAME, f'lda_{split}{LDA_MODEL_SUFFIX}'))
+        n_rows = len(pd.read_feather(os.path.join(work_dir, f'lda_{split}.feather')))
+        new_rows = len(read_csv(output_dir, f'df_with_topics_{split}.csv')) - n_rows
+        assert model.engine.model.n_documents_ == n_rows + new_rows
+        # Modèle mis à jour publié dans le bundle lu par le service d'inférence
+        bundled = load_artifact(open_bundle(get_bundle_dir(output_dir)), f'lda_model_{split}')
+        np.testing.assert_array_equal(bundled['components'], model.engine.model.components_)
+    assert has_artifact(open_bundle(get_bundle_dir(output_dir)), 'lda_keywords')
+
+
+def test_refresh_rejects_update_of_batch_models(pipeline_dirs, tmp_path):
+    output_dir, work_dir = pipeline_dirs['output_dir'], pipeline_dirs['work_dir']
+    # Modèles batch : le même pipeline sans entraînement en ligne
+    raw = str(tmp_path / 'raw.csv')
+    run_pipeline(raw, output_dir=output_dir, work_dir=work_dir, targets=('lda',),
+                 params={'lda_method': 'batch', 'lda_topics': {'negative': 3, 'positive': 3}})
+    shutil.rmtree(get_bundle_dir(output_dir))
+    export_lda_outputs(work_dir, output_dir)
+    n_reviews = len(read_csv(output_dir, 'reviews_cleaned.csv'))
+
+    with pytest.raises(ValueError, match='batch'):
+        refresh(pipeline_dirs['raw'], output_dir=output_dir, work_dir=work_dir, use_bertopic=False, update_lda=True)
+
+    assert len(read_csv(output_dir, 'reviews_cleaned.csv')) == n_reviews
@@ -148,4 +148,38 @@ def display_empty_state(message="Aucune donnée à afficher", icon="📭"):
         <h2>{icon}</h2>
         <p>{message}</p>
     </div>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """, unsafe_allow_html=True)
+
+def display_perf_panel():
+    """
+    Panneau de profilage (barre latérale), affiché avec le paramètre d'URL ?perf=1
+    
+    Permet d'activer la mesure des étapes instrumentées, de consulter les temps
+    par étape et de les exporter en JSON ou au format Prometheus.
+    """
+    if st.query_params.get("perf") != "1":
+        return
+    from modules import profiling
+    
+    with st.sidebar.expander("⏱️ Profilage", expanded=True):
+        enabled = st.toggle("Mesurer les étapes", value=profiling.is_enabled(), key="perf_enabled")
+        memory = st.toggle("Pics d'allocation (plus lent)", value=profiling.is_memory_enabled(), key="perf_memory")
+        if enabled != profiling.is_enabled() or memory != profiling.is_memory_enabled():
+            profiling.set_enabled(enabled, memory=memory)
+        
+        stages = profiling.snapshot()
+        if not stages:
+            st.caption("Aucune mesure : activez le profilage puis relancez la page.")
+            return
+        
+        table = pd.DataFrame.from_dict(stages, orient="index")
+        table["peak_bytes"] = pd.to_numeric(table["peak_bytes"]) / 1024 ** 2
+        table = table.rename(columns={"peak_bytes": "peak_mb"})
+        st.dataframe(table.sort_values("wall_seconds", ascending=False), use_container_width=True)
+        
+        col1, col2, col3 = st.columns(3)
+        col1.download_button("JSON", profiling.export_json(), file_name="profil.json", mime="application/json")
+        col2.download_button("Prometheus", profiling.export_prometheus(), file_name="profil.prom",
+                             mime="text/plain")
+        if col3.button("Réinitialiser"):
+            profiling.reset()
@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
-from modules.preprocessing.data_filter import filter_data
+from modules.session_data import make_selection, session_memory_report, estimate_size
+from modules.preprocessing.aggregate_cube import (
+    cube_counts, cube_mean, cube_total, cube_score_mean, cube_score_quantiles
+)
 from .common_components import ( 
     create_info_box,
     create_metric_card, 
@@ -31,13 +34,14 @@ def display_navigation_info():
     )
 
 
-def display_data_overview(df, ranges):
+def display_data_overview(df, ranges, cube=None):
     """
     Affiche un aperçu des données avec métriques principales
     
     Args:
         df: DataFrame des données
         ranges: Dictionnaire des plages de valeurs
+        cube: Cube d'agrégats construit au chargement (optionnel)
     """
     create_section_header("📊 Aperçu des Données", "Statistiques générales du dataset")
     
@@ -47,7 +51,7 @@ def display_data_overview(df, ranges):
     with col1:
         create_metric_card(
             title="Total des Avis",
-            value=f"{len(df):,}",
+            value=f"{cube_total(cube) if cube is not None else len(df):,}",
             help_text="Nombre total d'avis dans le dataset"
         )
     
@@ -77,7 +81,7 @@ def display_data_overview(df, ranges):
         st.markdown("### Distribution des Sentiments")
         col1, col2, col3 = create_columns_layout([1, 1, 2])
         
-        sentiment_counts = df['sentiment'].value_counts()
+        sentiment_counts = cube_counts(cube, 'sentiment') if cube is not None else df['sentiment'].value_counts()
         
         with col1:
             if 'Positif' in sentiment_counts:
@@ -94,17 +98,36 @@ def display_data_overview(df, ranges):
                     value=f"{sentiment_counts.get('Négatif', 0):,}",
                     help_text="Nombre d'avis avec sentiment négatif"
                 )
+        
+        with col3:
+            if cube is not None and 'score_sum' in cube.columns:
+                q1, median, q3 = cube_score_quantiles(cube)
+                create_metric_card(
+                    title="Score Moyen",
+                    value=f"{cube_score_mean(cube):+.2f}",
+                    help_text=f"Score VADER moyen (médiane {median:+.2f}, quartiles {q1:+.2f} / {q3:+.2f})"
+                )
+            elif 'sentiment_score' in df.columns:
+                create_metric_card(
+                    title="Score Moyen",
+                    value=f"{df['sentiment_score'].mean():+.2f}",
+                    help_text="Score VADER moyen"
+                )
 
-def display_data_filters(df, ranges):
+def display_data_filters(df, ranges, index, cube=None):
     """
-    Affiche les filtres de données et retourne les données filtrées
+    Affiche les filtres de données et retourne la sélection de lignes correspondante
+    
+    Aucune ligne n'est copiée : la sélection est un bitmap sur le jeu partagé.
     
     Args:
-        df: DataFrame des données originales
+        df: DataFrame des données originales (partagé entre les sessions)
         ranges: Dictionnaire des plages de valeurs
+        index: Index de filtrage construit au chargement
+        cube: Cube d'agrégats construit au chargement (optionnel)
     
     Returns:
-        DataFrame filtré selon les critères sélectionnés
+        Sélection (voir session_data.make_selection), ou None si les critères sont invalides
     """
     create_section_header("🔍 Filtres de Données", "Personnalisez votre analyse")
     
@@ -135,7 +158,7 @@ def display_data_filters(df, ranges):
             st.markdown("**Critères médicaux**")
             
             # Filtre de conditions (limité aux 15 plus fréquentes pour l'interface)
-            condition_counts = df['Condition'].value_counts()
+            condition_counts = cube_counts(cube, 'Condition') if cube is not None else df['Condition'].value_counts()
             top_conditions = condition_counts.head(15).index.tolist()
             
             selected_conditions = st.multiselect(
@@ -158,44 +181,46 @@ def display_data_filters(df, ranges):
     # Validation des sélections
     if not selected_genders:
         show_warning_message("Veuillez sélectionner au moins un genre")
-        return df.head(0)
+        return None
     
     if not selected_conditions and not include_all_conditions:
         show_warning_message("Veuillez sélectionner au moins une condition médicale")
-        return df.head(0)
+        return None
     
     # Application des filtres
     conditions_to_use = list(ranges['conditions']) if include_all_conditions else selected_conditions
     
     try:
-        filtered_df = filter_data(
-            df, 
-            age_range=age_range,
-            gender_filter=selected_genders,
-            condition_filter=conditions_to_use
-        )
+        selection = make_selection(index, {
+            'age_range': age_range,
+            'gender_filter': selected_genders,
+            'condition_filter': conditions_to_use,
+        })
         
         # Affichage du résultat du filtrage
-        if len(filtered_df) > 0:
+        if selection['count'] > 0:
             show_success_message(
-                f"**{len(filtered_df):,}** avis correspondent aux critères sélectionnés "
-                f"({len(filtered_df)/len(df)*100:.1f}% du dataset)"
+                f"**{selection['count']:,}** avis correspondent aux critères sélectionnés "
+                f"({selection['count']/len(df)*100:.1f}% du dataset)"
             )
         else:
             show_warning_message("Aucun avis ne correspond aux critères sélectionnés")
         
-        return filtered_df
+        return selection
         
     except Exception as e:
         st.error(f"Erreur lors du filtrage : {e}")
-        return df.head(0)
+        return None
 
-def display_sample_data(df):
+def display_sample_data(df, cube=None):
     """
     Affiche un échantillon des données filtrées
     
     Args:
-        df: DataFrame filtré à afficher
+        df: DataFrame des lignes filtrées à afficher (les 10 premières suffisent
+            quand le cube est fourni)
+        cube: Cube d'agrégats filtré avec les mêmes critères (optionnel) ;
+            les statistiques rapides en sont alors tirées
     """
     if df.empty:
         create_info_box(
@@ -240,12 +265,13 @@ def display_sample_data(df):
         if 'Age_numeric' in df.columns:
             create_metric_card(
                 title="Âge Moyen",
-                value=f"{df['Age_numeric'].mean():.1f} ans" if 'Age_numeric' in df.columns else "N/A"
+                value=f"{cube_mean(cube) if cube is not None else df['Age_numeric'].mean():.1f} ans"
             )
     
     with col2:
         if 'Gender' in df.columns:
-            most_common_gender = df['Gender'].value_counts().index[0]
+            gender_counts = cube_counts(cube, 'Gender') if cube is not None else df['Gender'].value_counts()
+            most_common_gender = gender_counts.index[0]
             create_metric_card(
                 title="Genre Principal",
                 value=most_common_gender
@@ -255,6 +281,36 @@ def display_sample_data(df):
         if 'Condition' in df.columns:
             create_metric_card(
                 title="Conditions Uniques",
-                value=df['Condition'].nunique()
+                value=len(cube_counts(cube, 'Condition')) if cube is not None else df['Condition'].nunique()
             )
 
+
+def display_session_memory(shared_df=None):
+    """
+    Vue d'administration : mémoire occupée par l'état de chaque session active
+    
+    Affichée avec le paramètre d'URL ?admin=1
+    
+    Args:
+        shared_df: DataFrame partagé entre les sessions (optionnel, pour comparaison)
+    """
+    create_section_header("🛠️ Mémoire par Session", "État conservé par chaque session active")
+    
+    report = session_memory_report()
+    col1, col2, col3 = create_columns_layout([1, 1, 1])
+    with col1:
+        create_metric_card(title="Sessions Actives", value=len(report))
+    with col3:
+        if shared_df is not None:
+            create_metric_card(
+                title="Jeu de Données Partagé",
+                value=f"{estimate_size(shared_df) / 1024 ** 2:,.1f} Mo",
+                help_text="Chargé une seule fois pour tout le processus"
+            )
+    with col2:
+        create_metric_card(
+            title="Mémoire Totale des Sessions",
+            value=f"{report['bytes'].sum() / 1024:,.1f} Ko",
+            help_text="Le jeu de données partagé n'est compté qu'une fois, hors sessions"
+        )
+    display_dataframe_with_info(report, title="Détail par session", show_shape=False)